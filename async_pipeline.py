@@ -0,0 +1,185 @@
+import asyncio
+import inspect
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from ingest import read
+from pipeline import MARGIN, DetectorPipeline, crop
+from sinks import FORMATS, PNG_COMPRESSION
+
+ASYNC_QUEUE_SIZE = 4      # frames (or frames' worth of crops) buffered between two stages
+ASYNC_WORKERS = 4
+
+_DONE = object()
+
+
+async def file_source(paths, color=True, interval=0.0, executor=None):
+    """
+    Yields (key, frame) for each image file, decoded off the event loop.
+
+    key is the file name without extension. interval, in seconds, paces the
+    frames like a capture loop would.
+    """
+    loop = asyncio.get_running_loop()
+    for path in paths:
+        frame = await loop.run_in_executor(executor, read, path, color)
+        yield os.path.splitext(os.path.basename(path))[0], frame
+        if interval:
+            await asyncio.sleep(interval)
+
+
+async def grab_source(grab, count=None, interval=0.0, executor=None):
+    """
+    Yields (key, frame) from a blocking grab() callable, e.g.
+    lambda: from_pil(ImageGrab.grab(), color=True), count times (forever if
+    None). Keys are zero-padded frame numbers.
+    """
+    loop = asyncio.get_running_loop()
+    number = 0
+    while count is None or number < count:
+        number += 1
+        frame = await loop.run_in_executor(executor, grab)
+        yield f"{number:06d}", frame
+        if interval:
+            await asyncio.sleep(interval)
+
+
+class DirectorySink:
+    """Writes each encoded crop to <output_dir>/<name>.<fmt>."""
+
+    def __init__(self, output_dir=".", fmt="png"):
+        self.output_dir = output_dir
+        self.fmt = fmt
+        os.makedirs(output_dir, exist_ok=True)
+
+    def __call__(self, name, bbox, data):
+        with open(os.path.join(self.output_dir, f"{name}.{self.fmt}"), "wb") as f:
+            f.write(data)
+
+
+class AsyncDetector:
+    """
+    Capture -> detect -> encode -> save as four asyncio stages joined by bounded queues.
+
+    While one frame is being detected the next is already being grabbed and
+    the crops of the previous one encoded and written, instead of the
+    grab/analyze/write/repeat loop of the scripts. Detection and encoding run
+    in a thread pool (OpenCV releases the GIL); a full queue makes the stage
+    before it wait, so a slow sink throttles capture instead of piling up
+    frames in memory.
+
+    source is any async iterable of (key, frame) pairs (file_source,
+    grab_source, or your own). sink is called as sink(name, bbox, data) for
+    every crop, name being "<key>_<n>"; it may be a plain function (run in the
+    pool) or a coroutine function. on_frame(key, boxes), if given, is called on
+    the event loop as soon as a frame's boxes are known.
+
+    Cancelling run() stops every stage, closes the source and returns once
+    in-flight pool work has finished; if any stage fails, the others are
+    cancelled and the error is raised from run().
+    """
+
+    def __init__(self, pipeline=None, sink=None, fmt="png", compression=PNG_COMPRESSION,
+                 margin=MARGIN, queue_size=ASYNC_QUEUE_SIZE, workers=ASYNC_WORKERS, on_frame=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt} (expected one of {', '.join(FORMATS)})")
+        self.pipeline = pipeline or DetectorPipeline()
+        self.sink = sink if sink is not None else DirectorySink(".", fmt)
+        self.fmt = fmt
+        self.params = FORMATS[fmt](compression)
+        self.margin = margin
+        self.queue_size = queue_size
+        self.workers = workers
+        self.on_frame = on_frame
+        self.frames = 0
+        self.elements = 0
+        self.bytes_written = 0
+        self.seconds = 0.0
+
+    def _encode(self, key, frame, boxes):
+        encoded = []
+        for n, box in enumerate(boxes.tolist(), start=1):
+            ok, data = cv2.imencode(f".{self.fmt}", crop(frame, box, self.margin), self.params)
+            if ok:
+                encoded.append((f"{key}_{n}", tuple(box), data.tobytes()))
+        return encoded
+
+    async def _produce(self, source, out):
+        try:
+            async for key, frame in source:
+                await out.put((key, frame))
+        finally:
+            close = getattr(source, "aclose", None)
+            if close is not None:
+                await close()
+        await out.put(_DONE)
+
+    async def _detect(self, executor, inbox, out):
+        loop = asyncio.get_running_loop()
+        while (item := await inbox.get()) is not _DONE:
+            key, frame = item
+            boxes = await loop.run_in_executor(executor, self.pipeline.detect, frame)
+            self.frames += 1
+            self.elements += len(boxes)
+            if self.on_frame is not None:
+                self.on_frame(key, boxes)
+            await out.put((key, frame, boxes))
+        await out.put(_DONE)
+
+    async def _encode_stage(self, executor, inbox, out):
+        loop = asyncio.get_running_loop()
+        while (item := await inbox.get()) is not _DONE:
+            await out.put(await loop.run_in_executor(executor, self._encode, *item))
+        await out.put(_DONE)
+
+    async def _save(self, executor, inbox):
+        loop = asyncio.get_running_loop()
+        is_async = inspect.iscoroutinefunction(self.sink) or inspect.iscoroutinefunction(
+            getattr(self.sink, "__call__", None))
+        while (crops := await inbox.get()) is not _DONE:
+            if is_async:
+                for name, bbox, data in crops:
+                    await self.sink(name, bbox, data)
+            else:
+                await loop.run_in_executor(executor, self._save_all, crops)
+            self.bytes_written += sum(len(data) for _, _, data in crops)
+
+    def _save_all(self, crops):
+        for name, bbox, data in crops:
+            self.sink(name, bbox, data)
+
+    async def run(self, source):
+        """Drains source through every stage; returns stats() when the last crop is saved."""
+        self.frames = self.elements = self.bytes_written = 0
+        start = time.perf_counter()
+        frames, boxes, crops = (asyncio.Queue(self.queue_size) for _ in range(3))
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="async-detect")
+        tasks = [
+            asyncio.ensure_future(self._produce(source, frames)),
+            asyncio.ensure_future(self._detect(executor, frames, boxes)),
+            asyncio.ensure_future(self._encode_stage(executor, boxes, crops)),
+            asyncio.ensure_future(self._save(executor, crops)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # waiting for in-flight jobs happens off the loop, so other tasks keep running
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+            self.seconds = time.perf_counter() - start
+        return self.stats()
+
+    def stats(self):
+        """Frames, elements and bytes handled by the last run(), with throughput."""
+        return {
+            "frames": self.frames,
+            "elements": self.elements,
+            "bytes": self.bytes_written,
+            "seconds": self.seconds,
+            "frames_per_sec": self.frames / self.seconds if self.seconds else 0.0,
+        }
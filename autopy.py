@@ -1,13 +1,19 @@
 import pywinauto
 from pywinauto.findwindows import ElementNotFoundError
 from pywinauto.uia_defines import NoPatternInterfaceError 
-from PIL import ImageGrab, Image
+from PIL import Image
 import os
 import time
 import re
 import ctypes 
 import keyboard
 
+from uia_capture import ScreenGrabber, capture_each, capture_once, save_png
+from scanner import WindowScanner
+
+SINGLE_GRAB = True   # grab each window once and cut the elements out of it, instead of one grab per element
+WINDOW_BUDGET = 10.0  # seconds before an unresponsive window is given up
+
 def get_screen_size():
     """Gets the primary screen resolution using ctypes."""
     try:
@@ -63,110 +69,76 @@ def capture_visible_elements(output_dir="visible_elements_capture"):
 
     total_processed = 0
     total_skipped = 0
+    grabber = ScreenGrabber()
 
-    for i, window in enumerate(top_windows):
+    windows_to_scan = []
+    for window in top_windows:
         try:
-            window_title = window.window_text()
-            print(f"\n--- Processing Window {i+1}/{len(top_windows)}: '{window_title}' ---")
             window_rect = window.rectangle()
-            
             if not window_rect or window_rect.width() <= 1 or window_rect.height() <= 1:
-                print("   Skipping invalid or zero-size window.")
+                print(f"   Skipping invalid or zero-size window '{window.window_text()}'.")
                 continue
-
-            
-            window_elements = window.descendants()
-            print(f"   Found {len(window_elements)} potential elements in this window.")
-
+            windows_to_scan.append(window)
         except (ElementNotFoundError, NoPatternInterfaceError, RuntimeError, AttributeError) as win_err:
-             
              print(f"   error : {win_err}")
-             continue
         except Exception as e:
-             print(f"   error  '{window_title}': {e}")
-             continue
-
-        processed_in_window = 0
-        skipped_in_window = 0
-
-        for element in window_elements:
-            processed_in_window += 1
-            total_processed += 1
-            if processed_in_window % 200 == 0: 
-                 print(f"      Processed {processed_in_window}/{len(window_elements)} in window '{window_title}'...")
-
-            try:
-                rect = element.rectangle()
-                if not rect or rect.width() <= 1 or rect.height() <= 1:
-                    skipped_in_window += 1
-                    total_skipped += 1
-                    continue
-
-                
-                if not element.is_visible():
-                    skipped_in_window += 1
-                    total_skipped += 1
-                    continue
-
-                
-                if rect.left < -10 or rect.top < -10: 
-                    skipped_in_window += 1
-                    total_skipped += 1
-                    continue
-                
-
-                
-                element_info = element.element_info
-                control_type = element_info.control_type
-                name = element_info.name
-                auto_id = element_info.automation_id
-
-                
-                coords = (rect.left, rect.top, rect.right, rect.bottom)
-
-
-                try:
-                    bbox = tuple(map(int, coords))
-                    screenshot = ImageGrab.grab(bbox=bbox, include_layered_windows=False, all_screens=True)
-                except ValueError as ve: 
-                    skipped_in_window += 1
-                    total_skipped += 1
-                    continue
-                except Exception as img_err:
-                    
-                    skipped_in_window += 1
-                    total_skipped += 1
-                    continue
-
-                
-                element_counter += 1
-                clean_win_title = sanitize_filename(window_title, 20)
-                base_filename = f"{element_counter:04d}_Win_{clean_win_title}_{control_type}_{sanitize_filename(name)}"
-                if auto_id:
-                    base_filename += f"_id_{sanitize_filename(auto_id)}"
+             print(f"   error : {e}")
+
+    # all windows are walked at once; a window that stops answering is given up after WINDOW_BUDGET seconds
+    scanner = WindowScanner(window_budget=WINDOW_BUDGET, walker_options={"min_offset": -10})
+    print(f"Scanning {len(windows_to_scan)} windows with {scanner.workers} workers...")
+    scans = scanner.scan(windows_to_scan)
+
+    for scan in scans:
+        window_title = scan.title
+        print(f"\n--- Processing Window {scan.index+1}/{len(windows_to_scan)}: '{window_title}' ---")
+        print(f"   Found {len(scan.elements)} visible elements in {scan.seconds:.2f} s.")
+        if scan.timed_out:
+            print(f"   Window did not answer within {WINDOW_BUDGET} s; keeping the elements found until then.")
+
+        # elements the walker read but filtered out (invisible, too small, off screen) or couldn't read
+        processed_in_window = scan.visited
+        skipped_in_window = scan.visited - len(scan.elements)
+        total_processed += processed_in_window
+        total_skipped += skipped_in_window
+        candidates = [(element, element.rect) for element in scan.elements]
+
+        # one grab for the window, every element cut out of it in memory
+        rects = [rect for _, rect in candidates]
+        try:
+            crops = capture_once(grabber, rects)[1] if SINGLE_GRAB else capture_each(grabber, rects)
+        except (ValueError, OSError) as img_err:
+            print(f"   Could not grab window '{window_title}': {img_err}")
+            skipped_in_window += len(candidates)
+            total_skipped += len(candidates)
+            crops = []
+
+        for (element_info, rect), crop_pixels in zip(candidates, crops):
+            if crop_pixels is None:
+                skipped_in_window += 1
+                total_skipped += 1
+                continue
 
-                save_path = os.path.join(output_dir, f"{base_filename}.png")
+            control_type = element_info.control_type
+            name = element_info.name
+            auto_id = element_info.automation_id
 
-                try:
-                    screenshot.save(save_path)
-                    
-                except Exception as save_err:
-                    print(f"    Warning: Could not save screenshot to {save_path}: {save_err}")
-                    
-                    skipped_in_window += 1 
-                    total_skipped += 1
+            element_counter += 1
+            clean_win_title = sanitize_filename(window_title, 20)
+            base_filename = f"{element_counter:04d}_Win_{clean_win_title}_{control_type}_{sanitize_filename(name)}"
+            if auto_id:
+                base_filename += f"_id_{sanitize_filename(auto_id)}"
 
+            save_path = os.path.join(output_dir, f"{base_filename}.png")
 
-            except (ElementNotFoundError, NoPatternInterfaceError, AttributeError, RuntimeError, ValueError) as el_err:
+            try:
+                save_png(save_path, crop_pixels)
                 
-                skipped_in_window += 1
-                total_skipped += 1
-                continue
-            except Exception as e:
+            except Exception as save_err:
+                print(f"    Warning: Could not save screenshot to {save_path}: {save_err}")
                 
-                skipped_in_window += 1
+                skipped_in_window += 1 
                 total_skipped += 1
-                continue
 
         print(f"   Finished window '{window_title}'. Saved {processed_in_window - skipped_in_window} elements, Skipped {skipped_in_window}.")
 
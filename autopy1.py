@@ -1,13 +1,17 @@
 import pywinauto
 from pywinauto.findwindows import ElementNotFoundError
 from pywinauto.uia_defines import NoPatternInterfaceError
-from PIL import ImageGrab, Image
+from PIL import Image
 import os
 import time
 import re
 import ctypes
 import keyboard
 
+from classifier import InteractiveClassifier
+from uia_capture import ScreenGrabber, capture_each, capture_once, save_png
+from walker import TreeWalker
+
 
 OUTPUT_DIR = "interactive_visible_elements"
 INTERACTIVE_TYPES = {
@@ -15,7 +19,9 @@ INTERACTIVE_TYPES = {
     "Hyperlink", "TabItem", "ComboBox", "Spinner", "SplitButton",
     "TreeItem", "Edit" 
 }
+SINGLE_GRAB = True   # grab each window once and cut the elements out of it, instead of one grab per element
 INTERACTIVE_KEYWORDS = {"button", "icon", "click", "link", "select", "menu", "tab", "choose", "add", "remove", "edit", "go", "search", "play", "option"}
+CLASSIFIER = InteractiveClassifier(INTERACTIVE_TYPES, INTERACTIVE_KEYWORDS)
 
 def get_screen_size():
     """Gets the primary screen resolution using ctypes."""
@@ -95,6 +101,8 @@ def capture_interactive_elements(output_dir=OUTPUT_DIR):
     total_processed = 0
     total_skipped = 0
     saved_count = 0
+    grabber = ScreenGrabber()
+    walker = TreeWalker()
 
     for window in windows_to_process:
         try:
@@ -104,8 +112,9 @@ def capture_interactive_elements(output_dir=OUTPUT_DIR):
                 print("   Window has invalid dimensions. Skipping.")
                 continue
 
-            window_elements = window.descendants()
-            print(f"   Found {len(window_elements)} potential elements. Filtering...")
+            # elements arrive as they are found; hidden and off-window subtrees are never read
+            window_elements = walker.walk(window)
+            print("   Walking and filtering elements...")
 
         except (ElementNotFoundError, NoPatternInterfaceError, RuntimeError, AttributeError) as win_err:
              print(f"   Skipping window due to error accessing properties: {win_err}")
@@ -117,81 +126,23 @@ def capture_interactive_elements(output_dir=OUTPUT_DIR):
         processed_in_window = 0
         skipped_in_window = 0
         saved_in_window = 0
+        candidates = []
 
-        for element in window_elements:
+        for element, rect, depth in window_elements:
             processed_in_window += 1
             total_processed += 1
 
             try:
-                
-                if not element.is_visible():
-                    skipped_in_window += 1
-                    continue
-
-                
-                rect = element.rectangle()
-                if not rect or rect.width() <= 1 or rect.height() <= 1:
-                    skipped_in_window += 1
-                    continue 
-
-               
-                if rect.left < -50 or rect.top < -50:
-                    skipped_in_window += 1
-                    continue
-                
-                is_interactive = False
                 element_info = element.element_info 
                 control_type = element_info.control_type
-                name = (element_info.name or "").lower()
-                auto_id = (element_info.automation_id or "").lower()
-                class_name = (element_info.class_name or "").lower() 
-
-                
-                if control_type in INTERACTIVE_TYPES:
-                    is_interactive = True
-                else:
-                    
-                    element_text = f"{name} {auto_id} {class_name}"
-                    for keyword in INTERACTIVE_KEYWORDS:
-                        if keyword in element_text:
-                            
-                            if keyword == "icon" and not re.search(r'\bicon\b', element_text):
-                                continue
-                            is_interactive = True
-                            break
+                is_interactive = CLASSIFIER.is_interactive(control_type, element_info.name,
+                                                           element_info.automation_id, element_info.class_name)
 
                 if not is_interactive:
                     skipped_in_window += 1
                     continue
 
-
-                coords = (rect.left, rect.top, rect.right, rect.bottom)
-                try:
-                    bbox = tuple(map(int, coords))
-                    screenshot = ImageGrab.grab(bbox=bbox, include_layered_windows=False, all_screens=True)
-                except (ValueError, OSError) as img_err: 
-                    skipped_in_window += 1
-                    continue
-                except Exception as img_err:
-
-                    skipped_in_window += 1
-                    continue
-
-                
-                element_counter += 1
-                saved_in_window += 1
-                base_filename = f"{element_counter:04d}_{control_type}_{sanitize_filename(element_info.name)}"
-                if element_info.automation_id:
-                     base_filename += f"_id_{sanitize_filename(element_info.automation_id)}"
-
-                save_path = os.path.join(output_dir, f"{base_filename}.png")
-                try:
-                    screenshot.save(save_path)
-                    
-                except Exception as save_err:
-                    print(f"    Warning: Could not save screenshot {save_path}: {save_err}")
-                    
-                    skipped_in_window += 1 
+                candidates.append((element_info, control_type, rect))
 
             except (ElementNotFoundError, NoPatternInterfaceError, AttributeError, RuntimeError, ValueError) as el_err:
                 
@@ -202,6 +153,40 @@ def capture_interactive_elements(output_dir=OUTPUT_DIR):
                 skipped_in_window += 1
                 continue
 
+        # elements the walker read but filtered out (invisible, too small, off screen)
+        filtered = walker.visited - walker.yielded
+        processed_in_window += filtered
+        total_processed += filtered
+        skipped_in_window += filtered
+
+        # one grab for the window, every element cut out of it in memory
+        rects = [rect for _, _, rect in candidates]
+        try:
+            crops = capture_once(grabber, rects)[1] if SINGLE_GRAB else capture_each(grabber, rects)
+        except (ValueError, OSError) as img_err:
+            print(f"   Could not grab the window: {img_err}")
+            skipped_in_window += len(candidates)
+            crops = []
+
+        for (element_info, control_type, rect), crop_pixels in zip(candidates, crops):
+            if crop_pixels is None:
+                skipped_in_window += 1
+                continue
+
+            element_counter += 1
+            saved_in_window += 1
+            base_filename = f"{element_counter:04d}_{control_type}_{sanitize_filename(element_info.name)}"
+            if element_info.automation_id:
+                 base_filename += f"_id_{sanitize_filename(element_info.automation_id)}"
+
+            save_path = os.path.join(output_dir, f"{base_filename}.png")
+            try:
+                save_png(save_path, crop_pixels)
+            except Exception as save_err:
+                print(f"    Warning: Could not save screenshot {save_path}: {save_err}")
+                
+                skipped_in_window += 1 
+
         total_skipped += skipped_in_window
         saved_count += saved_in_window
         print(f"   Finished window. Found interactive: {saved_in_window}, Skipped/Filtered: {skipped_in_window + (processed_in_window - skipped_in_window - saved_in_window)}")
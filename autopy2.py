@@ -1,22 +1,32 @@
 import pywinauto
 from pywinauto.findwindows import ElementNotFoundError
 from pywinauto.uia_defines import NoPatternInterfaceError
-from PIL import ImageGrab, Image
+from PIL import Image
 import os
 import time
 import re
 import ctypes
+import json
 import keyboard
+import numpy as np
+
+from classifier import InteractiveClassifier
+from dedup import CACHE_FILE, CropCache
+from snapshot import default_provider
+from uia_capture import ScreenGrabber, capture_each, capture_once, save_png
 
 
 OUTPUT_DIR = "interactive_visible_elements"
+MANIFEST_FILE = "elements.jsonl"   # one line per captured element, with the file holding its crop
 TASKBAR_CLASS_NAME = "Shell_TrayWnd" 
 INTERACTIVE_TYPES = {
     "Button", "CheckBox", "RadioButton", "MenuItem", "ListItem",
     "Hyperlink", "TabItem", "ComboBox", "Spinner", "SplitButton",
     "TreeItem", "Edit"
 }
+SINGLE_GRAB = True   # grab each window once and cut the elements out of it, instead of one grab per element
 INTERACTIVE_KEYWORDS = {"button", "icon", "click", "link", "select", "menu", "tab", "choose", "add", "remove", "edit", "go", "search", "play", "option"}
+CLASSIFIER = InteractiveClassifier(INTERACTIVE_TYPES, INTERACTIVE_KEYWORDS)
 
 
 
@@ -118,6 +128,14 @@ def capture_interactive_elements(output_dir=OUTPUT_DIR):
     screen_width, screen_height = screen_size if screen_size else (None, None)
 
     element_counter = 0
+    # crops saved by earlier runs are recognized instead of written again
+    cache_path = os.path.join(output_dir, CACHE_FILE)
+    crop_cache = CropCache.load(cache_path)
+    reused_count = 0
+    # reused elements have no file of their own, so every element gets a line here
+    manifest = open(os.path.join(output_dir, MANIFEST_FILE), "a", encoding="utf-8")
+    grabber = ScreenGrabber()
+    provider = default_provider()
     start_time = time.time()
     total_processed = 0
     total_skipped = 0
@@ -133,8 +151,9 @@ def capture_interactive_elements(output_dir=OUTPUT_DIR):
                  print("   Window has invalid dimensions. Skipping.")
                  continue
 
-            window_elements = window.descendants()
-            print(f"   Found {len(window_elements)} potential elements. Filtering...")
+            # every element's properties in one bulk request, filtered below without further calls
+            snapshot = provider.snapshot(window)
+            print(f"   Found {len(snapshot)} potential elements. Filtering...")
 
         except (ElementNotFoundError, NoPatternInterfaceError, RuntimeError, AttributeError) as win_err:
              print(f"   Skipping window due to error accessing properties: {win_err}")
@@ -143,69 +162,58 @@ def capture_interactive_elements(output_dir=OUTPUT_DIR):
              print(f"   Unexpected error processing window '{window.window_text()}': {e}")
              continue
 
-        processed_in_window = 0
-        skipped_in_window = 0
+        processed_in_window = len(snapshot)
+        total_processed += processed_in_window
         saved_in_window = 0
+        candidates = []
 
-        for element in window_elements:
-            processed_in_window += 1
-            total_processed += 1
+        rects = snapshot.rects
+        shown = (snapshot.visible & (snapshot.widths > 1) & (snapshot.heights > 1) &
+                 (rects[:, 0] >= -50) & (rects[:, 1] >= -50))
+        interactive = CLASSIFIER.classify(snapshot)
 
-            try:
-                if not element.is_visible():
-                    skipped_in_window += 1; continue
-                rect = element.rectangle()
-                if not rect or rect.width() <= 1 or rect.height() <= 1:
-                    skipped_in_window += 1; continue
-                if rect.left < -50 or rect.top < -50:
-                    skipped_in_window += 1; continue
-                
-                is_interactive = False
-                element_info = element.element_info
-                control_type = element_info.control_type
-                name = (element_info.name or "").lower()
-                auto_id = (element_info.automation_id or "").lower()
-                class_name = (element_info.class_name or "").lower()
-
-                if control_type in INTERACTIVE_TYPES:
-                    is_interactive = True
-                else:
-                    element_text = f"{name} {auto_id} {class_name}"
-                    for keyword in INTERACTIVE_KEYWORDS:
-                        if keyword in element_text:
-                             if keyword == "icon" and not re.search(r'\bicon\b', element_text): continue
-                             is_interactive = True; break
-
-                if not is_interactive:
-                    skipped_in_window += 1; continue
-
-                # --- Capture ---
-                coords = (rect.left, rect.top, rect.right, rect.bottom)
-                try:
-                    bbox = tuple(map(int, coords))
-                    screenshot = ImageGrab.grab(bbox=bbox, include_layered_windows=False, all_screens=True)
-                except (ValueError, OSError) as img_err:
-                    skipped_in_window += 1; continue
-                except Exception as img_err:
-                    skipped_in_window += 1; continue
-
-                
-                element_counter += 1; saved_in_window += 1
-                base_filename = f"{element_counter:04d}_{control_type}_{sanitize_filename(element_info.name)}"
-                if element_info.automation_id:
-                     base_filename += f"_id_{sanitize_filename(element_info.automation_id)}"
-                save_path = os.path.join(output_dir, f"{base_filename}.png")
-                try:
-                    screenshot.save(save_path)
-                except Exception as save_err:
-                    print(f"    Warning: Could not save screenshot {save_path}: {save_err}")
-                    skipped_in_window += 1 
-
-            except (ElementNotFoundError, NoPatternInterfaceError, AttributeError, RuntimeError, ValueError) as el_err:
-                skipped_in_window += 1; continue
-            except Exception as e:
+        for element_info in snapshot.rows(np.flatnonzero(shown & interactive)):
+            candidates.append((element_info, element_info.control_type, element_info.rect))
+
+        skipped_in_window = processed_in_window - len(candidates)
+
+        # --- Capture ---
+        rects = [rect for _, _, rect in candidates]
+        try:
+            crops = capture_once(grabber, rects)[1] if SINGLE_GRAB else capture_each(grabber, rects)
+        except (ValueError, OSError) as img_err:
+            print(f"   Could not grab the window: {img_err}")
+            skipped_in_window += len(candidates); crops = []
+
+        for (element_info, control_type, rect), crop_pixels in zip(candidates, crops):
+            if crop_pixels is None:
                 skipped_in_window += 1; continue
-        
+
+            element_counter += 1
+            record = {"element": element_counter, "window": current_title, "control_type": control_type,
+                      "name": element_info.name, "automation_id": element_info.automation_id, "rect": list(rect)}
+            cached = crop_cache.lookup(crop_pixels)
+            if cached is not None:
+                print(f"    Element {element_counter} already saved as {os.path.basename(cached.path)} "
+                      f"(element {cached.element_id}, {cached.label})")
+                manifest.write(json.dumps({**record, "file": os.path.basename(cached.path), "reused": True}) + "\n")
+                reused_count += 1
+                continue
+
+            saved_in_window += 1
+            base_filename = f"{element_counter:04d}_{control_type}_{sanitize_filename(element_info.name)}"
+            if element_info.automation_id:
+                 base_filename += f"_id_{sanitize_filename(element_info.automation_id)}"
+            save_path = os.path.join(output_dir, f"{base_filename}.png")
+            try:
+                save_png(save_path, crop_pixels)
+                crop_cache.add(element_counter, f"{control_type}:{element_info.name}", save_path,
+                               image=crop_pixels, nbytes=crop_pixels.nbytes)
+                manifest.write(json.dumps({**record, "file": os.path.basename(save_path), "reused": False}) + "\n")
+            except Exception as save_err:
+                print(f"    Warning: Could not save screenshot {save_path}: {save_err}")
+                skipped_in_window += 1 
+
 
         total_skipped += skipped_in_window
         saved_count += saved_in_window
@@ -214,11 +222,14 @@ def capture_interactive_elements(output_dir=OUTPUT_DIR):
     
 
 
+    manifest.close()
+    crop_cache.save(cache_path)
     end_time = time.time()
     duration = end_time - start_time
     print("\n--- Scan Complete ---")
     print(f"Processed elements in foreground/top window(s): {total_processed}")
     print(f"Saved screenshots for potentially interactive elements: {saved_count}")
+    print(f"Already saved in an earlier run or window (not written again, listed in {MANIFEST_FILE}): {reused_count}")
     print(f"Skipped non-interactive/invisible/error elements: {total_processed - saved_count}")
     print(f"Duration: {duration:.2f} seconds")
     print(f"Screenshots saved in: {os.path.abspath(output_dir)}")
@@ -0,0 +1,128 @@
+"""
+Headless batch detection over directories of screenshots.
+
+    python batch.py captures/ [--method canny|adaptive] [--workers N] [--output boxes.jsonl]
+    python batch.py 'captures/*.png' --scale 0.5
+    python batch.py captures/ --clean         # nested duplicates and fragments merged (see nms.py)
+    python batch.py captures.frames          # a frame store (see framestore.py)
+
+Frames are spread over a process pool; each worker builds its pipeline once
+and runs OpenCV single-threaded, so throughput scales with the number of
+workers rather than fighting over cores. One JSON line per image is written
+in input order, as soon as it is ready:
+
+    {"path": "captures/0001.png", "width": 1366, "height": 768, "ms": 21.4, "boxes": [[x, y, w, h], ...]}
+
+Images that can't be read produce {"path": ..., "error": ...} instead.
+Throughput (images/s) is reported on stderr at the end.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import cv2
+
+from framestore import FrameStore
+from ingest import read
+from pipeline import PRESETS, DetectorPipeline
+
+BATCH_CHUNKSIZE = 4
+
+# Per-worker state, set up once by _init_worker.
+_pipeline = None
+_store = None
+
+
+def _init_worker(method, scale, store_path, clean=False):
+    global _pipeline, _store
+    cv2.setNumThreads(1)
+    _pipeline = DetectorPipeline.from_preset(method, scale=scale, clean=clean)
+    _store = FrameStore(store_path) if store_path else None
+
+
+def _detect_one(item):
+    """JSON-ready result for one path (or frame store index)."""
+    start = time.perf_counter()
+    if _store is not None:
+        frame = _store[item]
+        key = _store.names[item]
+    else:
+        key = item
+        try:
+            frame = read(item)
+        except FileNotFoundError as e:
+            return {"path": key, "error": f"could not read {e}"}
+    boxes = _pipeline.detect(frame)
+    return {"path": key, "width": frame.shape[1], "height": frame.shape[0],
+            "ms": round((time.perf_counter() - start) * 1000, 2), "boxes": boxes.tolist()}
+
+
+def expand_inputs(inputs):
+    """Image paths for a list of files, directories (their *.png) and globs, sorted, without duplicates."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, "*.png"))))
+        elif any(c in item for c in "*?["):
+            paths.extend(sorted(glob.glob(item)))
+        else:
+            paths.append(item)
+    return list(dict.fromkeys(paths))
+
+
+def run(items, method="canny", scale=1.0, workers=None, store_path=None, chunksize=BATCH_CHUNKSIZE, clean=False):
+    """Yields one result dict per item, in order, computed on a pool of workers."""
+    workers = workers or os.cpu_count() or 1
+    initargs = (method, scale, store_path, clean)
+    if workers == 1:
+        _init_worker(*initargs)
+        yield from map(_detect_one, items)
+        return
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+        yield from pool.imap(_detect_one, items, chunksize=chunksize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="image files, directories, globs or one .frames store")
+    parser.add_argument("--method", choices=[name for name in PRESETS if name != "tree"], default="canny",
+                        help="canny: Canny + close as gui_new.py; adaptive: adaptive threshold as adp.py")
+    parser.add_argument("--scale", type=float, default=1.0, help="detect on a downscaled frame (see pipeline.py)")
+    parser.add_argument("--clean", action="store_true", help="drop nested duplicates and merge fragments (see nms.py)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunksize", type=int, default=BATCH_CHUNKSIZE)
+    parser.add_argument("--output", help="write JSON lines here instead of stdout")
+    args = parser.parse_args()
+
+    store_path = None
+    if len(args.inputs) == 1 and args.inputs[0].endswith(".frames"):
+        store_path = args.inputs[0]
+        with FrameStore(store_path) as store:
+            items = list(range(len(store)))
+    else:
+        items = expand_inputs(args.inputs)
+    if not items:
+        parser.error("no images found")
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    count = failed = 0
+    start = time.perf_counter()
+    try:
+        for result in run(items, args.method, args.scale, args.workers, store_path, args.chunksize, args.clean):
+            out.write(json.dumps(result) + "\n")
+            count += 1
+            failed += "error" in result
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"Processed {count} images ({failed} failed) in {elapsed:.2f}s: {count / elapsed:.1f} images/s "
+          f"with {args.workers or os.cpu_count()} workers", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+One file per crop (CropWriter) vs. one packed archive per capture
+(CropArchive), plus random-access reads by element id.
+
+    python benchmarks/bench_archive.py [image]
+
+Crops are the "tree" preset boxes on test.png (several hundred elements).
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from pipeline import DetectorPipeline, MARGIN, iter_crops, load_frame  # noqa: E402
+from sinks import ArchiveReader, CropArchive, CropWriter  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", nargs="?", default=os.path.join(REPO_ROOT, "test.png"))
+    args = parser.parse_args()
+
+    frame = load_frame(args.image)
+    crops = list(iter_crops(frame, DetectorPipeline.from_preset("tree").detect(frame), MARGIN))
+    order = np.random.default_rng(0).permutation(len(crops)) + 1
+    print(f"{len(crops)} crops from {args.image}")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        with CropWriter(out_dir, workers=1) as writer:
+            for n, (_, c) in enumerate(crops, 1):
+                writer.submit(n, c)
+        write_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for n in order:
+            int(cv2.imread(os.path.join(out_dir, f"{n}.png"), cv2.IMREAD_UNCHANGED).sum())
+        read_ms = (time.perf_counter() - start) * 1000
+        print(f"{'files (png)':<14} write {write_ms:8.2f} ms   random read {read_ms:8.2f} ms   "
+              f"{len(glob.glob(os.path.join(out_dir, '*')))} files")
+
+    for fmt in ("png", "raw"):
+        with tempfile.TemporaryDirectory() as out_dir:
+            path = os.path.join(out_dir, "capture")
+            start = time.perf_counter()
+            with CropArchive(path, fmt=fmt) as archive:
+                for n, (box, c) in enumerate(crops, 1):
+                    archive.submit(n, c, bbox=box)
+            write_ms = (time.perf_counter() - start) * 1000
+            with ArchiveReader(path) as reader:
+                start = time.perf_counter()
+                for n in order:
+                    int(reader[n].sum())
+                read_ms = (time.perf_counter() - start) * 1000
+            print(f"{'archive (' + fmt + ')':<14} write {write_ms:8.2f} ms   random read {read_ms:8.2f} ms   "
+                  f"{len(os.listdir(out_dir))} files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Sequential read -> detect -> encode -> write loop against AsyncDetector.
+
+    python benchmarks/bench_async.py [--frames N] [--workers N]
+
+Both write the margined crops of N frames (test.png and example.png
+alternating) into temp directories; the crop counts must agree.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from async_pipeline import AsyncDetector, DirectorySink, file_source  # noqa: E402
+from ingest import read  # noqa: E402
+from pipeline import MARGIN, DetectorPipeline, crop  # noqa: E402
+from sinks import FORMATS, PNG_COMPRESSION  # noqa: E402
+
+
+def sequential(paths, out_dir, pipeline):
+    count = 0
+    for path in paths:
+        key = os.path.splitext(os.path.basename(path))[0]
+        frame = read(path, color=True)
+        for n, box in enumerate(pipeline.detect(frame).tolist(), start=1):
+            ok, data = cv2.imencode(".png", crop(frame, box, MARGIN), FORMATS["png"](PNG_COMPRESSION))
+            with open(os.path.join(out_dir, f"{key}_{n}.png"), "wb") as f:
+                f.write(data)
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    sources = [os.path.join(REPO_ROOT, "test.png"), os.path.join(REPO_ROOT, "example.png")]
+    pipeline = DetectorPipeline()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(args.frames):
+            path = os.path.join(tmp, f"{i:05d}.png")
+            with open(sources[i % 2], "rb") as src, open(path, "wb") as dst:
+                dst.write(src.read())
+            paths.append(path)
+
+        seq_dir = os.path.join(tmp, "seq")
+        os.makedirs(seq_dir)
+        start = time.perf_counter()
+        count = sequential(paths, seq_dir, pipeline)
+        elapsed = time.perf_counter() - start
+        print(f"sequential  {elapsed:6.2f}s  {args.frames / elapsed:6.1f} frames/s  {count} crops")
+
+        detector = AsyncDetector(pipeline, DirectorySink(os.path.join(tmp, "async")), workers=args.workers)
+        stats = asyncio.run(detector.run(file_source(paths)))
+        print(f"async       {stats['seconds']:6.2f}s  {stats['frames_per_sec']:6.1f} frames/s  "
+              f"{stats['elements']} crops ({len(os.listdir(os.path.join(tmp, 'async')))} files)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Interactive-element decisions: the autopy keyword loop against InteractiveClassifier.
+
+    python benchmarks/bench_classifier.py [--records N] [--runs N] [--seed N]
+
+Records are (control_type, name, automation_id, class_name) tuples drawn
+from vocabularies that repeat the way real UI trees do and include the
+awkward cases ("Icons", "silicon", "go_back", "category"). Every variant
+must make the same decision as the loop for every record:
+
+    loop        the loop from autopy2.py, per record
+    uncached    InteractiveClassifier.is_interactive without the memo
+    memoized    is_interactive (memo cleared before each run)
+    snapshot    classify() over an ElementSnapshot of the records
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from classifier import InteractiveClassifier  # noqa: E402
+from snapshot import ElementSnapshot  # noqa: E402
+
+# as in autopy2.py, which needs pywinauto to import
+INTERACTIVE_TYPES = {
+    "Button", "CheckBox", "RadioButton", "MenuItem", "ListItem",
+    "Hyperlink", "TabItem", "ComboBox", "Spinner", "SplitButton",
+    "TreeItem", "Edit"
+}
+INTERACTIVE_KEYWORDS = {"button", "icon", "click", "link", "select", "menu", "tab", "choose", "add", "remove", "edit", "go", "search", "play", "option"}
+
+CONTROL_TYPES = ["Text", "Pane", "Group", "Image", "Custom", "Document", "ToolBar", "Button", "Edit", "ListItem"]
+NAME_WORDS = ["", "", "OK", "Cancel", "Icons", "App icon", "silicon", "Iconic", "Home", "Settings", "Address",
+              "Table", "Category", "Playlist", "Download", "Options", "Go back", "Title", "Status", "Ready"]
+AUTO_IDS = ["", "", "", "", "titleBar", "statusText", "go_back", "SearchBox", "content", "panel1", "icon_1"]
+CLASS_NAMES = ["", "TextBlock", "Grid", "ScrollViewer", "Chrome_WidgetWin_1", "DirectUIHWND",
+               "NamespaceTreeControl", "ToolbarWindow32", "Static", "SysListView32"]
+
+
+def loop_is_interactive(control_type, name, auto_id, class_name):
+    """The decision exactly as autopy2.py made it before InteractiveClassifier."""
+    name = (name or "").lower()
+    auto_id = (auto_id or "").lower()
+    class_name = (class_name or "").lower()
+    if control_type in INTERACTIVE_TYPES:
+        return True
+    element_text = f"{name} {auto_id} {class_name}"
+    for keyword in INTERACTIVE_KEYWORDS:
+        if keyword in element_text:
+            if keyword == "icon" and not re.search(r'\bicon\b', element_text):
+                continue
+            return True
+    return False
+
+
+def make_records(count, seed):
+    rng = random.Random(seed)
+    records = []
+    for n in range(count):
+        name = rng.choice(NAME_WORDS)
+        if rng.random() < 0.2:
+            name = f"{name} {n % 500}".strip()      # some names are (almost) unique
+        records.append((rng.choice(CONTROL_TYPES), name, rng.choice(AUTO_IDS), rng.choice(CLASS_NAMES)))
+    return records
+
+
+def time_it(fn, runs):
+    fn()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    records = make_records(args.records, args.seed)
+    classifier = InteractiveClassifier(INTERACTIVE_TYPES, INTERACTIVE_KEYWORDS)
+    snapshot = ElementSnapshot.from_rows(((0, 0, 10, 10), *record, False) for record in records)
+
+    def memoized():
+        classifier.is_interactive.cache_clear()
+        return [classifier.is_interactive(*record) for record in records]
+
+    variants = {
+        "loop": lambda: [loop_is_interactive(*record) for record in records],
+        "uncached": lambda: [classifier._is_interactive(*record) for record in records],
+        "memoized": memoized,
+        "snapshot": lambda: classifier.classify(snapshot).tolist(),
+    }
+    expected = variants["loop"]()
+    print(f"{len(records)} records, {len(set(records))} distinct, {sum(expected)} interactive, {args.runs} runs")
+    loop_time = None
+    for name, fn in variants.items():
+        if fn() != expected:
+            raise SystemExit(f"{name}: decisions differ from the keyword loop")
+        times = time_it(fn, args.runs)
+        loop_time = loop_time or np.median(times)
+        rate = len(records) / np.median(times) / 1000
+        print(f"{name:<9} {np.median(times):8.2f} ms   {rate:6.2f} M records/s   "
+              f"speedup {loop_time / np.median(times):6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Contour-count scaling of the per-contour Python loop (contourArea,
+boundingRect, moments) against the vectorized contour_stats() pass.
+
+    python benchmarks/bench_contour_stats.py [--counts 100 1000 5000 20000]
+
+Each run draws N small outlined shapes on a synthetic mask, traces them with
+RETR_EXTERNAL and times only the measuring + MIN/MAX area filtering step.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from pipeline import DetectorPipeline, contour_stats  # noqa: E402
+
+CELL = 24
+
+
+def synthetic_contours(count, seed=0):
+    """Traces count outlined rectangles/ellipses of random size on a grid."""
+    rng = np.random.default_rng(seed)
+    cols = int(np.ceil(np.sqrt(count)))
+    rows = int(np.ceil(count / cols))
+    mask = np.zeros((rows * CELL, cols * CELL), dtype=np.uint8)
+    for n in range(count):
+        r, c = divmod(n, cols)
+        x, y = c * CELL + 2, r * CELL + 2
+        w, h = rng.integers(4, CELL - 4, size=2)
+        if n % 2:
+            cv2.rectangle(mask, (int(x), int(y)), (int(x + w), int(y + h)), 255, 1)
+        else:
+            cv2.ellipse(mask, (int(x + w // 2), int(y + h // 2)), (int(w // 2), int(h // 2)), 0, 0, 360, 255, 1)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return contours
+
+
+def loop_filter(contours, min_area, max_area):
+    """The loop every script used to run."""
+    found = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if min_area < area < max_area:
+            x, y, w, h = cv2.boundingRect(contour)
+            M = cv2.moments(contour)
+            if M["m00"] != 0:
+                cX, cY = M["m10"] / M["m00"], M["m01"] / M["m00"]
+            else:
+                cX, cY = x + w // 2, y + h // 2
+            found.append((x, y, w, h, area, cX, cY))
+    return found
+
+
+def best_of(fn, runs):
+    """Smallest wall time of fn over runs calls, in ms."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    pipeline = DetectorPipeline(min_area=20, max_area=15000)
+
+    def vectorized(contours):
+        stats = contour_stats(contours)
+        return stats[pipeline.area_mask(stats["area"])]
+
+    print(f"{'contours':>9} {'loop ms':>10} {'vector ms':>10} {'speedup':>8} {'kept':>7}")
+    for count in args.counts:
+        contours = synthetic_contours(count)
+        looped = loop_filter(contours, pipeline.min_area, pipeline.max_area)
+        kept = vectorized(contours)
+        assert len(looped) == len(kept), (len(looped), len(kept))
+        loop_ms = best_of(lambda: loop_filter(contours, pipeline.min_area, pipeline.max_area), args.runs)
+        vector_ms = best_of(lambda: vectorized(contours), args.runs)
+        print(f"{len(contours):>9} {loop_ms:>10.2f} {vector_ms:>10.2f} {loop_ms / vector_ms:>7.1f}x {len(kept):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Memory and latency of cropping every detected element from one frame:
+full-frame copy per element (the old scripts) vs. views vs. crop-only copies.
+
+    python benchmarks/bench_crops.py [image] [--runs N]
+
+Boxes come from the "tree" preset (ele.py settings), which yields several
+hundred elements on test.png. Crops are consumed one at a time (summed and
+dropped), the way the scripts write and discard them; peak memory is the
+tracemalloc high-water mark, which includes NumPy allocations.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from pipeline import DetectorPipeline, MARGIN, crop, load_frame  # noqa: E402
+
+
+def legacy_crops(frame, boxes):
+    """img.copy() then slice, once per element."""
+    for x, y, w, h in boxes.tolist():
+        img_to_save = frame.copy()
+        yield img_to_save[max(0, y - MARGIN):y + h + MARGIN, max(0, x - MARGIN):x + w + MARGIN]
+
+
+def view_crops(frame, boxes):
+    for box in boxes:
+        yield crop(frame, box, MARGIN)
+
+
+def copied_crops(frame, boxes):
+    for box in boxes:
+        yield crop(frame, box, MARGIN, copy=True)
+
+
+def consume(crops):
+    return sum(int(c.sum()) for c in crops)
+
+
+def measure(fn, frame, boxes, runs):
+    """(best ms, peak MB, checksum) for consuming fn(frame, boxes)."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        checksum = consume(fn(frame, boxes))
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    consume(fn(frame, boxes))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 2 ** 20, checksum
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", nargs="?", default=os.path.join(REPO_ROOT, "test.png"))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    frame = load_frame(args.image)
+    boxes = DetectorPipeline.from_preset("tree").detect(frame)
+    print(f"{args.image}: {frame.shape[1]}x{frame.shape[0]}, {frame.nbytes / 2 ** 20:.1f} MB frame, "
+          f"{len(boxes)} elements")
+
+    checksums = set()
+    for name, fn in (("frame copy", legacy_crops), ("views", view_crops), ("crop copy", copied_crops)):
+        ms, peak_mb, checksum = measure(fn, frame, boxes, args.runs)
+        checksums.add(checksum)
+        print(f"{name:<12} {ms:9.2f} ms   peak {peak_mb:9.2f} MB")
+    assert len(checksums) == 1, "crop variants disagree"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Saving the crops of repeated captures with and without the dHash crop cache.
+
+    python benchmarks/bench_dedup.py [image] [--frames N] [--runs N]
+
+Each run writes the crops of the same frame --frames times, as a capture loop
+over an unchanged window would. Without a cache every crop is encoded and
+written each time; with a CropCache only the crops submitted before the
+first copy of them is written are, the rest are found by hash and confirmed
+by comparing with the saved file. Also reports the per-crop cost of dhash()
+against dhash_many() over the whole frame.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from dedup import CropCache, dhash, dhash_many  # noqa: E402
+from ingest import read  # noqa: E402
+from pipeline import MARGIN, DetectorPipeline, crop  # noqa: E402
+from sinks import CropWriter  # noqa: E402
+
+
+def time_it(fn, runs):
+    fn()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def write_frames(crops, frames, cache):
+    with tempfile.TemporaryDirectory() as tmp:
+        with CropWriter(tmp, cache=cache) as writer:
+            for frame in range(frames):
+                for n, image in enumerate(crops, start=1):
+                    writer.submit(f"{frame:04d}_{n}", image)
+        return writer.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", nargs="?", default=os.path.join(REPO_ROOT, "test.png"))
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    frame = read(args.image, color=True)
+    crops = [crop(frame, box, MARGIN) for box in DetectorPipeline().detect(frame)]
+    print(f"{args.image}: {len(crops)} crops, {args.frames} frames per run, {args.runs} runs")
+
+    single = time_it(lambda: [dhash(image) for image in crops], args.runs)
+    batch = time_it(lambda: dhash_many(crops), args.runs)
+    per_crop = 1000 / max(len(crops), 1)
+    print(f"dhash        {single.mean() * per_crop:7.1f} us/crop")
+    print(f"dhash_many   {batch.mean() * per_crop:7.1f} us/crop")
+
+    for name, make_cache in (("no cache", lambda: None), ("CropCache", CropCache)):
+        stats = write_frames(crops, args.frames, make_cache())
+        times = time_it(lambda: write_frames(crops, args.frames, make_cache()), args.runs)
+        print(f"{name:<12} mean {times.mean():8.2f} ms   median {np.median(times):8.2f} ms   "
+              f"{stats['written']} written, {stats['duplicates']} skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+PNG decode against a memory-mapped frame store for a batch of captures.
+
+    python benchmarks/bench_framestore.py [--frames N] [--mode gray|bgr]
+
+Builds a temp directory of N captures (test.png and example.png alternating),
+converts it with framestore.convert_pngs, then times reading every frame
+and reading + detecting every frame both ways. Boxes must match.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from framestore import FrameStore, convert_pngs  # noqa: E402
+from ingest import read  # noqa: E402
+from pipeline import DetectorPipeline  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--mode", choices=("gray", "bgr"), default="gray")
+    args = parser.parse_args()
+    pipeline = DetectorPipeline()
+    sources = [os.path.join(REPO_ROOT, "test.png"), os.path.join(REPO_ROOT, "example.png")]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        png_dir = os.path.join(tmp, "captures")
+        os.makedirs(png_dir)
+        for i in range(args.frames):
+            shutil.copy(sources[i % 2], os.path.join(png_dir, f"{i:05d}.png"))
+        paths = sorted(os.path.join(png_dir, name) for name in os.listdir(png_dir))
+        store_path = os.path.join(tmp, "captures.frames")
+
+        start = time.perf_counter()
+        convert_pngs(png_dir, store_path, args.mode)
+        convert = time.perf_counter() - start
+        png_mb = sum(os.path.getsize(p) for p in paths) / 2 ** 20
+        print(f"{args.frames} frames: PNGs {png_mb:.1f} MB, store {os.path.getsize(store_path) / 2 ** 20:.1f} MB "
+              f"({args.mode}), converted in {convert:.2f}s")
+
+        def run(name, frames, detect):
+            start = time.perf_counter()
+            boxes = [pipeline.detect(f) if detect else f.shape for f in frames()]
+            elapsed = time.perf_counter() - start
+            print(f"{name:<22} {elapsed * 1000 / args.frames:8.2f} ms/frame   {args.frames / elapsed:8.1f} frames/s")
+            return boxes
+
+        color = args.mode != "gray"
+        store = FrameStore(store_path)
+        run("png read", lambda: (read(p, color) for p in paths), False)
+        run("store read", lambda: iter(store), False)
+        from_png = run("png read + detect", lambda: (read(p, color) for p in paths), True)
+        from_store = run("store read + detect", lambda: iter(store), True)
+        print("boxes match:", all(np.array_equal(a, b) for a, b in zip(from_png, from_store)))
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
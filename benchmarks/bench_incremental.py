@@ -0,0 +1,86 @@
+"""
+Continuous monitoring: IncrementalDetector.update() vs. a full detect() on
+every frame, for a stream where only a tooltip appears, moves and vanishes.
+
+    python benchmarks/bench_incremental.py [image] [--frames N] [--size WxH] [--preset tree --clean]
+
+Every frame's incremental result is checked against a full detection.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from incremental import IncrementalDetector  # noqa: E402
+from pipeline import PRESETS, DetectorPipeline, box_iou, load_frame  # noqa: E402
+
+
+def tooltip_stream(base, count, seed=0):
+    """base, then frames with a small tooltip drawn at random places, with some unchanged repeats."""
+    rng = np.random.default_rng(seed)
+    height, width = base.shape[:2]
+    yield base
+    frame = base
+    for n in range(count - 1):
+        if n % 3 == 2:
+            yield frame
+            continue
+        x, y = int(rng.integers(0, width - 170)), int(rng.integers(0, height - 30))
+        frame = base.copy()
+        cv2.rectangle(frame, (x, y), (x + 160, y + 28), (225, 255, 255), -1)
+        cv2.rectangle(frame, (x, y), (x + 160, y + 28), (0, 0, 0), 1)
+        cv2.putText(frame, f"tooltip {n}", (x + 6, y + 19), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1)
+        yield frame
+
+
+def same(a, b):
+    if len(a) != len(b):
+        return False
+    return not len(a) or bool((box_iou(a, b).max(axis=1) > 0.999).all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", nargs="?", default=os.path.join(REPO_ROOT, "test.png"))
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--size", default=None, help="resize the base frame, e.g. 3840x2160")
+    parser.add_argument("--preset", choices=list(PRESETS), default="canny")
+    parser.add_argument("--clean", action="store_true", help="clean=True pipeline (see nms.clean_boxes)")
+    args = parser.parse_args()
+
+    base = load_frame(args.image)
+    if args.size:
+        base = cv2.resize(base, tuple(int(v) for v in args.size.split("x")), interpolation=cv2.INTER_LINEAR)
+    frames = list(tooltip_stream(base, args.frames))
+
+    full = DetectorPipeline.from_preset(args.preset, clean=args.clean)
+    incremental = IncrementalDetector(full)
+    full_ms, inc_ms, dirty, mismatches = [], [], [], 0
+    for frame in frames:
+        start = time.perf_counter()
+        reference = full.detect(frame)
+        full_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        boxes = incremental.update(frame)
+        inc_ms.append((time.perf_counter() - start) * 1000)
+        dirty.append(incremental.last_dirty_fraction)
+        mismatches += not same(reference, boxes)
+
+    # the first update is always a full detection
+    full_ms, inc_ms = np.array(full_ms[1:]), np.array(inc_ms[1:])
+    print(f"{args.image} at {base.shape[1]}x{base.shape[0]}, {len(frames)} frames, "
+          f"mean dirty area {np.mean(dirty[1:]):.1%}")
+    print(f"full detect   mean {full_ms.mean():8.2f} ms   median {np.median(full_ms):8.2f} ms")
+    print(f"incremental   mean {inc_ms.mean():8.2f} ms   median {np.median(inc_ms):8.2f} ms   "
+          f"speedup {full_ms.mean() / inc_ms.mean():.1f}x")
+    print(f"frames differing from a full detection: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Time and peak memory of getting a grayscale frame for detection, the way the
+scripts did it against the ingest module.
+
+    python benchmarks/bench_ingest.py [image] [--runs N]
+
+"legacy" is Image.open -> np.array -> cvtColor(to BGR) -> cvtColor(BGR2GRAY).
+The ingest variants read the file, decode from in-memory bytes or an mmap,
+or convert a PIL image / raw BGRA grab with a single cvtColor. Every variant
+is checked to produce the same gray frame as legacy (with the RGBA channel
+order handled correctly).
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import ingest  # noqa: E402
+
+
+def legacy_gray(path):
+    img = np.array(Image.open(path))
+    code = cv2.COLOR_RGBA2BGR if img.ndim == 3 and img.shape[2] == 4 else cv2.COLOR_RGB2BGR
+    img = cv2.cvtColor(img, code)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+def time_it(fn, runs):
+    """Per-call times in ms over runs calls (after one warm-up) and the traced peak of one call in MB."""
+    fn()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return np.array(times), peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", nargs="?", default=os.path.join(REPO_ROOT, "test.png"))
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    with open(args.image, "rb") as f:
+        data = f.read()
+    expected = legacy_gray(args.image)
+    bgra = cv2.cvtColor(ingest.read(args.image, color=True), cv2.COLOR_BGR2BGRA)
+    height, width = bgra.shape[:2]
+    raw = bgra.tobytes()
+
+    variants = {
+        "legacy": lambda: legacy_gray(args.image),
+        "read": lambda: ingest.read(args.image),
+        "read color": lambda: ingest.read(args.image, color=True),
+        "decode bytes": lambda: ingest.decode(data),
+        "read_mapped": lambda: ingest.read_mapped(args.image),
+        "from_pil": lambda: ingest.from_pil(Image.open(args.image)),
+        "raw legacy": lambda: cv2.cvtColor(cv2.cvtColor(np.frombuffer(raw, np.uint8).reshape(height, width, 4).copy(),
+                                                        cv2.COLOR_BGRA2BGR), cv2.COLOR_BGR2GRAY),
+        "from_raw": lambda: ingest.from_raw(raw, width, height),
+    }
+    print(f"{args.image}: {width}x{height}, {args.runs} runs")
+    for name, fn in variants.items():
+        times, peak = time_it(fn, args.runs)
+        result = fn()
+        same = "" if result.ndim == 3 else ("same" if np.array_equal(result, expected) else "DIFFERENT")
+        print(f"{name:<13} mean {times.mean():7.2f} ms   median {np.median(times):7.2f} ms   "
+              f"peak {peak:6.2f} MB   {same}")
+
+
+if __name__ == "__main__":
+    main()
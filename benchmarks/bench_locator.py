@@ -0,0 +1,71 @@
+"""
+Locating every crop in test/ on test.png: one full-resolution search per
+template with the frame re-read each time (what the locateOnScreen loop in
+contours1.py does) vs. TemplateLocator.locate_all() on one frame.
+
+    python benchmarks/bench_locator.py [frame] [template glob]
+
+The crops in test/ were written by the scripts from a PIL-decoded frame, so
+the frame is decoded the same way here for the colours to line up.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from locator import LOCATE_CONFIDENCE, TemplateLocator, load_templates, to_gray  # noqa: E402
+
+
+def grab(path):
+    return cv2.cvtColor(np.array(Image.open(path)), cv2.COLOR_BGRA2BGR)
+
+
+def per_template(path, templates):
+    """Re-grab, convert and scan the whole frame once per template."""
+    found = {}
+    for name, template in templates.items():
+        frame_gray = to_gray(grab(path))
+        result = cv2.matchTemplate(frame_gray, to_gray(template), cv2.TM_CCOEFF_NORMED)
+        _, score, _, (x, y) = cv2.minMaxLoc(result)
+        found[name] = (x, y, score) if score >= LOCATE_CONFIDENCE else None
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("frame", nargs="?", default=os.path.join(REPO_ROOT, "test.png"))
+    parser.add_argument("templates", nargs="?", default=os.path.join(REPO_ROOT, "test", "*.png"))
+    args = parser.parse_args()
+
+    templates = load_templates(args.templates)
+    start = time.perf_counter()
+    expected = per_template(args.frame, templates)
+    loop_ms = (time.perf_counter() - start) * 1000
+
+    results = {}
+    for label, kwargs in (("locator, 1 thread", dict(workers=1)), ("locator, pool", dict()),
+                          ("locator, no pyramid", dict(scale=1.0))):
+        locator = TemplateLocator(templates, **kwargs)
+        start = time.perf_counter()
+        results[label] = locator.locate_all(grab(args.frame))
+        results[label + " ms"] = (time.perf_counter() - start) * 1000
+
+    print(f"{len(templates)} templates on {args.frame}")
+    print(f"{'per-template loop':<22} {loop_ms:8.2f} ms   found {sum(v is not None for v in expected.values())}")
+    for label in ("locator, 1 thread", "locator, pool", "locator, no pyramid"):
+        matches = results[label]
+        agree = all((m is None) == (expected[n] is None) and (m is None or (m.left, m.top) == expected[n][:2])
+                    for n, m in matches.items())
+        print(f"{label:<22} {results[label + ' ms']:8.2f} ms   found {sum(m is not None for m in matches.values())}"
+              f"   {'same positions' if agree else 'POSITIONS DIFFER'}")
+
+
+if __name__ == "__main__":
+    main()
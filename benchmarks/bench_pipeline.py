@@ -0,0 +1,97 @@
+"""
+Per-frame latency of DetectorPipeline.detect() against the original
+detection.py behaviour on test.png.
+
+    python benchmarks/bench_pipeline.py [image] [--runs N]
+
+"legacy" replays detect() from detection.py without the GUI: PIL decode,
+BGRA->BGR->gray, kernel rebuilt every call, per-contour area/bbox/moments,
+a full-frame copy per element and a PNG write per crop (into a temp dir).
+"legacy-no-io" is the same minus decode and writes, so it isolates the
+per-frame compute the pipeline replaces.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from pipeline import DetectorPipeline  # noqa: E402
+
+MIN_CONTOUR_AREA = 100
+MAX_CONTOUR_AREA = 15000
+MORPH_KERNEL_SIZE = (12, 12)
+MARGIN = 5
+
+
+def legacy_detect(img, out_dir=None):
+    """detect() from detection.py on an already converted BGR frame, minus the GUI."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    edges = cv2.Canny(gray, 50, 150)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, MORPH_KERNEL_SIZE)
+    closed_edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel, iterations=1)
+    contours, _ = cv2.findContours(closed_edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    img_height, img_width = img.shape[:2]
+    boxes = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if MIN_CONTOUR_AREA < area < MAX_CONTOUR_AREA:
+            x, y, w, h = cv2.boundingRect(contour)
+            cv2.moments(contour)
+            boxes.append((x, y, w, h))
+            if out_dir is not None:
+                x_m, y_m = max(0, x - MARGIN), max(0, y - MARGIN)
+                x_end, y_end = min(img_width, x + w + MARGIN), min(img_height, y + h + MARGIN)
+                img_to_save = img.copy()
+                cv2.imwrite(os.path.join(out_dir, f"{len(boxes)}.png"), img_to_save[y_m:y_end, x_m:x_end])
+    return boxes
+
+
+def legacy_script(path, out_dir):
+    """The whole per-frame path of detection.py: decode, convert, detect, save."""
+    img = cv2.cvtColor(np.array(Image.open(path)), cv2.COLOR_BGRA2BGR)
+    return legacy_detect(img, out_dir)
+
+
+def time_it(fn, runs):
+    """Runs fn runs times (after one warm-up) and returns per-call times in ms."""
+    fn()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def report(name, times, count):
+    print(f"{name:<16} mean {times.mean():8.2f} ms   median {np.median(times):8.2f} ms   "
+          f"p95 {np.percentile(times, 95):8.2f} ms   elements {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", nargs="?", default=os.path.join(REPO_ROOT, "test.png"))
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    frame = cv2.cvtColor(np.array(Image.open(args.image)), cv2.COLOR_BGRA2BGR)
+    pipeline = DetectorPipeline()
+
+    print(f"{args.image}: {frame.shape[1]}x{frame.shape[0]}, {args.runs} runs")
+    with tempfile.TemporaryDirectory() as out_dir:
+        count = len(legacy_script(args.image, out_dir))
+        report("legacy", time_it(lambda: legacy_script(args.image, out_dir), args.runs), count)
+    report("legacy-no-io", time_it(lambda: legacy_detect(frame), args.runs), len(legacy_detect(frame)))
+    report("pipeline", time_it(lambda: pipeline.detect(frame), args.runs), len(pipeline.detect(frame)))
+
+
+if __name__ == "__main__":
+    main()
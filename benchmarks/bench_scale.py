@@ -0,0 +1,78 @@
+"""
+Accuracy vs. speed of downscaled detection (DetectorPipeline(scale=...))
+against the full-resolution result.
+
+    python benchmarks/bench_scale.py [images...] [--scales 1 0.75 0.5 0.33 0.25]
+
+Boxes are matched one-to-one to the full-resolution boxes greedily by IoU;
+a pair counts when IoU >= 0.5. Besides the given images, test.png is also
+run upscaled to 4K to show the effect on large frames.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from pipeline import DetectorPipeline, box_iou, load_frame  # noqa: E402
+
+MATCH_IOU = 0.5
+
+
+def match(reference, boxes):
+    """Greedy one-to-one matching; returns the IoU of every matched pair."""
+    iou = box_iou(reference, boxes)
+    matched = []
+    while iou.size and iou.max() >= MATCH_IOU:
+        i, j = np.unravel_index(iou.argmax(), iou.shape)
+        matched.append(iou[i, j])
+        iou[i, :] = -1
+        iou[:, j] = -1
+    return np.array(matched)
+
+
+def best_ms(fn, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("images", nargs="*",
+                        default=[os.path.join(REPO_ROOT, "test.png"), os.path.join(REPO_ROOT, "example.png")])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 0.75, 0.5, 0.33, 0.25])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = [(os.path.basename(p), load_frame(p)) for p in args.images]
+    frames.append(("test.png @4K", cv2.resize(load_frame(os.path.join(REPO_ROOT, "test.png")), (3840, 2160),
+                                              interpolation=cv2.INTER_LINEAR)))
+
+    for label, frame in frames:
+        reference = DetectorPipeline().detect(frame)
+        full_ms = best_ms(lambda: DetectorPipeline().detect(frame), args.runs)
+        print(f"\n{label} ({frame.shape[1]}x{frame.shape[0]}): {len(reference)} elements at full resolution")
+        print(f"{'scale':>6} {'ms':>8} {'speedup':>8} {'found':>6} {'precision':>10} {'recall':>7} {'mean IoU':>9}")
+        for scale in args.scales:
+            pipeline = DetectorPipeline(scale=scale)
+            boxes = pipeline.detect(frame)
+            ms = best_ms(lambda: pipeline.detect(frame), args.runs)
+            ious = match(reference, boxes)
+            precision = len(ious) / len(boxes) if len(boxes) else 1.0
+            recall = len(ious) / len(reference) if len(reference) else 1.0
+            mean_iou = ious.mean() if len(ious) else 0.0
+            print(f"{scale:>6.2f} {ms:>8.2f} {full_ms / ms:>7.1f}x {len(boxes):>6} {precision:>10.2f} "
+                  f"{recall:>7.2f} {mean_iou:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Sequential against threaded scanning of several windows.
+
+    python benchmarks/bench_scanner.py [--windows N] [--elements N] [--delay-ms MS] [--workers 1,2,4,8]
+
+The desktop is fakes.fake_desktop: every property read sleeps --delay-ms,
+like a cross-process UI Automation call, so threads overlap the waits.
+Each worker count must produce exactly the elements, in the same order,
+as the single-worker scan. A second run adds one window that never
+answers, to show the scan finishing after the window budget instead of
+hanging.
+"""
+import argparse
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from fakes import fake_desktop  # noqa: E402
+from scanner import WindowScanner  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--windows", type=int, default=8)
+    parser.add_argument("--elements", type=int, default=200)
+    parser.add_argument("--delay-ms", type=float, default=0.5)
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--budget", type=float, default=1.0, help="window budget of the hung-window run, seconds")
+    args = parser.parse_args()
+
+    desktop = fake_desktop(args.windows, args.elements, args.delay_ms / 1000)
+    print(f"{args.windows} windows x {args.elements} elements, {args.delay_ms:g} ms per property read")
+    expected = None
+    base = None
+    for workers in (int(w) for w in args.workers.split(",")):
+        scanner = WindowScanner(workers=workers, initializer=None)
+        scans = scanner.scan(desktop)
+        elements = [(scan.index, element) for scan in scans for element in scan.elements]
+        if expected is None:
+            expected = elements
+        elif elements != expected:
+            raise SystemExit(f"{workers} workers: elements or their order differ from the first run")
+        base = base or scanner.seconds
+        print(f"{workers:2d} workers  {scanner.seconds * 1000:8.1f} ms   {len(elements)} elements   "
+              f"speedup {base / scanner.seconds:5.1f}x")
+
+    hung = fake_desktop(args.windows, args.elements, args.delay_ms / 1000, hung=1)
+    scanner = WindowScanner(workers=4, window_budget=args.budget, budget_grace=args.budget / 2, initializer=None)
+    start = time.perf_counter()
+    scans = scanner.scan(hung)
+    timed_out = [scan.title for scan in scans if scan.timed_out]
+    print(f"one hung window, budget {args.budget:g} s: finished in {time.perf_counter() - start:.2f} s, "
+          f"{sum(len(scan.elements) for scan in scans)} elements, timed out: {', '.join(timed_out) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Element-by-element property reads against one bulk snapshot.
+
+    python benchmarks/bench_snapshot.py [--elements N] [--call-us US] [--runs N]
+
+The window is fakes.synthetic_window. Each property read on an
+element and each descendants() call costs --call-us microseconds (busy
+wait), standing in for the cross-process round trip of a real UI
+Automation call. WrapperProvider pays it per property per element, as the
+autopy loops do; FakeProvider pays it once per snapshot, as
+CacheRequestProvider's FindAllBuildCache does. The time the bulk call itself
+takes inside the target application is not modelled. Also times the
+autopy2 visibility/size/control-type filter over the snapshot table.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from fakes import FakeProvider, FakeWindow, SlowElement, synthetic_window, wait  # noqa: E402
+from snapshot import WrapperProvider  # noqa: E402
+
+# as in autopy2.py, which needs pywinauto to import
+INTERACTIVE_TYPES = {
+    "Button", "CheckBox", "RadioButton", "MenuItem", "ListItem",
+    "Hyperlink", "TabItem", "ComboBox", "Spinner", "SplitButton",
+    "TreeItem", "Edit"
+}
+
+
+class SlowWindow(FakeWindow):
+    delay = 0.0
+
+    def descendants(self):
+        wait(self.delay, busy=True)
+        return super().descendants()
+
+
+def time_it(fn, runs):
+    fn()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--elements", type=int, default=2000)
+    parser.add_argument("--call-us", type=float, default=20.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    delay = SlowWindow.delay = args.call_us / 1e6
+    plain = synthetic_window(args.elements)
+    slow = SlowWindow(plain.rectangle(), [SlowElement(e, delay, busy=True) for e in plain.descendants()])
+    print(f"{args.elements} elements, {args.call_us:g} us per cross-process call, {args.runs} runs")
+
+    wrapper = WrapperProvider()
+    bulk = FakeProvider(latency=delay)
+    per_element = time_it(lambda: wrapper.snapshot(slow), args.runs)
+    one_call = time_it(lambda: bulk.snapshot(plain), args.runs)
+    print(f"per element  {np.median(per_element):9.2f} ms   {wrapper.calls // (args.runs + 1)} calls per snapshot")
+    print(f"bulk         {np.median(one_call):9.2f} ms   {bulk.calls // (args.runs + 1)} call per snapshot   "
+          f"speedup {np.median(per_element) / np.median(one_call):.1f}x")
+
+    snapshot = bulk.snapshot(plain)
+
+    def table_filter():
+        rects = snapshot.rects
+        shown = (snapshot.visible & (snapshot.widths > 1) & (snapshot.heights > 1) &
+                 (rects[:, 0] >= -50) & (rects[:, 1] >= -50))
+        return np.flatnonzero(shown & snapshot.isin("control_type", INTERACTIVE_TYPES))
+
+    filtered = time_it(table_filter, args.runs)
+    print(f"table filter {np.median(filtered):9.3f} ms   {len(table_filter())} interactive by control type")
+
+
+if __name__ == "__main__":
+    main()
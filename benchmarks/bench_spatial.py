@@ -0,0 +1,77 @@
+"""
+GridIndex point, rectangle and k-nearest queries against brute force over
+the box array.
+
+    python benchmarks/bench_spatial.py [--boxes N] [--queries N]
+
+Boxes are random UI-sized rectangles on a 3840x2160 screen; every indexed
+answer is checked against the brute-force one.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from spatial import GridIndex  # noqa: E402
+
+WIDTH, HEIGHT = 3840, 2160
+
+
+def brute_hit(boxes, x, y):
+    inside = (boxes[:, 0] <= x) & (x < boxes[:, 0] + boxes[:, 2]) & (boxes[:, 1] <= y) & (y < boxes[:, 1] + boxes[:, 3])
+    hits = np.flatnonzero(inside)
+    return hits[np.argsort(boxes[hits, 2] * boxes[hits, 3], kind="stable")]
+
+
+def brute_query(boxes, rect):
+    x, y, w, h = rect
+    return np.flatnonzero((boxes[:, 0] < x + w) & (boxes[:, 0] + boxes[:, 2] > x) &
+                          (boxes[:, 1] < y + h) & (boxes[:, 1] + boxes[:, 3] > y))
+
+
+def brute_nearest(index, x, y, k):
+    dist = index.distances(x, y)
+    return np.lexsort((np.arange(len(dist)), dist))[:k]
+
+
+def timed(fn, args):
+    start = time.perf_counter()
+    results = [fn(*a) for a in args]
+    return results, (time.perf_counter() - start) * 1e6 / len(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--boxes", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    w = rng.integers(8, 200, args.boxes)
+    h = rng.integers(8, 60, args.boxes)
+    boxes = np.stack([rng.integers(0, WIDTH - w), rng.integers(0, HEIGHT - h), w, h], axis=1)
+
+    start = time.perf_counter()
+    index = GridIndex(boxes)
+    print(f"{args.boxes} boxes, cell {index.cell_size}px, built in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    points = [(int(x), int(y)) for x, y in zip(rng.integers(0, WIDTH, args.queries), rng.integers(0, HEIGHT, args.queries))]
+    rects = [(x, y, 400, 300) for x, y in points]
+    cases = [
+        ("hit", index.hit, lambda x, y: brute_hit(boxes, x, y), points),
+        ("query 400x300", index.query, lambda r: brute_query(boxes, r), [(r,) for r in rects]),
+        ("nearest k=5", lambda x, y: index.nearest(x, y, 5), lambda x, y: brute_nearest(index, x, y, 5), points),
+    ]
+    for name, fast, slow, queries in cases:
+        got, fast_us = timed(fast, queries)
+        want, slow_us = timed(slow, queries)
+        same = all(np.array_equal(a, b) for a, b in zip(got, want))
+        print(f"{name:<14} index {fast_us:8.1f} us   brute force {slow_us:8.1f} us   {'same' if same else 'DIFFERENT'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+DetectorPipeline.stream() against building every crop up front the way
+detect() in detection.py does.
+
+    python benchmarks/bench_stream.py [image] [--runs N] [--order top|left|area|score]
+
+"all crops" detects, then makes a copy of every margined crop before the
+caller sees any of them; "first element" is next(stream(...)), which for
+order=top only detects the first band of rows. "full stream" drains the
+generator, and must give the elements of elements() in the same order.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from ingest import read  # noqa: E402
+from pipeline import ELEMENT_ORDERS, MARGIN, DetectorPipeline, crop  # noqa: E402
+
+
+def time_it(fn, runs):
+    fn()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", nargs="?", default=os.path.join(REPO_ROOT, "test.png"))
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--order", choices=[o for o in ELEMENT_ORDERS if o], default="top")
+    args = parser.parse_args()
+
+    frame = read(args.image, color=True)
+    pipeline = DetectorPipeline()
+
+    def all_crops():
+        return [crop(frame, box, MARGIN, copy=True) for box in pipeline.detect(frame)]
+
+    variants = {
+        "all crops": all_crops,
+        "first element": lambda: next(pipeline.stream(frame, args.order, MARGIN)),
+        "full stream": lambda: list(pipeline.stream(frame, args.order, MARGIN)),
+    }
+    stats = pipeline.elements(frame)
+    expected = [tuple(int(v) for v in stats[["x", "y", "w", "h"]][i]) for i in ELEMENT_ORDERS[args.order](stats)]
+    if [element.bbox for element in pipeline.stream(frame, args.order, MARGIN)] != expected:
+        raise SystemExit("stream() differs from elements() in that order")
+    print(f"{args.image}: {len(expected)} elements, order={args.order}, {args.runs} runs")
+    for name, fn in variants.items():
+        times = time_it(fn, args.runs)
+        print(f"{name:<14} mean {times.mean():7.2f} ms   median {np.median(times):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
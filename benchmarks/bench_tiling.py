@@ -0,0 +1,81 @@
+"""
+Whole-frame detect() vs. TiledDetector on wide / large captures, with the
+agreement between the two.
+
+    python benchmarks/bench_tiling.py [--tile 1024] [--workers N] [--preset tree --clean]
+
+Frames: test.png, test.png|example.png|test.png side by side (a three
+monitor all_screens grab) and example.png upscaled to 8K. Speedup depends
+on the number of cores.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from pipeline import PRESETS, DetectorPipeline, box_iou, load_frame  # noqa: E402
+from tiling import TiledDetector  # noqa: E402
+
+SAME_IOU = 0.95
+
+
+def best_ms(fn, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def agreement(reference, boxes):
+    """Fraction of reference boxes with a tiled box at IoU >= SAME_IOU, and extra boxes."""
+    if not len(reference):
+        return 1.0, len(boxes)
+    iou = box_iou(reference, boxes)
+    found = (iou.max(axis=1) >= SAME_IOU).mean() if len(boxes) else 0.0
+    extra = int((iou.max(axis=0) < SAME_IOU).sum()) if len(boxes) else 0
+    return found, extra
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tile", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--preset", choices=list(PRESETS), default="canny")
+    parser.add_argument("--clean", action="store_true", help="clean=True pipeline (see nms.clean_boxes)")
+    args = parser.parse_args()
+
+    test = load_frame(os.path.join(REPO_ROOT, "test.png"))
+    example = load_frame(os.path.join(REPO_ROOT, "example.png"))
+    frames = [
+        ("test.png", test),
+        ("3 monitors", np.hstack([test, example, test])),
+        ("8K", cv2.resize(example, (7680, 4320), interpolation=cv2.INTER_LINEAR)),
+    ]
+    pipeline = DetectorPipeline.from_preset(args.preset, clean=args.clean)
+    print(f"tile {args.tile}, {args.workers} workers, {os.cpu_count()} cores")
+    print(f"{'frame':<12} {'size':>10} {'whole ms':>9} {'mode':>8} {'tiled ms':>9} {'speedup':>8} "
+          f"{'matched':>8} {'extra':>6}")
+    for label, frame in frames:
+        reference = pipeline.detect(frame)
+        whole_ms = best_ms(lambda: pipeline.detect(frame), args.runs)
+        for mode in ("thread", "process"):
+            with TiledDetector(pipeline, tile_size=args.tile, workers=args.workers, executor=mode) as tiled:
+                boxes = tiled.detect(frame)
+                tiled_ms = best_ms(lambda: tiled.detect(frame), args.runs)
+            found, extra = agreement(reference, boxes)
+            size = f"{frame.shape[1]}x{frame.shape[0]}"
+            print(f"{label:<12} {size:>10} {whole_ms:>9.2f} {mode:>8} {tiled_ms:>9.2f} {whole_ms / tiled_ms:>7.2f}x "
+                  f"{found:>8.0%} {extra:>6}")
+
+
+if __name__ == "__main__":
+    main()
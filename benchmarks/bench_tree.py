@@ -0,0 +1,139 @@
+"""
+ElementTree queries against naive walks over the parent array, on the
+RETR_TREE hierarchies of test.png and example.png and on a random tree.
+
+    python benchmarks/bench_tree.py [--nodes N] [--queries N]
+
+subtree(), ancestors(), is_descendant() and prune() are checked against a
+walk over child lists built in Python, node by node; any difference stops
+the run. The random tree has its node indices shuffled, so parents do not
+always come before their children as they do in findContours output. The
+build time, the one-off ancestor table the first ancestors() lays out,
+and the time of the sampled queries are reported per tree; each side
+runs all of its queries in turn.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from ingest import read  # noqa: E402
+from tree import ElementTree  # noqa: E402
+
+
+def random_parents(count, seed=0):
+    """Parent array of a random tree (a few roots) with shuffled node indices."""
+    rng = np.random.default_rng(seed)
+    parent = np.full(count, -1, dtype=np.int64)
+    for i in range(1, count):
+        parent[i] = -1 if rng.random() < 0.001 else rng.integers(i)
+    shuffle = rng.permutation(count)
+    shuffled = np.full(count, -1, dtype=np.int64)
+    has_parent = parent >= 0
+    shuffled[shuffle[has_parent]] = shuffle[parent[has_parent]]
+    return shuffled
+
+
+class NaiveTree:
+    """Child lists and parent pointers, walked one node at a time."""
+
+    def __init__(self, parent):
+        self.parent = [int(p) for p in parent]
+        self.children = [[] for _ in self.parent]
+        for node, p in enumerate(self.parent):
+            if p >= 0:
+                self.children[p].append(node)
+
+    def subtree(self, i):
+        out, stack = [], [i]
+        while stack:
+            node = stack.pop()
+            out.append(node)
+            stack.extend(reversed(self.children[node]))
+        return out
+
+    def ancestors(self, i):
+        out = []
+        node = self.parent[i]
+        while node >= 0:
+            out.append(node)
+            node = self.parent[node]
+        return out
+
+    def is_descendant(self, nodes, ancestor):
+        return [ancestor in self.ancestors(node) for node in nodes]
+
+    def prune(self, keep):
+        """Parent array of the kept nodes, each attached to its nearest kept ancestor."""
+        new_index = {node: n for n, node in enumerate(np.flatnonzero(keep).tolist())}
+        out = []
+        for node in new_index:
+            up = next((a for a in self.ancestors(node) if keep[a]), -1)
+            out.append(new_index.get(up, -1))
+        return out
+
+
+def check(name, parent, stats, queries, rng):
+    start = time.perf_counter()
+    tree = ElementTree(parent, stats)
+    build_ms = (time.perf_counter() - start) * 1000
+    naive = NaiveTree(parent)
+    count = len(parent)
+    sample = rng.choice(count, size=min(queries, count), replace=False) if count else []
+
+    start = time.perf_counter()
+    tree.ancestors(0) if count else None
+    table_ms = (time.perf_counter() - start) * 1000
+
+    every = np.arange(count)
+    queries = {
+        "subtree": (tree.subtree, naive.subtree),
+        "ancestors": (tree.ancestors, naive.ancestors),
+        "is_descendant": (lambda i: tree.is_descendant(every, i), lambda i: naive.is_descendant(range(count), i)),
+    }
+    timings = {}
+    for query, (fast, slow) in queries.items():
+        # each side over the whole sample in turn, so neither runs on the other's warm caches
+        seconds = []
+        results = []
+        for fn in (fast, slow):
+            start = time.perf_counter()
+            results.append([fn(i) for i in sample.tolist()])
+            seconds.append(time.perf_counter() - start)
+        timings[query] = seconds
+        for i, got, expected in zip(sample.tolist(), *results):
+            if got.tolist() != expected:
+                raise SystemExit(f"{name}: {query}({i}) differs from the naive walk")
+
+    keep = rng.random(count) < 0.5
+    if tree.prune(keep=keep).parent.tolist() != naive.prune(keep):
+        raise SystemExit(f"{name}: prune() differs from the naive walk")
+
+    print(f"{name:<22} {count:7d} nodes   depth {int(tree.depth.max(initial=0)):4d}   build {build_ms:7.2f} ms   "
+          f"(ancestor table {table_ms:.2f} ms)   {len(sample)} queries, same")
+    for query, (fast, slow) in timings.items():
+        print(f"    {query:<14} {fast * 1000:9.2f} ms   naive {slow * 1000:9.2f} ms   "
+              f"speedup {slow / fast if fast else float('inf'):6.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    for image in ("test.png", "example.png"):
+        tree = ElementTree.from_frame(read(os.path.join(REPO_ROOT, image), color=True))
+        check(f"{image} (RETR_TREE)", tree.parent, tree.stats, args.queries, rng)
+    # no stats, as walker.ArrayTree builds it
+    check("random", random_parents(args.nodes), None, args.queries, rng)
+
+
+if __name__ == "__main__":
+    main()
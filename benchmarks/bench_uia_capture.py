@@ -0,0 +1,65 @@
+"""
+One screen grab per element against one grab per window sliced in memory.
+
+    python benchmarks/bench_uia_capture.py [image] [--elements N] [--runs N] [--screen]
+
+The element rects come from fakes.synthetic_window, laid over the image.
+By default grabs are served by fakes.StoredGrabber: "full screen" copies
+the whole image per grab, which is what PIL's ImageGrab does on Windows,
+"bbox only" just the requested region (a lower bound for any real grabber).
+--screen uses ScreenGrabber, i.e. the real ImageGrab, instead (needs a
+display).
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from ingest import read  # noqa: E402
+from fakes import StoredGrabber, synthetic_window  # noqa: E402
+from uia_capture import ScreenGrabber, capture_each, capture_once  # noqa: E402
+
+
+def time_it(fn, runs):
+    fn()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", nargs="?", default=os.path.join(REPO_ROOT, "test.png"))
+    parser.add_argument("--elements", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--screen", action="store_true", help="grab the real screen with ImageGrab")
+    args = parser.parse_args()
+
+    frame = read(args.image, color=True)
+    height, width = frame.shape[:2]
+    window = synthetic_window(args.elements, width, height)
+    rects = [element.rectangle() for element in window.descendants()]
+    print(f"{args.image}: {width}x{height}, {len(rects)} element rects, {args.runs} runs")
+
+    if args.screen:
+        grabbers = {"ImageGrab": ScreenGrabber()}
+    else:
+        grabbers = {"full screen": StoredGrabber(frame, full_screen=True),
+                    "bbox only": StoredGrabber(frame, full_screen=False)}
+    for name, grabber in grabbers.items():
+        each = time_it(lambda: capture_each(grabber, rects), args.runs)
+        once = time_it(lambda: capture_once(grabber, rects, window.rectangle()), args.runs)
+        print(f"{name:<12} per element {np.median(each):9.2f} ms   one grab {np.median(once):7.2f} ms   "
+              f"speedup {np.median(each) / np.median(once):6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
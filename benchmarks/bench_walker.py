@@ -0,0 +1,104 @@
+"""
+Pruned lazy walk against reading the whole tree, on a synthetic UI tree.
+
+    python benchmarks/bench_walker.py [--nodes N] [--call-us US] [--runs N]
+
+The tree comes from fakes.synthetic_tree (50k nodes by default, with
+hidden and off-window subtrees). Each provider call (children, rect,
+is_visible) costs --call-us microseconds of busy wait, standing in for a
+UI Automation round trip; 0 measures the walker alone.
+
+    full          every node read, then filtered (what window.descendants() does)
+    pruned        TreeWalker defaults: hidden and off-window subtrees skipped
+    depth 6       pruned, at most 6 levels below the window
+    budget 5000   pruned, stops after reading 5000 nodes
+    first         time until the pruned walk yields its first element
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from fakes import synthetic_tree  # noqa: E402
+from walker import TreeWalker  # noqa: E402
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class SlowTree:
+    """Provider wrapper spending delay seconds in every call."""
+
+    def __init__(self, tree, delay):
+        self.tree = tree
+        self.delay = delay
+
+    def children(self, node):
+        spin(self.delay)
+        return self.tree.children(node)
+
+    def rect(self, node):
+        spin(self.delay)
+        return self.tree.rect(node)
+
+    def is_visible(self, node):
+        spin(self.delay)
+        return self.tree.is_visible(node)
+
+
+def time_it(fn, runs):
+    fn()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=50_000)
+    parser.add_argument("--call-us", type=float, default=2.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    tree = synthetic_tree(args.nodes)
+    provider = SlowTree(tree, args.call_us / 1e6) if args.call_us else tree
+    print(f"{len(tree)} nodes, depth {int(tree.tree.depth.max())}, {int((~tree.visible).sum())} hidden, "
+          f"{args.call_us:g} us per provider call, {args.runs} runs")
+
+    walkers = {
+        "full": TreeWalker(provider, prune_hidden=False, prune_outside=False),
+        "pruned": TreeWalker(provider),
+        "depth 6": TreeWalker(provider, max_depth=6),
+        "budget 5000": TreeWalker(provider, budget=5000),
+    }
+    expected = None
+    full_time = None
+    for name, walker in walkers.items():
+        found = [item.element for item in walker.walk(tree.root)]
+        if expected is None:
+            expected = set(found)
+        elif name == "pruned" and set(found) != expected:
+            raise SystemExit("pruned walk yields different elements than the full walk")
+        times = time_it(lambda: sum(1 for _ in walker.walk(tree.root)), args.runs)
+        full_time = full_time or np.median(times)
+        stats = walker.stats()
+        print(f"{name:<12} {np.median(times):9.2f} ms   read {stats['visited']:6d}   yielded {stats['yielded']:6d}   "
+              f"pruned {stats['pruned']:5d}   speedup {full_time / np.median(times):5.1f}x")
+
+    first = time_it(lambda: next(TreeWalker(provider).walk(tree.root)), args.runs)
+    print(f"{'first':<12} {np.median(first):9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Crop write throughput: inline cv2.imwrite (the old scripts) vs. CropWriter
+with different worker counts, formats and PNG compression levels.
+
+    python benchmarks/bench_writer.py [image]
+
+Crops are the "tree" preset boxes on test.png (several hundred elements),
+written into a temporary directory. "caller ms" is how long the detection
+loop is blocked handing crops over; the rest of the work overlaps with it.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from pipeline import DetectorPipeline, MARGIN, iter_crops, load_frame  # noqa: E402
+from sinks import CropWriter  # noqa: E402
+
+CONFIGS = [
+    dict(workers=1, fmt="png", compression=3),
+    dict(workers=4, fmt="png", compression=3),
+    dict(workers=4, fmt="png", compression=1),
+    dict(workers=4, fmt="png", compression=0),
+    dict(workers=4, fmt="bmp", compression=0),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("image", nargs="?", default=os.path.join(REPO_ROOT, "test.png"))
+    args = parser.parse_args()
+
+    frame = load_frame(args.image)
+    crops = [c for _, c in iter_crops(frame, DetectorPipeline.from_preset("tree").detect(frame), MARGIN)]
+    print(f"{len(crops)} crops from {args.image}")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        for n, c in enumerate(crops):
+            cv2.imwrite(os.path.join(out_dir, f"{n}.png"), c)
+        elapsed = time.perf_counter() - start
+        print(f"{'inline imwrite':<28} {len(crops) / elapsed:9.1f} images/s   caller {elapsed * 1000:7.2f} ms")
+
+    for config in CONFIGS:
+        with tempfile.TemporaryDirectory() as out_dir:
+            with CropWriter(out_dir, **config) as writer:
+                start = time.perf_counter()
+                for n, c in enumerate(crops):
+                    writer.submit(n, c)
+                caller = time.perf_counter() - start
+            s = writer.stats()
+            label = f"{config['fmt']} level={config['compression']} workers={config['workers']}"
+            print(f"{label:<28} {s['images_per_sec']:9.1f} images/s   caller {caller * 1000:7.2f} ms   "
+                  f"{s['bytes'] / 2 ** 20:7.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
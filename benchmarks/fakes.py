@@ -0,0 +1,257 @@
+"""
+Stand-ins for pywinauto wrappers, the screen and UI Automation, for running
+the capture code in the benchmarks without Windows or a display.
+
+FakeWindow / FakeElement have the attributes the capture loops read.
+SlowElement and HungWindow add the cost of cross-process calls and of an
+application that stops answering. StoredGrabber serves grabs from an image
+and FakeProvider stands in for snapshot.CacheRequestProvider.
+"""
+import random
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from snapshot import ElementSnapshot, WrapperProvider
+from uia_capture import GrabbedFrame, Rect, rect_of
+from walker import ArrayTree
+
+CONTROL_TYPES = ["Button", "Edit", "Text", "Pane", "MenuItem", "ListItem", "Hyperlink", "Image", "Group"]
+
+ElementInfo = namedtuple("ElementInfo", "control_type name automation_id class_name")
+
+
+def wait(seconds, busy=False):
+    """
+    Spends seconds like a cross-process call: sleeping, which lets other
+    threads run, or with busy=True spinning, which is precise down to
+    microseconds but holds the GIL.
+    """
+    if not busy:
+        time.sleep(seconds)
+        return
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class FakeRect(Rect):
+    def width(self):
+        return self.right - self.left
+
+    def height(self):
+        return self.bottom - self.top
+
+
+class FakeElement:
+    def __init__(self, rect, control_type="Button", name="", automation_id="", class_name="", visible=True,
+                 children=()):
+        self._rect = FakeRect(*rect_of(rect))
+        self.element_info = ElementInfo(control_type, name, automation_id, class_name)
+        self._visible = visible
+        self._children = list(children)
+
+    def rectangle(self):
+        return self._rect
+
+    def children(self):
+        return list(self._children)
+
+    def is_visible(self):
+        return self._visible
+
+
+class FakeWindow:
+    def __init__(self, rect, elements, title="Fake window", class_name="FakeWindowClass", handle=1):
+        self._rect = FakeRect(*rect_of(rect))
+        self._elements = list(elements)
+        self._title = title
+        self._class_name = class_name
+        self.handle = handle
+
+    def rectangle(self):
+        return self._rect
+
+    def children(self):
+        return list(self._elements)
+
+    def descendants(self):
+        """Every element below the window, in document order (depth first)."""
+        out = []
+        stack = self._elements[::-1]
+        while stack:
+            element = stack.pop()
+            out.append(element)
+            stack.extend(element.children()[::-1])
+        return out
+
+    def window_text(self):
+        return self._title
+
+    def class_name(self):
+        return self._class_name
+
+    def exists(self):
+        return True
+
+    def is_visible(self):
+        return True
+
+
+class SlowElement:
+    """
+    Element whose property reads each take delay seconds (see wait()), as
+    cross-process UI Automation calls do. element_info costs four reads, for
+    the control type, name, automation id and class name the capture reads.
+    children() is free and returns the wrapped element's own children.
+    """
+
+    def __init__(self, element, delay, busy=False):
+        self._element = element
+        self.delay = delay
+        self.busy = busy
+
+    @property
+    def element_info(self):
+        wait(self.delay * 4, self.busy)
+        return self._element.element_info
+
+    def rectangle(self):
+        wait(self.delay, self.busy)
+        return self._element.rectangle()
+
+    def is_visible(self):
+        wait(self.delay, self.busy)
+        return self._element.is_visible()
+
+    def children(self):
+        return self._element.children()
+
+
+class HungWindow(FakeWindow):
+    """FakeWindow of an application that stops answering: children() blocks for hang_seconds."""
+
+    def __init__(self, rect, elements, hang_seconds=3600.0, **kwargs):
+        super().__init__(rect, elements, **kwargs)
+        self.hang_seconds = hang_seconds
+
+    def children(self):
+        time.sleep(self.hang_seconds)
+        return super().children()
+
+
+def synthetic_window(count=500, width=1920, height=1080, seed=0):
+    """FakeWindow covering (0, 0, width, height) with count random elements of control-like sizes."""
+    rng = random.Random(seed)
+    elements = []
+    for n in range(count):
+        w, h = rng.randint(16, 240), rng.randint(12, 48)
+        x, y = rng.randint(0, width - w), rng.randint(0, height - h)
+        control_type = rng.choice(CONTROL_TYPES)
+        elements.append(FakeElement((x, y, x + w, y + h), control_type, f"{control_type} {n}",
+                                    f"id{n}", f"{control_type}Class"))
+    return FakeWindow((0, 0, width, height), elements)
+
+
+def fake_desktop(windows=8, elements=200, delay=0.0005, hung=0, seed=0):
+    """
+    windows FakeWindows of elements SlowElements each (delay seconds per
+    property read, sleeping); the last hung of them never answer.
+    """
+    desktop = []
+    for n in range(windows):
+        base = synthetic_window(elements, seed=seed + n)
+        slow = [SlowElement(element, delay) for element in base.children()]
+        cls = HungWindow if n >= windows - hung else FakeWindow
+        desktop.append(cls(base.rectangle(), slow, title=f"Window {n + 1}", handle=n + 1))
+    return desktop
+
+
+def synthetic_tree(count=50_000, width=1920, height=1080, hidden=0.05, offscreen=0.02, seed=0):
+    """
+    walker.ArrayTree of count nodes shaped like a UI: node 0 is the window
+    and every other node sits inside the rect of a parent picked at random
+    among the earlier nodes (depth grows like log count). A hidden fraction
+    of the nodes is invisible and an offscreen fraction moved off the
+    window, each with their whole subtree, as collapsed panes and
+    scrolled-away lists are.
+    """
+    rng = random.Random(seed)
+    parent = np.full(count, -1, dtype=np.int64)
+    rects = np.zeros((count, 4), dtype=np.int64)
+    visible = np.ones(count, dtype=bool)
+    rects[0] = (0, 0, width, height)
+    for i in range(1, count):
+        p = rng.randrange(i)
+        parent[i] = p
+        left, top, right, bottom = rects[p].tolist()
+        w, h = max(right - left, 1), max(bottom - top, 1)
+        cw, ch = max(1, int(w * rng.uniform(0.5, 1.0))), max(1, int(h * rng.uniform(0.5, 1.0)))
+        x, y = left + rng.randint(0, w - cw), top + rng.randint(0, h - ch)
+        if rng.random() < offscreen:
+            x -= 4 * width
+        rects[i] = (x, y, x + cw, y + ch)
+        visible[i] = visible[p] and rng.random() >= hidden
+    return ArrayTree(parent, rects, visible)
+
+
+class StoredGrabber:
+    """
+    Grabber serving regions of a stored BGR image placed at (left, top) on a
+    virtual screen, in place of uia_capture.ScreenGrabber.
+
+    On Windows, ImageGrab captures the whole virtual screen and crops the bbox
+    out of it on every call; full_screen=True reproduces that cost by copying
+    the whole image per grab, full_screen=False copies only the bbox.
+    """
+
+    def __init__(self, image, left=0, top=0, full_screen=True):
+        self.frame = GrabbedFrame(np.ascontiguousarray(image), left, top)
+        self.full_screen = full_screen
+        self.grabs = 0
+
+    def grab(self, bbox=None):
+        self.grabs += 1
+        screen = self.frame
+        if self.full_screen:
+            screen = GrabbedFrame(screen.pixels.copy(), screen.left, screen.top)
+        r = rect_of(bbox) if bbox is not None else screen.rect
+        # parts of bbox off the stored screen stay black
+        pixels = np.zeros((max(r.bottom - r.top, 0), max(r.right - r.left, 0)) + screen.pixels.shape[2:],
+                          dtype=screen.pixels.dtype)
+        region = GrabbedFrame(pixels, r.left, r.top)
+        inside = screen.crop(r)
+        if inside is not None:
+            s = screen.rect
+            region.crop((max(r.left, s.left), max(r.top, s.top), min(r.right, s.right), min(r.bottom, s.bottom)))[...] = inside
+        return region
+
+
+class FakeProvider:
+    """
+    In-memory stand-in for snapshot.CacheRequestProvider: snapshots a tree of
+    FakeWindow / FakeElement objects, or a dict of window -> list of (rect,
+    control_type, name, automation_id, class_name, offscreen) rows, counting
+    one round trip per snapshot. latency, in seconds, is spent once per
+    snapshot to stand for the cross-process call.
+    """
+
+    def __init__(self, rows=None, latency=0.0):
+        self.rows = rows or {}
+        self.latency = latency
+        self.calls = 0
+        self.seconds = 0.0
+        self._wrappers = WrapperProvider()
+
+    def snapshot(self, window):
+        start = time.perf_counter()
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if window in self.rows:
+            snapshot = ElementSnapshot.from_rows(self.rows[window])
+        else:
+            snapshot = self._wrappers.snapshot(window)
+        self.seconds += time.perf_counter() - start
+        return snapshot
@@ -0,0 +1,220 @@
+"""
+Headless benchmark suite covering every detection pipeline in the repo.
+
+    python benchmarks/suite.py [--pipelines ...] [--sizes 720p 1080p 4k] [--runs N]
+                               [--json results.json] [--baseline old.json]
+
+Each pipeline reproduces one of the scripts, stage by stage:
+
+    ele         ele.py: Canny, RETR_TREE, no close, no filter
+    canny       contours1.py / gui_new.py: Canny + 12x12 close, RETR_EXTERNAL
+    detection   detection.py: as canny, plus margined crops
+    adaptive    adp.py: adaptive threshold + 9x3 close
+    adaptive2x  adp.py as it was, with findContours run twice
+
+and is timed on test.png, example.png and test.png rescaled to each of
+--sizes. Stages: decode, color, edges (Canny/threshold), morphology,
+contours, filter, crop, encode. Frames are decoded from in-memory PNG
+bytes the way the scripts did (PIL -> NumPy -> cvtColor), and crops are
+PNG-encoded in memory, so nothing touches the disk. Peak memory is the
+tracemalloc high-water mark of one extra run.
+
+--json writes the results for regression tracking; --baseline compares
+against an earlier file and exits with status 1 if any total slowed down
+by more than --tolerance.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import cv2
+import numpy as np
+from PIL import Image
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from pipeline import MARGIN, DetectorPipeline, contour_stats, crop  # noqa: E402
+
+STAGES = ("decode", "color", "edges", "morphology", "contours", "filter", "crop", "encode")
+SIZES = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4k": (3840, 2160),
+    "8k": (7680, 4320),
+}
+
+# name -> (pipeline, margin for crops or None for no crops, findContours calls)
+PIPELINES = {
+    "ele": (DetectorPipeline.from_preset("tree"), None, 1),
+    "canny": (DetectorPipeline(min_area=0), 0, 1),
+    "detection": (DetectorPipeline(), MARGIN, 1),
+    "adaptive": (DetectorPipeline.from_preset("adaptive"), 0, 1),
+    "adaptive2x": (DetectorPipeline.from_preset("adaptive"), 0, 2),
+}
+
+
+def run_once(name, png_bytes):
+    """One pass of a pipeline over an encoded frame; returns ({stage: seconds}, element count, contour count)."""
+    pipeline, margin, find_calls = PIPELINES[name]
+    times = {}
+    clock = time.perf_counter
+
+    start = clock()
+    decoded = np.array(Image.open(io.BytesIO(png_bytes)))
+    times["decode"] = clock() - start
+
+    start = clock()
+    if decoded.ndim == 3 and decoded.shape[2] == 4:
+        img = cv2.cvtColor(decoded, cv2.COLOR_BGRA2BGR)
+    else:
+        img = cv2.cvtColor(decoded, cv2.COLOR_RGB2BGR)
+    gray = pipeline.to_gray(img)
+    times["color"] = clock() - start
+
+    start = clock()
+    binary = pipeline.edges(gray)
+    times["edges"] = clock() - start
+
+    start = clock()
+    binary = pipeline.close(binary)
+    times["morphology"] = clock() - start
+
+    start = clock()
+    for _ in range(find_calls):
+        contours, _ = pipeline.contours_from_mask(binary)
+    times["contours"] = clock() - start
+
+    start = clock()
+    stats = contour_stats(contours)
+    elements = stats[pipeline.area_mask(stats["area"])]
+    times["filter"] = clock() - start
+
+    crops = []
+    start = clock()
+    if margin is not None:
+        crops = [crop(img, (x, y, w, h), margin) for x, y, w, h in zip(elements["x"], elements["y"],
+                                                                       elements["w"], elements["h"])]
+    times["crop"] = clock() - start
+
+    start = clock()
+    for c in crops:
+        cv2.imencode(".png", c)
+    times["encode"] = clock() - start
+    return times, len(elements), len(contours)
+
+
+def measure(name, png_bytes, runs):
+    """Timings over runs passes (after a warm-up) plus peak memory of one traced pass."""
+    run_once(name, png_bytes)
+    samples = {stage: [] for stage in STAGES}
+    totals = []
+    for _ in range(runs):
+        times, elements, contours = run_once(name, png_bytes)
+        for stage in STAGES:
+            samples[stage].append(times[stage] * 1000)
+        totals.append(sum(times.values()) * 1000)
+    tracemalloc.start()
+    run_once(name, png_bytes)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "stages": {stage: {"mean_ms": float(np.mean(v)), "median_ms": float(np.median(v))}
+                   for stage, v in samples.items()},
+        "total_ms": {"mean": float(np.mean(totals)), "median": float(np.median(totals)),
+                     "p95": float(np.percentile(totals, 95))},
+        "peak_mb": peak / 2 ** 20,
+        "elements": elements,
+        "contours": contours,
+    }
+
+
+def frames(images, sizes):
+    """(label, PNG bytes, width, height) for each image and each rescaled variant of the first one."""
+    out = []
+    for path in images:
+        with open(path, "rb") as f:
+            data = f.read()
+        width, height = Image.open(io.BytesIO(data)).size
+        out.append((os.path.basename(path), data, width, height))
+    if images and sizes:
+        source = np.array(Image.open(images[0]))
+        for size in sizes:
+            width, height = SIZES[size]
+            scaled = cv2.resize(source, (width, height), interpolation=cv2.INTER_LINEAR)
+            buffer = io.BytesIO()
+            Image.fromarray(scaled).save(buffer, format="PNG", compress_level=1)
+            out.append((f"{os.path.basename(images[0])}@{size}", buffer.getvalue(), width, height))
+    return out
+
+
+def compare(results, baseline_path, tolerance):
+    """Prints per-case change against a baseline file; returns True if nothing regressed."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["pipeline"], r["image"]): r for r in json.load(f)["results"]}
+    ok = True
+    print(f"\nvs. {baseline_path} (tolerance {tolerance:.0%})")
+    for r in results:
+        old = baseline.get((r["pipeline"], r["image"]))
+        if old is None:
+            continue
+        change = r["total_ms"]["median"] / old["total_ms"]["median"] - 1
+        flag = "REGRESSION" if change > tolerance else ""
+        ok &= not flag
+        print(f"{r['pipeline']:<11} {r['image']:<22} {old['total_ms']['median']:9.2f} -> "
+              f"{r['total_ms']['median']:9.2f} ms {change:+7.1%} {flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pipelines", nargs="+", choices=list(PIPELINES), default=list(PIPELINES))
+    parser.add_argument("--images", nargs="+",
+                        default=[os.path.join(REPO_ROOT, "test.png"), os.path.join(REPO_ROOT, "example.png")])
+    parser.add_argument("--sizes", nargs="*", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against an earlier --json file")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    results = []
+    header = " ".join(f"{stage[:8]:>8}" for stage in STAGES)
+    print(f"{'pipeline':<11} {'image':<22} {header} {'total':>9} {'peak MB':>8} {'elems':>6}")
+    for label, data, width, height in frames(args.images, args.sizes):
+        for name in args.pipelines:
+            r = measure(name, data, args.runs)
+            r.update(pipeline=name, image=label, width=width, height=height, runs=args.runs)
+            results.append(r)
+            cells = " ".join(f"{r['stages'][stage]['median_ms']:>8.2f}" for stage in STAGES)
+            print(f"{name:<11} {label:<22} {cells} {r['total_ms']['median']:>9.2f} {r['peak_mb']:>8.1f} "
+                  f"{r['elements']:>6}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    if args.baseline and not compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+
+MEMO_ENTRIES = 65536
+
+
+class InteractiveClassifier:
+    """
+    The "is this element interactive?" rule of the autopy scripts, compiled once.
+
+    An element is interactive when its control type is one of types, or when
+    its lowercased name, automation id or class name contains one of keywords;
+    keywords in whole_words ("icon") only count as a whole word, so "iconic"
+    and "silicon" do not. matches() keeps the keyword loop: a substring test
+    per keyword runs in C and beats one alternation regex, which Python's re
+    tries keyword by keyword at every position. Only the whole words go
+    through a regex, after their substring test hits. Decisions are exactly
+    those of the loop; the gains come from the memo and from classify().
+
+    is_interactive() memoizes on (control_type, name, automation_id,
+    class_name). classify() works on an ElementSnapshot: since no keyword
+    contains a space, matching the joined text is the same as matching each
+    column on its own, so every distinct string of a column is matched once
+    and the result is spread over the rows with its codes.
+    """
+
+    def __init__(self, types, keywords, whole_words=("icon",), memo_entries=MEMO_ENTRIES):
+        self.types = frozenset(types)
+        words = {k.lower() for k in keywords}
+        bounded = words & {w.lower() for w in whole_words}
+        self.literals = tuple(sorted(words - bounded))
+        self.whole_words = tuple((k, re.compile(rf"\b{re.escape(k)}\b")) for k in sorted(bounded))
+        self.is_interactive = lru_cache(maxsize=memo_entries)(self._is_interactive)
+
+    def matches(self, text):
+        """Whether lowercased text contains a keyword."""
+        for keyword in self.literals:
+            if keyword in text:
+                return True
+        for keyword, pattern in self.whole_words:
+            if keyword in text and pattern.search(text):
+                return True
+        return False
+
+    def _is_interactive(self, control_type, name="", automation_id="", class_name=""):
+        if control_type in self.types:
+            return True
+        return self.matches(f"{(name or '').lower()} {(automation_id or '').lower()} {(class_name or '').lower()}")
+
+    def classify(self, snapshot):
+        """Boolean mask of the interactive elements of an ElementSnapshot."""
+        interactive = snapshot.isin("control_type", self.types)
+        for column in ("name", "automation_id", "class_name"):
+            hit = np.fromiter((self.matches(s.lower()) for s in snapshot.strings[column]), dtype=bool,
+                              count=len(snapshot.strings[column]))
+            if hit.any():
+                interactive |= hit[snapshot.codes[column]]
+        return interactive
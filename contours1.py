@@ -1,8 +1,12 @@
 import cv2
 import numpy as np
 from PIL import Image
+from ingest import from_pil, read
 import pyautogui
 import keyboard
+from pipeline import DetectorPipeline, contour_stats, crop
+from sinks import CropWriter
+from locator import TemplateLocator
 
 img1= 1
 
@@ -18,39 +22,29 @@ MORPH_KERNEL_SIZE = (12, 12)
 MORPH_ITERATIONS = 1      
 # ---
 
+PIPELINE = DetectorPipeline(min_area=MIN_CONTOUR_AREA, max_area=MAX_CONTOUR_AREA,
+                            canny_low=CANNY_LOW_THRESHOLD, canny_high=CANNY_HIGH_THRESHOLD,
+                            kernel_size=MORPH_KERNEL_SIZE, iterations=MORPH_ITERATIONS)
+
 
 try:
-    screenshot = Image.open('test.png')
+    img = read('test.png', color=True)
 except FileNotFoundError:
     print("Error: scr.png not found. Make sure the image is in the same directory.")
     exit()
 
-
-img_orig = np.array(screenshot)
-
-# Ensure image is 3-channel BGR
-if img_orig.shape[2] == 4:
-    img = cv2.cvtColor(img_orig, cv2.COLOR_BGRA2BGR)
-elif img_orig.shape[2] == 3:
-    img = cv2.cvtColor(img_orig, cv2.COLOR_RGB2BGR)
-else:
-     print(f"Error: Unexpected number of channels in image: {img_orig.shape[2]}")
-     exit()
-
 # drawing
 img_display = img.copy()
 
 
-gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+gray = PIPELINE.to_gray(img)
 
 # Canny edge detection
-edges = cv2.Canny(gray, CANNY_LOW_THRESHOLD, CANNY_HIGH_THRESHOLD)
+edges = PIPELINE.edges(gray)
 
-kernel = cv2.getStructuringElement(cv2.MORPH_RECT, MORPH_KERNEL_SIZE)
+closed_edges = PIPELINE.close(edges)
 
-closed_edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel, iterations=MORPH_ITERATIONS)
-
-contours, hierarchy = cv2.findContours(closed_edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+contours, hierarchy = PIPELINE.contours_from_mask(closed_edges)
 
 print(f"Found {len(contours)} contours after morphology.")
 
@@ -59,26 +53,24 @@ print(f"Found {len(contours)} contours after morphology.")
 # cv2.waitKey(0)
 # ---
 
+# area, bounding box and centroid for every contour at once
+stats = contour_stats(contours)
+elements = stats[PIPELINE.area_mask(stats["area"])]
+
+writer = CropWriter(".")
+
 icons_found = 0
-for contour in contours:
-    # Calculate contour area
-    area = cv2.contourArea(contour)
-    if MIN_CONTOUR_AREA < area < MAX_CONTOUR_AREA:
-        
-        x, y, w, h = cv2.boundingRect(contour)
-        # aspect_ratio = float(w)/h
-        # icons_found += 1
-        M = cv2.moments(contour)
-        if M["m00"] != 0:
-            cX = int(M["m10"] / M["m00"])
-            cY = int(M["m01"] / M["m00"])
-        else:
-            cX, cY = x + w // 2, y + h // 2
-        cv2.rectangle(img_display, (x, y), (x + w, y + h), (255, 0, 0), 2)
-        img3 = img.copy()
-        cropped_board = img3[y:y+h, x:x+w]
-        cv2.imwrite(f'{img1}.png', cropped_board)
-        img1 +=1
+for i, x, y, w, h, area, cX, cY in elements.tolist():
+    # aspect_ratio = float(w)/h
+    # icons_found += 1
+    cv2.rectangle(img_display, (x, y), (x + w, y + h), (255, 0, 0), 2)
+    cropped_board = crop(img, (x, y, w, h))
+    writer.submit(img1, cropped_board)
+    img1 +=1
+
+# templates must be on disk before the locate loop below
+writer.close()
+print(writer.summary())
 
 print(f"Filtered down to {icons_found} potential icon+text regions.")
 
@@ -86,14 +78,18 @@ print("Press 'q' to exit the program.")
 
 keyboard.wait('q')
 
-for imag in range(1, 26):
+# one screen grab, every saved crop searched in it
+locator = TemplateLocator({f'{imag}.png': read(f'{imag}.png', color=True) for imag in range(1, img1)})
+screen = from_pil(pyautogui.screenshot())  # pyautogui grabs RGB
+matches = locator.locate_all(screen)
+
+for imag in range(1, img1):
 
-    element_image = f'{imag}.png'
-    element_location = pyautogui.locateOnScreen(element_image)
+    element_location = matches[f'{imag}.png']
 
     if element_location:
-        element_center = pyautogui.center(element_location)
-        print(f"Element found at: {element_center}")
+        element_center = element_location.center
+        print(f"Element found at: {element_center} (score {element_location.score:.2f})")
     else:
         print("Element not found on the screen.")
 cv2.waitKey(0)
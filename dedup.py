@@ -0,0 +1,201 @@
+import json
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import cv2
+import numpy as np
+
+HASH_SIZE = 8              # 8x8 gradient bits -> one uint64 per crop
+MATCH_DISTANCE = 0         # differing bits still considered the same element (with exact=False)
+CACHE_ENTRIES = 4096
+CACHE_FILE = ".crop_cache.json"
+
+# BT.601 luma, as cv2.COLOR_BGR2GRAY
+_LUMA_BGR = np.array([0.114, 0.587, 0.299])
+
+CacheEntry = namedtuple("CacheEntry", "hash element_id label path shape nbytes")
+
+
+def _small_bgr(image, size):
+    """image shrunk to (size + 1) x size, as 3-channel uint8."""
+    small = cv2.resize(image, (size + 1, size), interpolation=cv2.INTER_AREA)
+    if small.ndim == 2:
+        return np.repeat(small[:, :, None], 3, axis=2)
+    return small[:, :, :3]
+
+
+def dhash_many(images, size=HASH_SIZE):
+    """
+    Difference hashes of a list of gray/BGR/BGRA crops, as a uint64 array.
+
+    Each crop is shrunk to (size + 1) x size; bit k says whether a pixel is
+    brighter than its left neighbour. Only the resize is done per crop: the
+    gray conversion (on the shrunk pixels), comparison and bit packing run
+    once over the whole batch. size must be 8 for the uint64 result.
+    """
+    if not len(images):
+        return np.empty(0, dtype=np.uint64)
+    small = np.stack([_small_bgr(np.asarray(image), size) for image in images]) @ _LUMA_BGR
+    bits = small[:, :, 1:] > small[:, :, :-1]
+    return np.packbits(bits.reshape(len(images), -1), axis=1).view(">u8").astype(np.uint64).ravel()
+
+
+def dhash(image, size=HASH_SIZE):
+    """Difference hash of one crop (see dhash_many)."""
+    return int(dhash_many([image], size)[0])
+
+
+def hamming(hashes, value):
+    """Number of differing bits between each hash in an array and value."""
+    diff = np.bitwise_xor(np.asarray(hashes, dtype=np.uint64), np.uint64(value))
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(diff)
+    return np.unpackbits(diff.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def read_pixels(path):
+    """Pixels of a saved crop as written (gray, BGR or BGRA), or None if it can't be read."""
+    try:
+        data = np.fromfile(path, dtype=np.uint8)
+    except (OSError, ValueError):
+        return None
+    return cv2.imdecode(data, cv2.IMREAD_UNCHANGED) if data.size else None
+
+
+class CropCache:
+    """
+    Content-addressed cache of element crops, keyed by perceptual hash.
+
+    lookup() answers "have we seen this crop before?" with the element id,
+    label and file of the first time it was stored. The hash only finds the
+    candidate: with exact=True (the default) a hit is confirmed by comparing
+    the crop with the pixels of the saved file, since same-size buttons with
+    different labels ("OK", "No") often share a dHash. A candidate whose file
+    is gone or differs is a miss. exact=False trusts the hash alone and then
+    also accepts entries of the same shape up to max_distance bits away,
+    which matches re-rendered icons but also look-alike elements.
+
+    Entries are evicted least recently used first, once there are more than
+    max_entries or, with max_bytes, once the recorded crop sizes add up to
+    more than that. save()/load() keep the cache across runs.
+
+    The cache can be shared between threads (sinks.CropWriter looks up in
+    the caller and adds from its workers). Its lock guards the entries
+    only: the saved file a lookup compares against is read outside it.
+    """
+
+    def __init__(self, max_entries=CACHE_ENTRIES, max_bytes=None, max_distance=MATCH_DISTANCE, exact=True):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_distance = max_distance
+        self.exact = exact
+        self.entries = OrderedDict()      # hash -> CacheEntry, least recently used first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._hashes = None               # uint64 array of the keys, rebuilt after changes
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _key_array(self):
+        if self._hashes is None:
+            self._hashes = np.fromiter(self.entries.keys(), dtype=np.uint64, count=len(self.entries))
+        return self._hashes
+
+    def _candidates(self, hash_value, shape):
+        entry = self.entries.get(hash_value)
+        if entry is not None and entry.shape == shape:
+            yield entry
+        if self.exact or self.max_distance <= 0 or not self.entries:
+            return
+        keys = self._key_array()
+        distance = hamming(keys, hash_value)
+        for position in np.argsort(distance, kind="stable"):
+            if distance[position] > self.max_distance:
+                break
+            candidate = self.entries[int(keys[position])]
+            if candidate.shape == shape and candidate.hash != hash_value:
+                yield candidate
+
+    def _same_pixels(self, entry, image):
+        if entry.path is None:
+            return False
+        saved = read_pixels(entry.path)
+        return saved is not None and saved.shape == image.shape and np.array_equal(saved, image)
+
+    def lookup(self, image, hash_value=None):
+        """
+        CacheEntry of a crop seen before, or None. Pass hash_value when the
+        hash was already computed (dhash_many).
+        """
+        image = np.asarray(image)
+        if hash_value is None:
+            hash_value = dhash(image)
+        with self._lock:
+            candidates = list(self._candidates(int(hash_value), image.shape))
+        found = None
+        for entry in candidates:
+            if not self.exact or self._same_pixels(entry, image):
+                found = entry
+                break
+        with self._lock:
+            if found is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if found.hash in self.entries:
+                self.entries.move_to_end(found.hash)
+        return found
+
+    def add(self, element_id, label=None, path=None, image=None, hash_value=None, shape=None, nbytes=0):
+        """
+        Records a crop once it is stored at path and returns its CacheEntry.
+        An entry with the same hash (a different crop, or exact would have
+        matched it) is replaced.
+        """
+        if hash_value is None:
+            hash_value, shape = dhash(image), np.asarray(image).shape
+        entry = CacheEntry(int(hash_value), element_id, label, path, tuple(shape), int(nbytes))
+        with self._lock:
+            old = self.entries.pop(entry.hash, None)
+            if old is not None:
+                self.total_bytes -= old.nbytes
+            self.entries[entry.hash] = entry
+            self.total_bytes += entry.nbytes
+            self._hashes = None
+            self._evict()
+        return entry
+
+    def _evict(self):
+        while self.entries and (len(self.entries) > self.max_entries or
+                                (self.max_bytes is not None and self.total_bytes > self.max_bytes)):
+            _, entry = self.entries.popitem(last=False)
+            self.total_bytes -= entry.nbytes
+            self._hashes = None
+
+    def save(self, path):
+        """Writes the entries, least recently used first, to a JSON file."""
+        with self._lock:
+            records = [entry._asdict() for entry in self.entries.values()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(records, f)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Cache with the entries of a save()d file; an empty cache if the file doesn't exist."""
+        cache = cls(**kwargs)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for record in json.load(f):
+                    record["shape"] = tuple(record["shape"])
+                    entry = CacheEntry(**record)
+                    cache.entries[entry.hash] = entry
+                    cache.total_bytes += entry.nbytes
+            cache._evict()
+        return cache
+
+    def stats(self):
+        return {"entries": len(self.entries), "bytes": self.total_bytes, "hits": self.hits, "misses": self.misses}
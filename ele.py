@@ -1,17 +1,29 @@
 import cv2
 import numpy as np
-from PIL import Image
+from ingest import read
+from nms import clean_boxes
+from pipeline import DetectorPipeline, boxes_of, contour_stats
+from tree import ElementTree
 
-screenshot= Image.open('test.png')
-img = np.array(screenshot)
-img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+PIPELINE = DetectorPipeline.from_preset("tree")
 
-# Canny edge detection
-edges = cv2.Canny(gray, 50, 150)
+img = read('test.png', color=True)
 
-contours, _ = cv2.findContours(edges, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-cv2.drawContours(img, contours, -1, (0, 255, 0), 2)
+# Canny edge detection, no morphology, full hierarchy
+contours, hierarchy = PIPELINE.find_contours(img)
+tree = ElementTree.from_contours(contours, hierarchy)
+print(f"{len(tree)} contours: {len(tree.containers())} containers, {len(tree.leaves())} leaves")
+
+# the same contours as boxes, with nested duplicates and fragments merged
+boxes = clean_boxes(boxes_of(contour_stats(contours)))
+print(f"{len(boxes)} boxes after clean_boxes")
+
+# containers blue, leaf controls green
+cv2.drawContours(img, [contours[i] for i in tree.containers()], -1, (255, 0, 0), 2)
+cv2.drawContours(img, [contours[i] for i in tree.leaves()], -1, (0, 255, 0), 2)
+# cleaned element boxes red
+for x, y, w, h in boxes.tolist():
+    cv2.rectangle(img, (x, y), (x + w, y + h), (0, 0, 255), 1)
 
 cv2.imshow('Detected Elements', img)
 cv2.waitKey(0)
@@ -0,0 +1,171 @@
+import argparse
+import glob
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from ingest import read
+
+# Header: magic, format version, frame count, byte offset and length of the JSON index.
+STORE_MAGIC = b"FRAMESTR"
+STORE_VERSION = 1
+STORE_HEADER = struct.Struct("<8sIIQQ")
+STORE_ALIGN = 64          # frames start on cache-line boundaries
+STORE_MODES = ("gray", "bgr", "bgra")
+
+
+def _aligned(offset):
+    return -(-offset // STORE_ALIGN) * STORE_ALIGN
+
+
+class FrameStoreWriter:
+    """
+    Appends uncompressed uint8 frames (gray, BGR or BGRA) to a frame store file.
+
+    Layout: a fixed header, the frames back to back (each aligned to
+    STORE_ALIGN bytes), then a JSON index with the offset, shape and name of
+    every frame. The header is rewritten with the index location on close(),
+    so a store that was never closed is rejected by FrameStore.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.records = []
+        self._file = open(path, "wb")
+        self._file.write(b"\0" * _aligned(STORE_HEADER.size))
+        self._offset = self._file.tell()
+
+    def append(self, frame, name=None):
+        """Writes one frame and returns its index in the store."""
+        frame = np.ascontiguousarray(frame)
+        if frame.dtype != np.uint8 or frame.ndim not in (2, 3):
+            raise ValueError(f"Expected a uint8 gray or color frame, got {frame.dtype} {frame.shape}")
+        padding = _aligned(self._offset) - self._offset
+        if padding:
+            self._file.write(b"\0" * padding)
+            self._offset += padding
+        self._file.write(frame.data)
+        self.records.append({"offset": self._offset, "shape": list(frame.shape),
+                             "name": name if name is not None else str(len(self.records))})
+        self._offset += frame.nbytes
+        return len(self.records) - 1
+
+    def close(self):
+        """Writes the index and the final header."""
+        if self._file.closed:
+            return
+        index = json.dumps({"frames": self.records}).encode("utf-8")
+        self._file.write(index)
+        self._file.seek(0)
+        self._file.write(STORE_HEADER.pack(STORE_MAGIC, STORE_VERSION, len(self.records),
+                                           self._offset, len(index)))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameStore:
+    """
+    Memory-mapped, read-only access to the frames of a frame store.
+
+    store[i] is a NumPy view straight into the map: no decode and no copy, and
+    the OS pages frames in as they are touched. Views are read-only and must
+    be dropped before close() (the map can't close under live views).
+    Iterating yields the frames in order; names holds the name of each frame
+    (the source file name for converted PNG directories).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, count, index_offset, index_length = STORE_HEADER.unpack_from(self._map)
+            if magic != STORE_MAGIC:
+                raise ValueError(f"{path} is not a frame store")
+            if version != STORE_VERSION:
+                raise ValueError(f"Unsupported frame store version: {version}")
+            if index_length == 0:
+                raise ValueError(f"{path} was not closed properly (no index)")
+            if index_offset + index_length > len(self._map):
+                raise ValueError(f"{path} is truncated")
+            index = json.loads(self._map[index_offset:index_offset + index_length])
+        except Exception:
+            self.close()
+            raise
+        self.records = index["frames"]
+        if len(self.records) != count:
+            self.close()
+            raise ValueError(f"{path}: header says {count} frames, index has {len(self.records)}")
+        self.names = [r["name"] for r in self.records]
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, i):
+        record = self.records[i]
+        shape = tuple(record["shape"])
+        return np.frombuffer(self._map, dtype=np.uint8, count=int(np.prod(shape)),
+                             offset=record["offset"]).reshape(shape)
+
+    def __iter__(self):
+        for i in range(len(self.records)):
+            yield self[i]
+
+    def items(self):
+        """Yields (name, frame view) pairs."""
+        for i, name in enumerate(self.names):
+            yield name, self[i]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def convert_pngs(source, path, mode="gray"):
+    """
+    Packs every PNG in a directory (or matching a glob) into a frame store.
+
+    mode is "gray" (smallest, all detection needs), "bgr" (crops too) or
+    "bgra". Files are added in sorted name order; returns the frame count.
+    """
+    if mode not in STORE_MODES:
+        raise ValueError(f"Unsupported mode: {mode} (expected one of {', '.join(STORE_MODES)})")
+    pattern = os.path.join(source, "*.png") if os.path.isdir(source) else source
+    paths = sorted(glob.glob(pattern))
+    with FrameStoreWriter(path) as writer:
+        for png in paths:
+            frame = read(png, color=mode != "gray")
+            if mode == "bgra":
+                frame = np.dstack([frame, np.full(frame.shape[:2], 255, dtype=np.uint8)])
+            writer.append(frame, os.path.basename(png))
+    return len(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a directory of PNG screenshots into a frame store.")
+    parser.add_argument("source", help="directory of PNGs or a glob such as 'captures/*.png'")
+    parser.add_argument("output", help="frame store file to write")
+    parser.add_argument("--mode", choices=STORE_MODES, default="gray")
+    args = parser.parse_args()
+    count = convert_pngs(args.source, args.output, args.mode)
+    print(f"Wrote {count} frames to {args.output} ({os.path.getsize(args.output) / 2 ** 20:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import cv2
 import numpy as np
 from PIL import Image
+from ingest import read
 import pyautogui
 import keyboard
 import os 
@@ -13,21 +14,11 @@ MORPH_KERNEL_SIZE = (12, 12)
 MORPH_ITERATIONS = 1
 
 try:
-    screenshot = Image.open('scr.png')
+    img = read('scr.png', color=True)
 except FileNotFoundError:
     print("Error: scr.png not found. Make sure the image is in the same directory.")
     exit()
 
-img_orig = np.array(screenshot)
-
-if img_orig.shape[2] == 4:
-    img = cv2.cvtColor(img_orig, cv2.COLOR_BGRA2BGR)
-elif img_orig.shape[2] == 3:
-    img = cv2.cvtColor(img_orig, cv2.COLOR_RGB2BGR)
-else:
-     print(f"Error: Unexpected number of channels in image: {img_orig.shape[2]}")
-     exit()
-
 img_display = img.copy()
 gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
 edges = cv2.Canny(gray, CANNY_LOW_THRESHOLD, CANNY_HIGH_THRESHOLD)
@@ -51,8 +42,7 @@ for i, contour in enumerate(contours):
             cv2.rectangle(img_display, (x, y), (x + w, y + h), (255, 0, 0), 2)
             cv2.putText(img_display, str(image_counter), (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1) 
 
-            img_to_save = img.copy() 
-            cropped_region = img_to_save[y:y+h, x:x+w]
+            cropped_region = img[y:y+h, x:x+w]
 
             if cropped_region.size > 0:
                 save_path = f'{image_counter}.png'
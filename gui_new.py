@@ -1,9 +1,12 @@
 import cv2
 import numpy as np
 from PIL import Image
+from ingest import read
 import pyautogui
 import keyboard
 import os
+from pipeline import DetectorPipeline, contour_stats, crop
+from sinks import CropWriter
 
 MIN_CONTOUR_AREA = 100
 MAX_CONTOUR_AREA = 15000
@@ -13,28 +16,18 @@ MORPH_KERNEL_SIZE = (12, 12)
 MORPH_ITERATIONS = 1
 MARGIN = 5 
 
+PIPELINE = DetectorPipeline(min_area=MIN_CONTOUR_AREA, max_area=MAX_CONTOUR_AREA,
+                            canny_low=CANNY_LOW_THRESHOLD, canny_high=CANNY_HIGH_THRESHOLD,
+                            kernel_size=MORPH_KERNEL_SIZE, iterations=MORPH_ITERATIONS)
+
 try:
-    screenshot = Image.open('test.png')
+    img = read('test.png', color=True)
 except FileNotFoundError:
     print("Error: scr.png not found. Make sure the image is in the same directory.")
     exit()
 
-img_orig = np.array(screenshot)
-
-if img_orig.shape[2] == 4:
-    img = cv2.cvtColor(img_orig, cv2.COLOR_BGRA2BGR)
-elif img_orig.shape[2] == 3:
-    img = cv2.cvtColor(img_orig, cv2.COLOR_RGB2BGR)
-else:
-     print(f"Error: Unexpected number of channels in image: {img_orig.shape[2]}")
-     exit()
-
 img_display = img.copy()
-gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-edges = cv2.Canny(gray, CANNY_LOW_THRESHOLD, CANNY_HIGH_THRESHOLD)
-kernel = cv2.getStructuringElement(cv2.MORPH_RECT, MORPH_KERNEL_SIZE)
-closed_edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel, iterations=MORPH_ITERATIONS)
-contours, hierarchy = cv2.findContours(closed_edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+contours, hierarchy = PIPELINE.find_contours(img)
 
 print(f"Found {len(contours)} contours initially after morphology.")
 
@@ -42,46 +35,46 @@ saved_image_count = 0
 image_counter = 1
 img_height, img_width = img.shape[:2] 
 
-for i, contour in enumerate(contours):
-    area = cv2.contourArea(contour)
+stats = contour_stats(contours)
+elements = stats[PIPELINE.area_mask(stats["area"])]
 
-    if MIN_CONTOUR_AREA < area < MAX_CONTOUR_AREA:
-        x, y, w, h = cv2.boundingRect(contour)
+# crops are encoded and written on a thread pool while the loop carries on
+writer = CropWriter(".")
 
-        
-        x_m = max(0, x - MARGIN)
-        y_m = max(0, y - MARGIN)
-        x_end = min(img_width, x + w + MARGIN)
-        y_end = min(img_height, y + h + MARGIN)
+for i, x, y, w, h, area, cX, cY in elements.tolist():
+    x_m = max(0, x - MARGIN)
+    y_m = max(0, y - MARGIN)
+    x_end = min(img_width, x + w + MARGIN)
+    y_end = min(img_height, y + h + MARGIN)
 
+    
+    w_m = x_end - x_m
+    h_m = y_end - y_m
+
+    if w_m > 0 and h_m > 0:
+        print(f"Processing contour {i}: Area={area:.2f}, Box=(x={x}, y={y}, w={w}, h={h}) -> Saving margined region as {image_counter}.png")
         
-        w_m = x_end - x_m
-        h_m = y_end - y_m
-
-        if w_m > 0 and h_m > 0:
-            print(f"Processing contour {i}: Area={area:.2f}, Box=(x={x}, y={y}, w={w}, h={h}) -> Saving margined region as {image_counter}.png")
-            
-            cv2.rectangle(img_display, (x, y), (x + w, y + h), (255, 0, 0), 2)
-            cv2.putText(img_display, str(image_counter), (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
-
-            img_to_save = img.copy()
-            
-            cropped_region = img_to_save[y_m:y_end, x_m:x_end]
-
-            if cropped_region.size > 0:
-                save_path = f'{image_counter}.png'
-                try:
-                    cv2.imwrite(save_path, cropped_region)
-                    print(f"   Successfully saved {save_path}")
-                    saved_image_count += 1
-                    image_counter += 1
-                except Exception as e:
-                    print(f"   ERROR saving {save_path}: {e}")
-            else:
-                print(f"   Skipped saving contour {i}: Margined cropped region is empty (w_m={w_m}, h_m={h_m})")
-        else:
-             print(f"Skipping contour {i}: Invalid bounding box after margin (w_m={w_m}, h_m={h_m})")
+        cv2.rectangle(img_display, (x, y), (x + w, y + h), (255, 0, 0), 2)
+        cv2.putText(img_display, str(image_counter), (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
 
+        # view into img, no full-frame copy
+        cropped_region = crop(img, (x, y, w, h), MARGIN)
+
+        if cropped_region.size > 0:
+            save_path = writer.submit(image_counter, cropped_region)
+            print(f"   Queued {save_path}")
+            saved_image_count += 1
+            image_counter += 1
+        else:
+            print(f"   Skipped saving contour {i}: Margined cropped region is empty (w_m={w_m}, h_m={h_m})")
+    else:
+         print(f"Skipping contour {i}: Invalid bounding box after margin (w_m={w_m}, h_m={h_m})")
+
+writer.close()
+for save_path, e in writer.errors:
+    print(f"   ERROR saving {save_path}: {e}")
+saved_image_count = writer.written
+print(writer.summary())
 
 print(f"\nFinished processing contours. Saved {saved_image_count} images.")
 cv2.imshow('Detected Regions', img_display) 
@@ -0,0 +1,157 @@
+import cv2
+import numpy as np
+
+from pipeline import DetectorPipeline, boxes_of
+
+DIFF_BLOCK = 16          # side of the blocks frames are compared in
+DIFF_THRESHOLD = 8       # gray-level change that makes a block dirty
+FULL_REDETECT_RATIO = 0.5
+MAX_GROW_STEPS = 6
+
+
+def _intersects(boxes, rect):
+    """Mask of x, y, w, h boxes overlapping rect x0, y0, x1, y1."""
+    x0, y0 = boxes[:, 0], boxes[:, 1]
+    return (x0 < rect[2]) & (x0 + boxes[:, 2] > rect[0]) & (y0 < rect[3]) & (y0 + boxes[:, 3] > rect[1])
+
+
+def _union(rect, boxes):
+    """Smallest x0, y0, x1, y1 rect holding rect and every x, y, w, h box."""
+    if not len(boxes):
+        return rect
+    return (min(rect[0], int(boxes[:, 0].min())), min(rect[1], int(boxes[:, 1].min())),
+            max(rect[2], int((boxes[:, 0] + boxes[:, 2]).max())), max(rect[3], int((boxes[:, 1] + boxes[:, 3]).max())))
+
+
+class IncrementalDetector:
+    """
+    Keeps the element list of a screen up to date from frame to frame.
+
+    Each update() compares the new frame with a reference frame block by block
+    (absdiff, max per block). Dirty blocks are grouped into rectangles, grown
+    by the morphology kernel reach, and only those rectangles are re-detected:
+    old boxes touching a dirty rectangle are replaced by what detection finds
+    there now, everything else is kept. A region is grown until no re-detected
+    element is cut by its border, so elements that changed shape or merged are
+    picked up whole. When more than full_redetect_ratio of the frame changes,
+    or the frame size changes, the whole frame is detected again.
+
+    Only the re-detected regions are copied into the reference, so it holds
+    each region as it was when last detected: a change arriving in steps
+    below threshold (a fade) is still caught once it adds up.
+
+    self.boxes holds the raw boxes; with a clean=True pipeline update()
+    returns them cleaned, as detect() would, since cleaning merges and drops
+    boxes across region borders and so can't be patched region by region.
+
+    The cost of a steady-state update is the grayscale conversion and one diff
+    over the frame plus detection over the changed area, instead of detection
+    over the whole frame.
+    """
+
+    def __init__(self, pipeline=None, block=DIFF_BLOCK, threshold=DIFF_THRESHOLD,
+                 full_redetect_ratio=FULL_REDETECT_RATIO):
+        self.pipeline = pipeline or DetectorPipeline()
+        self.block = block
+        self.threshold = threshold
+        self.full_redetect_ratio = full_redetect_ratio
+        kernel = self.pipeline.kernel_size or (0, 0)
+        # context needed around a change: close kernel plus Canny's 3x3 Sobel + NMS
+        self.pad = int(max(kernel)) * max(1, self.pipeline.iterations) + 4
+        self.reset()
+
+    def reset(self):
+        """Forgets the reference frame; the next update() detects the whole frame."""
+        self.prev_gray = None
+        self.boxes = np.empty((0, 4), dtype=np.int32)
+        self.last_regions = []
+        self.last_dirty_fraction = 0.0
+
+    def dirty_rects(self, gray):
+        """x0, y0, x1, y1 rects, grown by the detection context, covering every block that changed."""
+        height, width = gray.shape[:2]
+        b = self.block
+        if cv2.norm(gray, self.prev_gray, cv2.NORM_INF) <= self.threshold:
+            self.last_dirty_fraction = 0.0
+            return []
+        _, changed = cv2.threshold(cv2.absdiff(gray, self.prev_gray), self.threshold, 255, cv2.THRESH_BINARY)
+        x, y, w, h = cv2.boundingRect(changed)
+        if w == 0 or h == 0:
+            self.last_dirty_fraction = 0.0
+            return []
+
+        # block max-pooling, only over the block-aligned window holding the change
+        bx0, by0 = x // b, y // b
+        bx1, by1 = -(-(x + w) // b), -(-(y + h) // b)
+        window = np.zeros(((by1 - by0) * b, (bx1 - bx0) * b), dtype=np.uint8)
+        source = changed[by0 * b:by1 * b, bx0 * b:bx1 * b]
+        window[:source.shape[0], :source.shape[1]] = source
+        dirty = window.reshape(by1 - by0, b, bx1 - bx0, b).max(axis=(1, 3))
+        self.last_dirty_fraction = cv2.countNonZero(dirty) / (-(-height // b) * -(-width // b))
+
+        count, _, stats, _ = cv2.connectedComponentsWithStats(dirty, connectivity=8)
+        rects = []
+        for sx, sy, sw, sh, _ in stats[1:count]:
+            rects.append((max(0, (bx0 + int(sx)) * b - self.pad), max(0, (by0 + int(sy)) * b - self.pad),
+                          min(width, (bx0 + int(sx + sw)) * b + self.pad), min(height, (by0 + int(sy + sh)) * b + self.pad)))
+        return rects
+
+    def _redetect(self, gray, rect):
+        """Re-detects around rect, growing it until no candidate element is cut by the border."""
+        height, width = gray.shape[:2]
+        core = _union(rect, self.boxes[_intersects(self.boxes, rect)])
+        grow = self.pad
+        for _ in range(MAX_GROW_STEPS):
+            x0, y0 = max(0, core[0] - self.pad), max(0, core[1] - self.pad)
+            x1, y1 = min(width, core[2] + self.pad), min(height, core[3] + self.pad)
+            stats = self.pipeline.measure(gray[y0:y1, x0:x1])
+            stats["x"] += x0
+            stats["y"] += y0
+            boxes = boxes_of(stats)
+            near = _intersects(boxes, core)
+            bx0, by0 = boxes[:, 0], boxes[:, 1]
+            bx1, by1 = bx0 + boxes[:, 2], by0 + boxes[:, 3]
+            cut = (((bx0 <= x0) & (x0 > 0)) | ((by0 <= y0) & (y0 > 0)) |
+                   ((bx1 >= x1) & (x1 < width)) | ((by1 >= y1) & (y1 < height)))
+            # a cut piece already over max_area can't be an element however far it extends
+            pending = near & cut
+            if self.pipeline.max_area is not None:
+                pending &= stats["area"] < self.pipeline.max_area
+            if not pending.any():
+                found = boxes[near & ~cut & self.pipeline.area_mask(stats["area"])]
+                self.boxes = np.concatenate([self.boxes[~_intersects(self.boxes, core)], found])
+                self.last_regions.append(core)
+                return True
+            grown = _union(core, boxes[pending])
+            core = (max(0, grown[0] - grow), max(0, grown[1] - grow),
+                    min(width, grown[2] + grow), min(height, grown[3] + grow))
+            core = _union(core, self.boxes[_intersects(self.boxes, core)])
+            grow *= 2
+        return False
+
+    def update(self, frame):
+        """Returns the (N, 4) x, y, w, h boxes for frame, re-detecting only what changed."""
+        gray = self.pipeline.to_gray(frame)
+        self.last_regions = []
+
+        if self.prev_gray is None or self.prev_gray.shape != gray.shape:
+            return self._full(gray)
+        rects = self.dirty_rects(gray)
+        if self.last_dirty_fraction > self.full_redetect_ratio:
+            return self._full(gray)
+        for rect in rects:
+            if not self._redetect(gray, rect):
+                return self._full(gray)
+        # the reference only moves on where detection ran, so a change creeping
+        # in below the threshold each frame still adds up to a dirty block
+        for x0, y0, x1, y1 in self.last_regions:
+            self.prev_gray[y0:y1, x0:x1] = gray[y0:y1, x0:x1]
+        return self.pipeline.postprocess(self.boxes)
+
+    def _full(self, gray):
+        self.boxes = boxes_of(self.pipeline.elements(gray))
+        # always a copy: a gray frame is used as is, and a capture loop
+        # refilling one buffer would otherwise diff it against itself
+        self.prev_gray = gray.copy()
+        self.last_regions = [(0, 0, gray.shape[1], gray.shape[0])]
+        return self.pipeline.postprocess(self.boxes)
@@ -0,0 +1,155 @@
+import mmap
+import os
+
+import cv2
+import numpy as np
+
+from profiling import PROFILER
+
+# cvtColor codes from a channel order to the two representations detection uses.
+TO_GRAY = {
+    "RGB": cv2.COLOR_RGB2GRAY,
+    "BGR": cv2.COLOR_BGR2GRAY,
+    "RGBA": cv2.COLOR_RGBA2GRAY,
+    "BGRA": cv2.COLOR_BGRA2GRAY,
+}
+TO_BGR = {
+    "RGB": cv2.COLOR_RGB2BGR,
+    "RGBA": cv2.COLOR_RGBA2BGR,
+    "BGRA": cv2.COLOR_BGRA2BGR,
+}
+
+
+def _convert(pixels, order, color):
+    """One cvtColor from pixels in channel order to gray, or to BGR when color is set."""
+    if pixels.ndim == 2 or order == "L":
+        pixels = pixels.reshape(pixels.shape[:2])
+        if not color:
+            return pixels
+        with PROFILER.span("color"):
+            return cv2.cvtColor(pixels, cv2.COLOR_GRAY2BGR)
+    if color and order == "BGR":
+        return pixels
+    codes = TO_BGR if color else TO_GRAY
+    if order not in codes:
+        raise ValueError(f"Unsupported channel order: {order}")
+    with PROFILER.span("color"):
+        return cv2.cvtColor(pixels, codes[order])
+
+
+def _order_of(channels, default):
+    if channels == 1:
+        return "L"
+    if channels == 3:
+        return default[:3]
+    if channels == 4:
+        return default[:3] + "A"
+    raise ValueError(f"Unexpected number of channels in image: {channels}")
+
+
+def _flags(color):
+    # Not IMREAD_GRAYSCALE: libpng's own RGB-to-gray differs from cvtColor by a
+    # few levels, which moves Canny edges and changes the detected boxes.
+    return cv2.IMREAD_COLOR if color else cv2.IMREAD_ANYCOLOR
+
+
+def _finish(frame, color):
+    """Gray result of an IMREAD_ANYCOLOR decode (color decodes are already BGR)."""
+    if color or frame.ndim == 2:
+        return frame
+    return _convert(frame, "BGR", False)
+
+
+def read(path, color=False):
+    """
+    Decodes an image file to gray (or BGR with color=True).
+
+    The decoder drops alpha and keeps gray files single-channel, so a gray read
+    costs one decode plus at most one cvtColor, with no RGBA or BGR copy in
+    between. Raises FileNotFoundError if the file can't be read.
+
+    The file is read with np.fromfile and decoded from memory: cv2.imread
+    can't open non-ASCII paths on Windows, and paths here come from window
+    titles and element names.
+    """
+    try:
+        data = np.fromfile(os.fspath(path), dtype=np.uint8)
+        return decode(data, color)
+    except (OSError, ValueError):
+        raise FileNotFoundError(path) from None
+
+
+def decode(data, color=False):
+    """
+    Decodes an encoded image (PNG, BMP, ...) held in bytes, memoryview, mmap or
+    any other buffer, without copying it first, to gray or BGR.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    with PROFILER.span("decode"):
+        frame = cv2.imdecode(buffer, _flags(color))
+    if frame is None:
+        raise ValueError("Could not decode image data")
+    return _finish(frame, color)
+
+
+def read_mapped(path, color=False):
+    """Like read(), but decodes from a memory map of the file instead of reading it into memory."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return decode(mapped, color)
+
+
+def from_raw(data, width, height, order="BGRA", stride=None, color=False):
+    """
+    Gray or BGR frame from raw pixels (e.g. an mss or DXGI grab) in a buffer.
+
+    The buffer is wrapped with np.frombuffer, not copied; stride is the row
+    length in bytes when rows are padded. BGR pixels requested as color are
+    returned as that zero-copy view, so the buffer must outlive the result.
+    """
+    channels = 1 if order == "L" else len(order)
+    row = width * channels
+    stride = stride or row
+    pixels = np.frombuffer(data, dtype=np.uint8, count=stride * (height - 1) + row)
+    pixels = np.lib.stride_tricks.as_strided(pixels, (height, width, channels), (stride, channels, 1),
+                                             writeable=False)
+    return _convert(pixels, order, color)
+
+
+def from_array(image, order=None, color=False):
+    """
+    Gray or BGR frame from an array in a known channel order.
+
+    order defaults to RGB/RGBA, which is what np.array() of a PIL image or a
+    pyautogui screenshot holds; pass "BGR"/"BGRA" for OpenCV or mss arrays.
+    """
+    image = np.asarray(image)
+    channels = 1 if image.ndim == 2 else image.shape[2]
+    order = order or _order_of(channels, "RGB")
+    if order != "L" and len(order) != channels:
+        raise ValueError(f"{channels}-channel image does not match channel order {order}")
+    return _convert(image, order, color)
+
+
+def from_pil(image, color=False):
+    """Gray or BGR frame from a PIL image (Image.open, pyautogui.screenshot) in one conversion."""
+    if image.mode not in ("L", "RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    with PROFILER.span("decode"):
+        pixels = np.asarray(image)
+    return _convert(pixels, image.mode, color)
+
+
+def load(source, color=False):
+    """
+    Gray (or BGR with color=True) frame from a path, encoded bytes-like buffer,
+    PIL image or RGB(A)/gray array, whichever source is given.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return read(source, color)
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        return decode(source, color)
+    if isinstance(source, np.ndarray):
+        return from_array(source, color=color)
+    if hasattr(source, "mode") and hasattr(source, "getbands"):
+        return from_pil(source, color)
+    raise TypeError(f"Cannot load a frame from {type(source).__name__}")
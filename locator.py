@@ -0,0 +1,141 @@
+import glob
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from ingest import from_array, read
+
+# pyautogui.locateOnScreen() without confidence= only accepts exact matches,
+# which score ~1.0 here; lower this (e.g. 0.85) for locateOnScreen(confidence=)-like
+# fuzzy matching, which also finds look-alike elements
+LOCATE_CONFIDENCE = 0.99
+PYRAMID_SCALE = 0.5
+MIN_COARSE_SIDE = 12     # templates smaller than this after downscaling are searched at full size
+COARSE_CANDIDATES = 3    # coarse peaks refined per template
+COARSE_SLACK = 0.25      # coarse scores sit up to this far below the final one (exact matches at odd offsets: ~0.84)
+
+Match = namedtuple("Match", "name left top width height center score")
+
+
+def to_gray(image):
+    """Gray, BGR or BGRA array to a single-channel image."""
+    image = np.asarray(image)
+    return from_array(image, None if image.ndim == 2 else "BGRA"[:image.shape[2]])
+
+
+def load_templates(pattern):
+    """Reads every image matching a glob (e.g. "test/*.png") into {file name: array}."""
+    templates = {}
+    for path in sorted(glob.glob(pattern)):
+        try:
+            templates[os.path.basename(path)] = read(path, color=True)
+        except FileNotFoundError:
+            print(f"Warning: could not read template {path}")
+    return templates
+
+
+def _peaks(result, count, min_distance):
+    """Up to count (score, x, y) maxima of a matchTemplate result, at least min_distance apart."""
+    result = result.copy()
+    peaks = []
+    for _ in range(count):
+        _, score, _, (x, y) = cv2.minMaxLoc(result)
+        if not np.isfinite(score):
+            break
+        peaks.append((score, x, y))
+        result[max(0, y - min_distance):y + min_distance + 1,
+               max(0, x - min_distance):x + min_distance + 1] = -np.inf
+    return peaks
+
+
+class TemplateLocator:
+    """
+    Finds many templates in one frame, instead of one locateOnScreen() per template.
+
+    The frame is converted to grayscale and downscaled once per locate_all()
+    call and shared by every template. Each template is first searched on the
+    downscaled frame; the best few coarse peaks are then refined with a full
+    resolution match in a small window around them. Templates are spread over a
+    thread pool (cv2.matchTemplate releases the GIL).
+
+    A template counts as found when its TM_CCOEFF_NORMED score reaches
+    confidence; the default only accepts exact matches, like locateOnScreen()
+    without confidence=.
+    """
+
+    def __init__(self, templates, confidence=LOCATE_CONFIDENCE, scale=PYRAMID_SCALE, workers=None):
+        if not 0 < scale <= 1:
+            raise ValueError(f"scale must be in (0, 1], got {scale}")
+        self.confidence = confidence
+        self.scale = scale
+        self.workers = workers
+        self.templates = {}
+        for name, image in dict(templates).items():
+            gray = to_gray(image)
+            small = None
+            if scale < 1 and min(gray.shape) * scale >= MIN_COARSE_SIDE:
+                small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            self.templates[name] = (gray, small)
+
+    @classmethod
+    def from_glob(cls, pattern, **kwargs):
+        """Locator for every image matching pattern, keyed by file name."""
+        return cls(load_templates(pattern), **kwargs)
+
+    def _locate_one(self, name, gray, small, frame_gray, frame_small):
+        h, w = gray.shape
+        frame_h, frame_w = frame_gray.shape
+        if h > frame_h or w > frame_w:
+            return None
+
+        if small is None or frame_small is None:
+            result = cv2.matchTemplate(frame_gray, gray, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (x, y) = cv2.minMaxLoc(result)
+        else:
+            coarse = cv2.matchTemplate(frame_small, small, cv2.TM_CCOEFF_NORMED)
+            candidates = [p for p in _peaks(coarse, COARSE_CANDIDATES, max(small.shape) // 2)
+                          if p[0] >= self.confidence - COARSE_SLACK]
+            score, x, y = -1.0, 0, 0
+            pad = int(np.ceil(1 / self.scale)) + 1
+            for _, cx, cy in candidates:
+                x0 = max(0, int(cx / self.scale) - pad)
+                y0 = max(0, int(cy / self.scale) - pad)
+                x1 = min(frame_w, int(cx / self.scale) + w + pad)
+                y1 = min(frame_h, int(cy / self.scale) + h + pad)
+                fine = cv2.matchTemplate(frame_gray[y0:y1, x0:x1], gray, cv2.TM_CCOEFF_NORMED)
+                _, fine_score, _, (fx, fy) = cv2.minMaxLoc(fine)
+                if fine_score > score:
+                    score, x, y = fine_score, x0 + fx, y0 + fy
+
+        if score < self.confidence:
+            return None
+        return Match(name, x, y, w, h, (x + w // 2, y + h // 2), float(score))
+
+    def locate_all(self, frame):
+        """{template name: Match or None} for every template in one frame."""
+        frame_gray = to_gray(frame)
+        frame_small = None
+        if self.scale < 1:
+            frame_small = cv2.resize(frame_gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+
+        def locate(item):
+            name, (gray, small) = item
+            return name, self._locate_one(name, gray, small, frame_gray, frame_small)
+
+        items = list(self.templates.items())
+        if self.workers == 1 or len(items) < 2:
+            return dict(map(locate, items))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return dict(executor.map(locate, items))
+
+    def locate(self, frame, name):
+        """Match for a single template, or None."""
+        gray, small = self.templates[name]
+        frame_gray = to_gray(frame)
+        frame_small = None
+        if small is not None:
+            frame_small = cv2.resize(frame_gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return self._locate_one(name, gray, small, frame_gray, frame_small)
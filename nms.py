@@ -0,0 +1,211 @@
+import numpy as np
+
+NMS_IOU = 0.5
+MERGE_GAP = (8, 2)       # words on one text row: merge across 8 px horizontally, 2 px vertically
+NESTED_RATIO = 0.7       # an inner box covering this much of its container is a duplicate
+
+
+def _as_boxes(boxes):
+    return np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+
+
+def overlap_pairs(boxes, gap=(0, 0)):
+    """
+    (i, j) index arrays, i < j, of every pair of boxes that overlap or touch
+    once each box is grown by gap = (gx, gy) pixels on each axis.
+
+    Sort-and-sweep: boxes are sorted along one axis and, for each box, the
+    ones starting before it ends are found with a binary search, so the cost
+    is O(N log N) plus the number of pairs overlapping on that axis, not N^2.
+    The axis producing fewer candidate pairs is used.
+    """
+    boxes = _as_boxes(boxes)
+    count = len(boxes)
+    empty = np.empty(0, dtype=np.int64)
+    if count < 2:
+        return empty, empty
+    gx, gy = gap
+    x0, y0 = boxes[:, 0], boxes[:, 1]
+    x1, y1 = x0 + boxes[:, 2], y0 + boxes[:, 3]
+
+    sweeps = []
+    for start, end, reach in ((x0, x1, gx), (y0, y1, gy)):
+        order = np.argsort(start, kind="stable")
+        sorted_start = start[order]
+        ends = np.searchsorted(sorted_start, end[order] + reach, side="right")
+        partners = np.maximum(ends - np.arange(1, count + 1), 0)
+        sweeps.append((int(partners.sum()), order, partners))
+    total, order, partners = min(sweeps, key=lambda sweep: sweep[0])
+    if total == 0:
+        return empty, empty
+
+    # position p pairs with sorted positions p+1 .. p+partners[p]
+    first = np.repeat(np.arange(count), partners)
+    offset = np.arange(total) - np.repeat(np.cumsum(partners) - partners, partners)
+    a, b = order[first], order[first + 1 + offset]
+    hit = ((x0[a] <= x1[b] + gx) & (x0[b] <= x1[a] + gx) &
+           (y0[a] <= y1[b] + gy) & (y0[b] <= y1[a] + gy))
+    a, b = a[hit], b[hit]
+    return np.minimum(a, b), np.maximum(a, b)
+
+
+def pair_iou(boxes, i, j):
+    """IoU of boxes[i] and boxes[j] for index arrays i, j."""
+    boxes = _as_boxes(boxes).astype(np.float64)
+    a, b = boxes[i], boxes[j]
+    ix = np.minimum(a[:, 0] + a[:, 2], b[:, 0] + b[:, 2]) - np.maximum(a[:, 0], b[:, 0])
+    iy = np.minimum(a[:, 1] + a[:, 3], b[:, 1] + b[:, 3]) - np.maximum(a[:, 1], b[:, 1])
+    inter = np.clip(ix, 0, None) * np.clip(iy, 0, None)
+    union = a[:, 2] * a[:, 3] + b[:, 2] * b[:, 3] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def connected_labels(count, i, j):
+    """Component label (the smallest member index) of each of count nodes joined by edges i-j."""
+    labels = np.arange(count)
+    if not len(i):
+        return labels
+    while True:
+        previous = labels
+        low = np.minimum(labels[i], labels[j])
+        labels = labels.copy()
+        np.minimum.at(labels, i, low)
+        np.minimum.at(labels, j, low)
+        labels = labels[labels]          # pointer jumping
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def nms(boxes, scores=None, iou_threshold=NMS_IOU):
+    """
+    Greedy non-maximum suppression: indices of the boxes kept, best score first.
+
+    A box is dropped when it overlaps an already kept, higher scoring box with
+    IoU >= iou_threshold. scores defaults to box area (larger wins); ties go
+    to the lower index. Only pairs found by overlap_pairs are compared.
+    """
+    boxes = _as_boxes(boxes)
+    count = len(boxes)
+    if scores is None:
+        scores = boxes[:, 2] * boxes[:, 3]
+    rank = np.empty(count, dtype=np.int64)
+    by_score = np.lexsort((np.arange(count), -np.asarray(scores, dtype=np.float64)))
+    rank[by_score] = np.arange(count)
+
+    i, j = overlap_pairs(boxes)
+    heavy = pair_iou(boxes, i, j) >= iou_threshold
+    i, j = i[heavy], j[heavy]
+    # orient each pair from the better ranked box to the one it may suppress
+    swap = rank[i] > rank[j]
+    winner, loser = np.where(swap, j, i), np.where(swap, i, j)
+    order = np.argsort(winner, kind="stable")
+    winner, loser = winner[order], loser[order]
+    starts = np.searchsorted(winner, np.arange(count + 1))
+
+    suppressed = np.zeros(count, dtype=bool)
+    for box in by_score:
+        if not suppressed[box] and starts[box] != starts[box + 1]:
+            suppressed[loser[starts[box]:starts[box + 1]]] = True
+    return by_score[~suppressed[by_score]]
+
+
+def _contains(boxes, i, j):
+    """Mask of pairs where one box lies entirely inside the other."""
+    x0, y0 = boxes[:, 0], boxes[:, 1]
+    x1, y1 = x0 + boxes[:, 2], y0 + boxes[:, 3]
+    i_in_j = (x0[i] >= x0[j]) & (y0[i] >= y0[j]) & (x1[i] <= x1[j]) & (y1[i] <= y1[j])
+    j_in_i = (x0[j] >= x0[i]) & (y0[j] >= y0[i]) & (x1[j] <= x1[i]) & (y1[j] <= y1[i])
+    return i_in_j | j_in_i
+
+
+def merge_groups(boxes, gap=MERGE_GAP, iou_threshold=None):
+    """
+    Group label per box: boxes within gap = (gx, gy) pixels of each other are
+    joined, directly or through other boxes. A box inside another is nesting,
+    not fragmentation, so such pairs are not joined (see suppress_nested).
+    With iou_threshold, only pairs overlapping at least that much are joined
+    instead.
+    """
+    boxes = _as_boxes(boxes)
+    if iou_threshold is None:
+        i, j = overlap_pairs(boxes, gap)
+        apart = ~_contains(boxes, i, j)
+        i, j = i[apart], j[apart]
+    else:
+        i, j = overlap_pairs(boxes)
+        keep = pair_iou(boxes, i, j) >= iou_threshold
+        i, j = i[keep], j[keep]
+    return connected_labels(len(boxes), i, j)
+
+
+def merge_boxes(boxes, gap=MERGE_GAP, iou_threshold=None):
+    """
+    Replaces each group of merge_groups() by its bounding box.
+
+    Merging is repeated until no merged boxes come within gap of each other,
+    so a row of words ends up as one box. Returns the merged (M, 4) int32
+    boxes, ordered by their first member.
+    """
+    boxes = _as_boxes(boxes)
+    while len(boxes) > 1:
+        labels = merge_groups(boxes, gap, iou_threshold)
+        groups, inverse = np.unique(labels, return_inverse=True)
+        if len(groups) == len(boxes):
+            break
+        x0 = np.full(len(groups), np.iinfo(np.int64).max)
+        y0 = x0.copy()
+        x1 = np.full(len(groups), np.iinfo(np.int64).min)
+        y1 = x1.copy()
+        np.minimum.at(x0, inverse, boxes[:, 0])
+        np.minimum.at(y0, inverse, boxes[:, 1])
+        np.maximum.at(x1, inverse, boxes[:, 0] + boxes[:, 2])
+        np.maximum.at(y1, inverse, boxes[:, 1] + boxes[:, 3])
+        boxes = np.stack([x0, y0, x1 - x0, y1 - y0], axis=1)
+    return boxes.astype(np.int32)
+
+
+def suppress_nested(boxes, min_ratio=NESTED_RATIO):
+    """
+    Indices, ascending, of the boxes that are not a nested duplicate.
+
+    A box is dropped when it lies entirely inside another box and covers at
+    least min_ratio of its area, like the inner and outer contour of the same
+    border in a RETR_TREE hierarchy; min_ratio=0 drops every nested box.
+    Identical boxes keep the lowest index.
+    """
+    boxes = _as_boxes(boxes)
+    count = len(boxes)
+    i, j = overlap_pairs(boxes)
+    x0, y0 = boxes[:, 0], boxes[:, 1]
+    x1, y1 = x0 + boxes[:, 2], y0 + boxes[:, 3]
+    area = boxes[:, 2] * boxes[:, 3]
+
+    def inside(inner, outer):
+        return (x0[inner] >= x0[outer]) & (y0[inner] >= y0[outer]) & (x1[inner] <= x1[outer]) & (y1[inner] <= y1[outer])
+
+    def close_in_size(inner, outer):
+        return area[inner] >= min_ratio * area[outer]
+
+    # i < j, so for identical boxes only j (the higher index) is dropped
+    drop_j = inside(j, i) & close_in_size(j, i)
+    drop_i = inside(i, j) & close_in_size(i, j) & ~inside(j, i)
+    dropped = np.zeros(count, dtype=bool)
+    dropped[j[drop_j]] = True
+    dropped[i[drop_i]] = True
+    return np.flatnonzero(~dropped)
+
+
+def clean_boxes(boxes, gap=MERGE_GAP, nested_ratio=NESTED_RATIO, iou_threshold=NMS_IOU):
+    """
+    The full post-processing stage: drop nested duplicates, merge fragments
+    within gap, then suppress what still overlaps by iou_threshold or more.
+    Any step is skipped when its parameter is None.
+    """
+    boxes = _as_boxes(boxes)
+    if nested_ratio is not None:
+        boxes = boxes[suppress_nested(boxes, nested_ratio)]
+    if gap is not None:
+        boxes = merge_boxes(boxes, gap)
+    if iou_threshold is not None:
+        boxes = boxes[np.sort(nms(boxes, iou_threshold=iou_threshold))]
+    return boxes.astype(np.int32)
@@ -0,0 +1,425 @@
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from ingest import read
+from nms import clean_boxes
+from profiling import PROFILER
+
+MIN_CONTOUR_AREA = 100
+MAX_CONTOUR_AREA = 15000
+CANNY_LOW_THRESHOLD = 50
+CANNY_HIGH_THRESHOLD = 150
+MORPH_KERNEL_SIZE = (12, 12)
+MORPH_ITERATIONS = 1
+MARGIN = 5
+
+ADAPTIVE_BLOCK_SIZE = 15
+ADAPTIVE_C = 5
+ADAPTIVE_KERNEL_SIZE = (9, 3)
+
+STREAM_BAND = 128        # rows stream(order="top") detects first, doubling for each later band
+# Canny's hysteresis follows weak edges any distance to a strong one; this much
+# extra context makes a band's edges match the whole frame's in practice
+HYSTERESIS_CONTEXT = 32
+
+# One record per contour: its index in the findContours output, bounding box,
+# polygon area (as cv2.contourArea) and centroid (as cv2.moments).
+ELEMENT_DTYPE = np.dtype([
+    ("index", np.int32),
+    ("x", np.int32), ("y", np.int32), ("w", np.int32), ("h", np.int32),
+    ("area", np.float64),
+    ("cx", np.float64), ("cy", np.float64),
+])
+
+# Parameter sets matching the original scripts.
+PRESETS = {
+    # gui_new.py / gui1.py / detection.py / contours1.py
+    "canny": dict(method="canny"),
+    # adp.py
+    "adaptive": dict(method="adaptive", min_area=15, max_area=10000,
+                     kernel_size=ADAPTIVE_KERNEL_SIZE),
+    # ele.py: raw Canny edges, full hierarchy, no area filter
+    "tree": dict(method="canny", kernel_size=None, retrieval=cv2.RETR_TREE,
+                 min_area=None, max_area=None),
+}
+
+# Orders stream() can yield elements in, as functions of an ELEMENT_DTYPE array
+# returning the permutation to visit it in. None keeps findContours order.
+ELEMENT_ORDERS = {
+    "top": lambda stats: np.lexsort((stats["x"], stats["y"])),     # reading order
+    "left": lambda stats: np.lexsort((stats["y"], stats["x"])),
+    "area": lambda stats: np.argsort(-stats["area"], kind="stable"),  # largest first
+    "score": lambda stats: np.argsort(-fill_ratio(stats), kind="stable"),
+    None: lambda stats: np.arange(len(stats)),
+}
+
+Element = namedtuple("Element", "bbox crop score")
+
+
+def fill_ratio(stats):
+    """Contour area over bounding box area: 1.0 for a solid rectangle, lower for ragged shapes."""
+    box_area = stats["w"].astype(np.float64) * stats["h"]
+    return np.divide(stats["area"], box_area, out=np.zeros(len(stats)), where=box_area > 0)
+
+
+def contour_stats(contours):
+    """
+    Area, bounding box and centroid of every contour in one vectorized pass.
+
+    All contour points are concatenated once and the per-contour sums (shoelace
+    area, first moments) and extents are taken with ufunc.reduceat, so the cost
+    no longer grows with a Python loop over contours. Returns an ELEMENT_DTYPE
+    array matching cv2.contourArea / cv2.boundingRect / cv2.moments; contours
+    with zero area get the box center as centroid, like the scripts did.
+    """
+    count = len(contours)
+    stats = np.zeros(count, dtype=ELEMENT_DTYPE)
+    if count == 0:
+        return stats
+    lengths = np.fromiter((len(c) for c in contours), dtype=np.int64, count=count)
+    starts = np.cumsum(lengths) - lengths
+    points = np.concatenate(contours).reshape(-1, 2).astype(np.int64)
+    x, y = points[:, 0], points[:, 1]
+
+    # Index of the next vertex, wrapping around within each contour.
+    following = np.arange(1, len(points) + 1)
+    following[starts + lengths - 1] = starts
+    x_next, y_next = x[following], y[following]
+
+    cross = x * y_next - x_next * y
+    double_area = np.add.reduceat(cross, starts).astype(np.float64)
+    m10 = np.add.reduceat((x + x_next) * cross, starts) / 6.0
+    m01 = np.add.reduceat((y + y_next) * cross, starts) / 6.0
+
+    x_min = np.minimum.reduceat(x, starts)
+    y_min = np.minimum.reduceat(y, starts)
+    stats["index"] = np.arange(count)
+    stats["x"] = x_min
+    stats["y"] = y_min
+    stats["w"] = np.maximum.reduceat(x, starts) - x_min + 1
+    stats["h"] = np.maximum.reduceat(y, starts) - y_min + 1
+    stats["area"] = np.abs(double_area) / 2.0
+
+    m00 = double_area / 2.0
+    has_area = m00 != 0
+    safe_m00 = np.where(has_area, m00, 1.0)
+    stats["cx"] = np.where(has_area, m10 / safe_m00, stats["x"] + stats["w"] // 2)
+    stats["cy"] = np.where(has_area, m01 / safe_m00, stats["y"] + stats["h"] // 2)
+    return stats
+
+
+def boxes_of(stats):
+    """(N, 4) int32 x, y, w, h array from an ELEMENT_DTYPE array."""
+    return np.stack([stats["x"], stats["y"], stats["w"], stats["h"]], axis=1).astype(np.int32).reshape(-1, 4)
+
+
+def load_frame(path):
+    """Reads an image file into a BGR array, raising FileNotFoundError if it can't be read (see ingest.read)."""
+    return read(path, color=True)
+
+
+class DetectorPipeline:
+    """
+    Edge/threshold -> morphological close -> findContours -> area filter.
+
+    Everything that does not depend on the frame (the structuring element and
+    the thresholds) is built once in the constructor, so a single instance can
+    be reused for any number of frames. No windows are opened and nothing is
+    written to disk.
+
+    With scale < 1 the grayscale frame is shrunk before edge detection. The
+    morphology kernel and the area bounds are scaled to match, so the settings
+    keep meaning full-resolution pixels, and elements()/detect() map results
+    back to full-resolution coordinates. find_contours() returns contours in
+    the downscaled image.
+
+    With clean=True, detect() passes its boxes through nms.clean_boxes:
+    nested duplicates dropped, fragments merged, overlaps suppressed. That is
+    mostly useful with RETR_TREE, which reports the inner and outer contour of
+    every border. elements() and stream() still return the raw contours;
+    detectors that assemble boxes from parts of a frame (tiling.py,
+    incremental.py) call postprocess() on the assembled list.
+
+    Each stage runs inside a profiler span (color, downscale, edges,
+    morphology, contours, stats, filter, clean); with the shared PROFILER
+    disabled, as it is by default, the spans cost next to nothing.
+    """
+
+    def __init__(self, method="canny", min_area=MIN_CONTOUR_AREA, max_area=MAX_CONTOUR_AREA,
+                 canny_low=CANNY_LOW_THRESHOLD, canny_high=CANNY_HIGH_THRESHOLD,
+                 kernel_size=MORPH_KERNEL_SIZE, iterations=MORPH_ITERATIONS,
+                 block_size=ADAPTIVE_BLOCK_SIZE, adaptive_c=ADAPTIVE_C,
+                 retrieval=cv2.RETR_EXTERNAL, scale=1.0, clean=False, profiler=None):
+        if method not in ("canny", "adaptive"):
+            raise ValueError(f"Unknown detection method: {method}")
+        if not 0 < scale <= 1:
+            raise ValueError(f"scale must be in (0, 1], got {scale}")
+        self.method = method
+        self.min_area = min_area
+        self.max_area = max_area
+        self.canny_low = canny_low
+        self.canny_high = canny_high
+        self.kernel_size = kernel_size
+        self.iterations = iterations
+        self.block_size = block_size
+        self.adaptive_c = adaptive_c
+        self.retrieval = retrieval
+        self.scale = scale
+        self.clean = clean
+        self.profiler = profiler or PROFILER
+
+        # Kernel and block size in the (possibly downscaled) image the contours are
+        # traced on; areas are compared after mapping back, see elements().
+        if method == "adaptive" and scale < 1:
+            # adaptiveThreshold needs an odd block size >= 3
+            self.block_size = max(3, int(round(block_size * scale)) | 1)
+        # INTER_AREA has a fast path for integer ratios only; elsewhere it is
+        # several times slower than INTER_LINEAR for about the same boxes.
+        integer_ratio = abs(1 / scale - round(1 / scale)) < 1e-6
+        self.interpolation = cv2.INTER_AREA if integer_ratio else cv2.INTER_LINEAR
+        self.kernel = None
+        if kernel_size is not None:
+            scaled_kernel = tuple(max(1, int(round(k * scale))) for k in kernel_size)
+            self.kernel = cv2.getStructuringElement(cv2.MORPH_RECT, scaled_kernel)
+
+    @classmethod
+    def from_preset(cls, name, **overrides):
+        """Builds a pipeline from one of PRESETS, with keyword overrides."""
+        try:
+            params = dict(PRESETS[name])
+        except KeyError:
+            raise ValueError(f"Unknown preset: {name}") from None
+        params.update(overrides)
+        return cls(**params)
+
+    def to_gray(self, frame):
+        """Converts a gray, BGR or BGRA frame to a single-channel image."""
+        if frame.ndim == 2:
+            return frame
+        channels = frame.shape[2]
+        if channels == 4:
+            with self.profiler.span("color"):
+                return cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY)
+        if channels == 3:
+            with self.profiler.span("color"):
+                return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if channels == 1:
+            return frame[:, :, 0]
+        raise ValueError(f"Unexpected number of channels in image: {channels}")
+
+    def downscale(self, gray):
+        """Shrinks a grayscale image by the pipeline scale (no-op at scale 1)."""
+        if self.scale == 1:
+            return gray
+        with self.profiler.span("downscale"):
+            return cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=self.interpolation)
+
+    def edges(self, gray):
+        """Canny edges or inverted adaptive threshold of a grayscale image."""
+        with self.profiler.span("edges"):
+            if self.method == "canny":
+                return cv2.Canny(gray, self.canny_low, self.canny_high)
+            return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                         cv2.THRESH_BINARY_INV, self.block_size, self.adaptive_c)
+
+    def close(self, binary):
+        """Morphological close with the precomputed kernel (no-op when kernel_size is None)."""
+        if self.kernel is None:
+            return binary
+        with self.profiler.span("morphology"):
+            return cv2.morphologyEx(binary, cv2.MORPH_CLOSE, self.kernel, iterations=self.iterations)
+
+    def mask(self, gray):
+        """Returns the binary mask contours are traced on."""
+        return self.close(self.edges(gray))
+
+    def contours_from_mask(self, binary):
+        """findContours on a binary mask, returning (contours, hierarchy)."""
+        with self.profiler.span("contours"):
+            return cv2.findContours(binary, self.retrieval, cv2.CHAIN_APPROX_SIMPLE)
+
+    def find_contours(self, frame):
+        """Runs the pipeline up to findContours and returns (contours, hierarchy)."""
+        return self.contours_from_mask(self.mask(self.downscale(self.to_gray(frame))))
+
+    def area_mask(self, area):
+        """Boolean mask of full-resolution areas strictly inside the MIN/MAX bounds (None disables a bound)."""
+        keep = np.ones(len(area), dtype=bool)
+        if self.min_area is not None:
+            keep &= area > self.min_area
+        if self.max_area is not None:
+            keep &= area < self.max_area
+        return keep
+
+    def upscale(self, stats, shape):
+        """Maps ELEMENT_DTYPE records from the downscaled image back to a frame of the given shape."""
+        if self.scale == 1:
+            return stats
+        out = stats.copy()
+        height, width = shape[:2]
+        x0 = np.floor(stats["x"] / self.scale)
+        y0 = np.floor(stats["y"] / self.scale)
+        x1 = np.minimum(np.ceil((stats["x"] + stats["w"]) / self.scale), width)
+        y1 = np.minimum(np.ceil((stats["y"] + stats["h"]) / self.scale), height)
+        out["x"], out["y"] = x0, y0
+        out["w"], out["h"] = x1 - x0, y1 - y0
+        out["area"] = stats["area"] / (self.scale * self.scale)
+        out["cx"] = (stats["cx"] + 0.5) / self.scale - 0.5
+        out["cy"] = (stats["cy"] + 0.5) / self.scale - 0.5
+        return out
+
+    def measure(self, frame):
+        """ELEMENT_DTYPE records of every contour in frame, in frame coordinates, unfiltered."""
+        contours, _ = self.find_contours(frame)
+        with self.profiler.span("stats"):
+            return self.upscale(contour_stats(contours), frame.shape)
+
+    def elements(self, frame):
+        """ELEMENT_DTYPE records, in frame coordinates, of the contours that pass the area filter."""
+        stats = self.measure(frame)
+        with self.profiler.span("filter"):
+            return stats[self.area_mask(stats["area"])]
+
+    def postprocess(self, boxes):
+        """The clean stage of detect() on raw x, y, w, h boxes (a no-op unless clean=True)."""
+        if not self.clean:
+            return boxes
+        with self.profiler.span("clean"):
+            return clean_boxes(boxes)
+
+    def detect(self, frame):
+        """Returns an (N, 4) int32 array of x, y, w, h boxes for the elements in frame."""
+        return self.postprocess(boxes_of(self.elements(frame)))
+
+    @property
+    def context(self):
+        """Rows/columns around a region whose mask depends on pixels outside it (close, Canny, threshold block)."""
+        reach = max(self.kernel.shape) * max(1, self.iterations) if self.kernel is not None else 0
+        if self.method == "adaptive":
+            return reach + self.block_size // 2 + 4
+        return reach + 4 + HYSTERESIS_CONTEXT
+
+    def stream(self, frame, order="top", margin=0, band=STREAM_BAND):
+        """
+        Yields Element(bbox, crop, score) for each element of frame in the given order.
+
+        order is one of ELEMENT_ORDERS: "top" (reading order), "left", "area"
+        (largest first), "score" or None (contour order). score is the
+        element's fill_ratio. crop is a view into frame grown by margin, so
+        nothing is copied for elements the caller never reaches.
+
+        With order="top" (and scale 1) the frame is detected from the top in
+        bands, band rows first and twice as many each time after, and a
+        band's elements are yielded before the next band is detected: the
+        first elements come after a fraction of the work, and a caller that
+        stops early never pays for the rest. The elements are those of
+        elements(), in the same order; draining the stream costs more than
+        detect(), since every band repeats Canny over context rows. Every
+        other order needs all elements before it can yield the first.
+        """
+        if order not in ELEMENT_ORDERS:
+            raise ValueError(f"Unknown order: {order} (expected one of {', '.join(map(str, ELEMENT_ORDERS))})")
+        if order == "top" and self.scale == 1:
+            return self._stream_bands(frame, margin, band)
+        return self._stream(frame, order, margin)
+
+    def _stream(self, frame, order, margin):
+        stats = self.elements(frame)
+        yield from self._yield(frame, stats, ELEMENT_ORDERS[order](stats), margin)
+
+    def _yield(self, frame, stats, visit, margin):
+        scores = fill_ratio(stats)
+        for i in visit:
+            box = (int(stats["x"][i]), int(stats["y"][i]), int(stats["w"][i]), int(stats["h"][i]))
+            yield Element(box, crop(frame, box, margin), float(scores[i]))
+
+    def _stream_bands(self, frame, margin, band):
+        """
+        Builds the mask of frame top-down, band rows at a time, and yields the
+        elements finished so far in reading order before building the next.
+
+        Each band of the mask is computed from the band plus context rows on
+        either side, so it matches the whole-frame mask (Canny's hysteresis
+        aside, see HYSTERESIS_CONTEXT). Contours are traced
+        from start to the last mask row: the ones that don't reach that row
+        are complete, and those starting above the first incomplete one
+        (safe) are yielded; every later element starts at or below safe.
+        start stays above any complete contour crossing safe, so contours
+        nested in it stay nested (RETR_EXTERNAL).
+        """
+        height, width = frame.shape[:2]
+        context = self.context
+        mask = np.empty((height, width), dtype=np.uint8)
+        filled = 0
+        y, start, rows = 0, 0, band
+        while y < height:
+            end = min(height, filled + rows)
+            above = max(0, filled - context)
+            band_mask = self.mask(self.to_gray(frame[above:min(height, end + context)]))
+            mask[filled:end] = band_mask[filled - above:end - above]
+            filled = end
+            # one row above start, so contours cut there start above it
+            origin = max(0, start - 1)
+            contours, _ = self.contours_from_mask(mask[origin:filled])
+            with self.profiler.span("stats"):
+                stats = contour_stats(contours)
+            stats["y"] += origin
+            stats["cy"] += origin
+            stats = stats[stats["y"] >= start]
+            top, bottom = stats["y"], stats["y"] + stats["h"]
+            complete = bottom < filled if filled < height else np.ones(len(stats), dtype=bool)
+            safe = int(top[~complete].min()) if not complete.all() else filled
+            if safe <= y:
+                rows *= 2
+                continue
+            done = stats[(top >= y) & (top < safe)]
+            done = done[self.area_mask(done["area"])]
+            yield from self._yield(frame, done, ELEMENT_ORDERS["top"](done), margin)
+            crossing = complete & (top < safe) & (bottom > safe)
+            start = int(top[crossing].min()) if crossing.any() else safe
+            y, rows = safe, rows * 2
+
+
+def box_iou(boxes_a, boxes_b):
+    """(N, M) intersection-over-union matrix between two sets of x, y, w, h boxes."""
+    a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+    ix = np.minimum(a[:, None, 0] + a[:, None, 2], b[None, :, 0] + b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0])
+    iy = np.minimum(a[:, None, 1] + a[:, None, 3], b[None, :, 1] + b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1])
+    inter = np.clip(ix, 0, None) * np.clip(iy, 0, None)
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def expand_boxes(boxes, margin, shape):
+    """Grows x, y, w, h boxes by margin on every side, clipped to an image of the given shape."""
+    boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+    height, width = shape[:2]
+    x0 = np.maximum(boxes[:, 0] - margin, 0)
+    y0 = np.maximum(boxes[:, 1] - margin, 0)
+    x1 = np.minimum(boxes[:, 0] + boxes[:, 2] + margin, width)
+    y1 = np.minimum(boxes[:, 1] + boxes[:, 3] + margin, height)
+    return np.stack([x0, y0, x1 - x0, y1 - y0], axis=1).astype(np.int32)
+
+
+def crop(frame, box, margin=0, copy=False):
+    """
+    Region x, y, w, h of frame, grown by margin and clipped to the frame.
+
+    Returns a view into frame, so no pixels are copied and the frame must not be
+    modified while the crop is in use; pass copy=True to get a contiguous copy
+    of just the crop.
+    """
+    x, y, w, h = (int(v) for v in box)
+    height, width = frame.shape[:2]
+    region = frame[max(0, y - margin):min(height, y + h + margin),
+                   max(0, x - margin):min(width, x + w + margin)]
+    return np.ascontiguousarray(region) if copy else region
+
+
+def iter_crops(frame, boxes, margin=0, copy=False):
+    """Yields (box, crop) for each x, y, w, h box; crops are views unless copy=True."""
+    for box in np.asarray(boxes, dtype=np.int32).reshape(-1, 4):
+        yield box, crop(frame, box, margin, copy)
@@ -0,0 +1,123 @@
+import csv
+import json
+import os
+import time
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+
+
+class _NullSpan:
+    """Span handed out while profiling is off: entering and leaving it does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """
+    Collects named timing spans (decode, edges, contours, encode, ...) over many frames.
+
+        with PROFILER.span("edges"):
+            binary = cv2.Canny(gray, 50, 150)
+
+    While disabled, span() returns a shared no-op context manager, so leaving
+    the spans in the detection path costs one attribute check per stage.
+    Samples are kept per span name; report() gives count, total, mean and
+    percentiles, and to_json()/to_csv() write it out. callback, if given, is
+    called with (name, seconds) as each span ends, e.g. to forward timings to
+    a metrics system. Spans may be recorded from several threads (the crop
+    writer encodes on a pool).
+    """
+
+    def __init__(self, enabled=True, callback=None):
+        self.enabled = enabled
+        self.callback = callback
+        self.samples = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Drops every recorded sample."""
+        self.samples = {}
+
+    def span(self, name):
+        """Context manager timing the enclosed block as one sample of name."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, seconds):
+        """Adds one sample of name, measured elsewhere."""
+        self.samples.setdefault(name, []).append(seconds)
+        if self.callback is not None:
+            self.callback(name, seconds)
+
+    def report(self):
+        """{span name: {count, total_ms, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}} in first-seen order."""
+        report = {}
+        for name, samples in list(self.samples.items()):
+            ms = np.asarray(samples) * 1000
+            row = {"count": len(ms), "total_ms": float(ms.sum()), "mean_ms": float(ms.mean())}
+            for p, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+                row[f"p{p}_ms"] = float(value)
+            row["max_ms"] = float(ms.max())
+            report[name] = row
+        return report
+
+    def to_json(self, path):
+        """Writes report() to path as JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def to_csv(self, path):
+        """Writes report() to path as CSV, one row per span."""
+        report = self.report()
+        fields = ["count", "total_ms", "mean_ms"] + [f"p{p}_ms" for p in PERCENTILES] + ["max_ms"]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["span"] + fields)
+            for name, row in report.items():
+                writer.writerow([name] + [row[field] for field in fields])
+
+    def summary(self):
+        """Multi-line table of report()."""
+        lines = [f"{'span':<12} {'count':>6} {'total ms':>10} {'mean':>8} {'p50':>8} {'p90':>8} {'p99':>8}"]
+        for name, r in self.report().items():
+            lines.append(f"{name:<12} {r['count']:>6} {r['total_ms']:>10.2f} {r['mean_ms']:>8.3f} "
+                         f"{r['p50_ms']:>8.3f} {r['p90_ms']:>8.3f} {r['p99_ms']:>8.3f}")
+        return "\n".join(lines)
+
+
+# Shared by the pipeline, the crop writer and the scripts. Off unless
+# DETECTOR_PROFILE is set in the environment or PROFILER.enable() is called.
+PROFILER = Profiler(enabled=bool(os.environ.get("DETECTOR_PROFILE")))
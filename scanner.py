@@ -0,0 +1,248 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+from walker import TreeWalker, WrapperTree
+
+SCAN_WORKERS = 4
+WINDOW_BUDGET = 10.0     # seconds one window may take before it is given up
+BUDGET_GRACE = 1.0       # extra seconds a call already in flight gets before its window is abandoned
+SPLIT_CHILDREN = 16      # a window with more top-level children is walked in chunks of this many
+POLL_INTERVAL = 0.05
+
+# an element found by a scan, with the properties the capture needs already read
+ScannedElement = namedtuple("ScannedElement", "rect depth control_type name automation_id class_name")
+# the outcome for one window, elements in a stable order
+WindowScan = namedtuple("WindowScan", "index window title elements visited errors timed_out seconds")
+
+
+def com_initializer():
+    """
+    Joins a worker thread to the COM multithreaded apartment, which UI
+    Automation calls from threads other than the main one need. Does nothing
+    where comtypes is missing (no Windows).
+    """
+    try:
+        import comtypes
+    except ImportError:
+        return
+    comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+
+
+class _DaemonPool:
+    """
+    Fixed set of daemon worker threads taking jobs from a queue.
+
+    ThreadPoolExecutor joins its threads when the interpreter exits, so a
+    call that never returns would keep the process alive after the scan
+    gave up on it; daemon threads don't.
+    """
+
+    def __init__(self, workers, initializer=None, name="scan"):
+        self._jobs = queue.SimpleQueue()
+        self._initializer = initializer
+        self._threads = [threading.Thread(target=self._work, name=f"{name}_{n}", daemon=True)
+                         for n in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn, *args):
+        future = Future()
+        self._jobs.put((future, fn, args))
+        return future
+
+    def _work(self):
+        failed = None
+        if self._initializer is not None:
+            try:
+                self._initializer()
+            except Exception as exc:
+                failed = exc
+        while (job := self._jobs.get()) is not None:
+            future, fn, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            if failed is not None:
+                future.set_exception(failed)
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+    def shutdown(self):
+        """Lets idle workers exit; a worker stuck in a call exits once it returns."""
+        for _ in self._threads:
+            self._jobs.put(None)
+
+
+class _Window:
+    """Bookkeeping of one window while its jobs are in flight."""
+
+    def __init__(self, index, window):
+        self.index = index
+        self.window = window
+        self.title = ""
+        self.chunks = None          # per chunk: list of ScannedElement, None until its job is done
+        self.visited = 0
+        self.errors = 0
+        self.spent = 0.0            # seconds of finished and abandoned jobs
+        self.timed_out = False
+        self.lock = threading.Lock()
+
+
+class _Job:
+    def __init__(self, state, chunk_index=None, chunk=None):
+        self.state = state
+        self.chunk_index = chunk_index      # None for the job listing the window's children
+        self.chunk = chunk
+        self.started = None
+        self.counted = False                # its seconds are in state.spent (finished or abandoned)
+
+    def count(self, now):
+        """Adds the job's seconds to its window once, whether it finishes or is abandoned first; needs state.lock."""
+        if not self.counted and self.started is not None:
+            self.state.spent += now - self.started
+            self.counted = True
+
+
+class WindowScanner:
+    """
+    Walks several windows at once on a bounded thread pool.
+
+    Nearly all the time of a capture scan is spent waiting on cross-process
+    UI Automation calls, so threads overlap well even with the GIL. Each
+    window is one job that lists its top-level children; a window with more
+    than split_children of them is then walked in several jobs of that many
+    children each, so one big window does not keep a single worker busy
+    while the others idle. Every job walks its part with a fresh TreeWalker
+    (walker_options are passed on) and reads the element properties the
+    capture needs in the worker.
+
+    Results are merged in window order, then chunk order, then walk order,
+    whatever the number of workers or the order jobs finish in, so element
+    numbering is stable from run to run.
+
+    window_budget bounds the seconds spent in each window's jobs (time
+    queued behind other windows does not count). A job stops walking once
+    its window is over budget and keeps what it found; a job stuck in one
+    call (a hung application) is given budget_grace more seconds and is
+    then abandoned, together with the rest of its window, which is marked
+    timed_out, so the scan moves on. An abandoned call still occupies its
+    thread until it returns; scan() does not wait for it, and the worker
+    threads are daemons, so it does not hold up interpreter exit either.
+
+    initializer runs once in every worker thread (com_initializer joins the
+    COM apartment); pass another callable, or None, for other providers.
+    """
+
+    def __init__(self, tree=None, workers=SCAN_WORKERS, window_budget=WINDOW_BUDGET, budget_grace=BUDGET_GRACE,
+                 split_children=SPLIT_CHILDREN, initializer=com_initializer, walker_options=None):
+        self.tree = tree if tree is not None else WrapperTree()
+        self.workers = workers
+        self.window_budget = window_budget
+        self.budget_grace = budget_grace
+        self.split_children = split_children
+        self.initializer = initializer
+        self.walker_options = walker_options or {}
+        self.seconds = 0.0
+
+    def _over_budget(self, job):
+        return (self.window_budget is not None and
+                job.state.spent + time.perf_counter() - job.started > self.window_budget)
+
+    def _run(self, job):
+        job.started = time.perf_counter()
+        try:
+            return self._list(job) if job.chunk_index is None else self._walk(job)
+        finally:
+            with job.state.lock:
+                job.count(time.perf_counter())
+
+    def _list(self, job):
+        """The window's title and top-level children, split into chunks."""
+        window = job.state.window
+        job.state.title = window.window_text()
+        children = self.tree.children(window)
+        size = self.split_children or len(children) or 1
+        return [children[i:i + size] for i in range(0, len(children), size)] or [[]]
+
+    def _walk(self, job):
+        """The elements below one chunk of the window's children."""
+        state = job.state
+        found = []
+        if self._over_budget(job):
+            state.timed_out = True
+            return found
+        walker = TreeWalker(self.tree, **self.walker_options)
+        for element, rect, depth in walker.walk(state.window, job.chunk):
+            try:
+                info = element.element_info
+                found.append(ScannedElement(rect, depth, info.control_type, info.name,
+                                            info.automation_id, info.class_name))
+            except Exception:
+                walker.errors += 1
+            if self._over_budget(job):
+                state.timed_out = True
+                break
+        with state.lock:
+            state.visited += walker.visited
+            state.errors += walker.errors
+        return found
+
+    def scan(self, windows):
+        """WindowScan per window, in the order of windows."""
+        start = time.perf_counter()
+        states = [_Window(i, window) for i, window in enumerate(windows)]
+        executor = _DaemonPool(self.workers, self.initializer)
+        pending = {}                        # future -> _Job
+        try:
+            for state in states:
+                job = _Job(state)
+                pending[executor.submit(self._run, job)] = job
+            while pending:
+                done, _ = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = pending.pop(future)
+                    state = job.state
+                    try:
+                        result = future.result()
+                    except Exception:
+                        state.errors += 1
+                        result = [] if job.chunk_index is not None else [[]]
+                    if job.chunk_index is None:
+                        state.chunks = [None] * len(result)
+                        for n, chunk in enumerate(result):
+                            chunk_job = _Job(state, n, chunk)
+                            pending[executor.submit(self._run, chunk_job)] = chunk_job
+                    else:
+                        state.chunks[job.chunk_index] = result
+                self._abandon_hung(pending)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown()
+        self.seconds = time.perf_counter() - start
+
+        return [WindowScan(state.index, state.window, state.title,
+                           [element for chunk in state.chunks or [] if chunk for element in chunk],
+                           state.visited, state.errors, state.timed_out, state.spent)
+                for state in states]
+
+    def _abandon_hung(self, pending):
+        """Drops every job of a window whose running job is past budget + grace."""
+        if self.window_budget is None:
+            return
+        now = time.perf_counter()
+        limit = self.window_budget + self.budget_grace
+        hung = {id(job.state) for job in pending.values()
+                if job.started is not None and job.state.spent + now - job.started > limit}
+        for future, job in list(pending.items()):
+            if id(job.state) in hung:
+                future.cancel()
+                del pending[future]
+                with job.state.lock:
+                    job.count(now)
+                    job.state.timed_out = True
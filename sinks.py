@@ -0,0 +1,334 @@
+import json
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from dedup import dhash
+from profiling import PROFILER
+
+WRITER_WORKERS = 4
+WRITER_MAX_PENDING = 64
+WRITER_BATCH_SIZE = 8
+PNG_COMPRESSION = 3
+
+# Lossless formats the writer can produce, with the encoder parameters for each.
+# PNG at level 0-1 or BMP/PPM (no compression at all) trade disk space for speed.
+FORMATS = {
+    "png": lambda level: [cv2.IMWRITE_PNG_COMPRESSION, level],
+    "bmp": lambda level: [],
+    "ppm": lambda level: [cv2.IMWRITE_PXM_BINARY, 1],
+}
+
+
+class CropWriter:
+    """
+    Writes crops to disk on a thread pool so detection does not wait on PNG encoding.
+
+    cv2.imencode releases the GIL, so several crops encode in parallel while the
+    caller keeps detecting. Crops are handed to the pool in batches of batch_size
+    so small crops don't pay a task per file. At most max_pending crops are queued
+    at once; submit() blocks when that limit is hit, which caps the memory held by
+    pending crops.
+
+    Crops may be views into a frame (see pipeline.crop); the frame must not be
+    modified until close() returns. Encoding and writing are timed as the
+    "encode" and "save" profiler spans.
+
+    With a dedup.CropCache, a crop that matches one written before (in this or,
+    with a persisted cache, an earlier run) is neither encoded nor written:
+    submit() returns the earlier file's path and counts a duplicate. A crop
+    enters the cache only once its file is written, so a failed write never
+    stands in for later copies; copies submitted while the first is still
+    queued are written too.
+    """
+
+    def __init__(self, output_dir=".", fmt="png", compression=PNG_COMPRESSION,
+                 workers=WRITER_WORKERS, max_pending=WRITER_MAX_PENDING,
+                 batch_size=WRITER_BATCH_SIZE, profiler=None, cache=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt} (expected one of {', '.join(FORMATS)})")
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.params = FORMATS[fmt](compression)
+        self.profiler = profiler or PROFILER
+        self.cache = cache
+        self.duplicates = 0
+        self.errors = []
+        self.written = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self.batch_size = max(1, batch_size)
+        self._batch = []
+        self._slots = threading.BoundedSemaphore(max(1, max_pending // self.batch_size))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crop-writer")
+        self._started = None
+        self._finished = None
+        os.makedirs(output_dir, exist_ok=True)
+
+    def path_for(self, name):
+        """Output path for a crop called name (without extension)."""
+        return os.path.join(self.output_dir, f"{name}.{self.fmt}")
+
+    def submit(self, name, image, label=None):
+        """
+        Queues image to be written as <output_dir>/<name>.<fmt> and returns that
+        path, or the path of the cached copy when the cache already holds it.
+        """
+        path = self.path_for(name)
+        if self._started is None:
+            self._started = time.perf_counter()
+        cached = None
+        if self.cache is not None:
+            hash_value = dhash(image)
+            # outside the writer lock: confirming a hit reads the saved file
+            entry = self.cache.lookup(image, hash_value)
+            if entry is not None:
+                self.duplicates += 1
+                return entry.path
+            cached = (name, label, hash_value)
+        self._batch.append((path, image, cached))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+        return path
+
+    def flush(self):
+        """Hands the crops collected so far to the pool without waiting for them."""
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._write_batch, batch)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+    def _write_batch(self, batch):
+        for path, image, cached in batch:
+            self._write(path, image, cached)
+
+    def _write(self, path, image, cached=None):
+        try:
+            with self.profiler.span("encode"):
+                ok, encoded = cv2.imencode(f".{self.fmt}", image, self.params)
+            if not ok:
+                raise ValueError("encoder returned no data")
+            with self.profiler.span("save"), open(path, "wb") as f:
+                f.write(encoded)
+        except Exception as e:
+            with self._lock:
+                self.errors.append((path, e))
+            return
+        with self._lock:
+            self.written += 1
+            self.bytes_written += len(encoded)
+        if cached is not None:
+            name, label, hash_value = cached
+            self.cache.add(name, label, path, hash_value=hash_value, shape=image.shape, nbytes=image.nbytes)
+
+    def close(self):
+        """Waits for every queued crop to be written and stops the workers."""
+        self.flush()
+        self._executor.shutdown(wait=True)
+        if self._finished is None:
+            self._finished = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self):
+        """Counts and throughput since the first submit (final once close() has returned)."""
+        end = self._finished or time.perf_counter()
+        elapsed = end - self._started if self._started is not None else 0.0
+        return {
+            "written": self.written,
+            "failed": len(self.errors),
+            "duplicates": self.duplicates,
+            "bytes": self.bytes_written,
+            "seconds": elapsed,
+            "images_per_sec": self.written / elapsed if elapsed else 0.0,
+            "mb_per_sec": self.bytes_written / 2 ** 20 / elapsed if elapsed else 0.0,
+        }
+
+    def summary(self):
+        """One-line throughput report."""
+        s = self.stats()
+        return (f"Wrote {s['written']} crops ({s['bytes'] / 2 ** 20:.2f} MB, {s['failed']} failed, "
+                f"{s['duplicates']} duplicates skipped) "
+                f"in {s['seconds']:.2f}s: {s['images_per_sec']:.1f} images/s, {s['mb_per_sec']:.2f} MB/s")
+
+
+ARCHIVE_VERSION = 1
+ARCHIVE_FORMATS = ("png", "raw")
+
+
+def archive_paths(path):
+    """(blob path, index path) for an archive; "capture" -> capture.bin, capture.json."""
+    base, ext = os.path.splitext(path)
+    if ext not in (".bin", ".json"):
+        base = path
+    return base + ".bin", base + ".json"
+
+
+class CropArchive:
+    """
+    Packs every crop of a capture into one append-only file plus a JSON index.
+
+    pixels ("raw", fastest, and readable back without a copy by ArchiveReader.view). The index
+    pixels ("raw", fastest, and readable back as a zero-copy view). The index
+    written to <path>.json on close() holds, per element, its id, byte offset
+    and length in the blob, pixel shape, bbox and the UIA control type, name and
+    automation id when known. Element ids start at 1, like the file names the
+    scripts produce. submit() has the same shape as CropWriter.submit(), so the
+    detectors can write to either.
+    """
+
+    def __init__(self, path, fmt="png", compression=PNG_COMPRESSION):
+        if fmt not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unsupported archive format: {fmt} (expected one of {', '.join(ARCHIVE_FORMATS)})")
+        self.blob_path, self.index_path = archive_paths(path)
+        directory = os.path.dirname(self.blob_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.fmt = fmt
+        self.params = FORMATS["png"](compression) if fmt == "png" else []
+        self.records = []
+        self.errors = []
+        self._lock = threading.Lock()
+        self._blob = open(self.blob_path, "wb")
+        self._offset = 0
+
+    def submit(self, key, image, bbox=None, control_type=None, name=None, automation_id=None):
+        """Appends image to the archive and returns its element id."""
+        image = np.asarray(image)
+        if self.fmt == "png":
+            ok, encoded = cv2.imencode(".png", image, self.params)
+            if not ok:
+                raise ValueError(f"Could not encode crop {key}")
+            data = encoded.data
+        else:
+            data = np.ascontiguousarray(image).data
+        with self._lock:
+            element_id = len(self.records) + 1
+            self._blob.write(data)
+            record = {
+                "id": element_id,
+                "key": str(key),
+                "offset": self._offset,
+                "length": data.nbytes,
+                "shape": list(image.shape),
+                "dtype": image.dtype.str,
+                "bbox": [int(v) for v in bbox] if bbox is not None else None,
+                "control_type": control_type,
+                "name": name,
+                "automation_id": automation_id,
+            }
+            self.records.append(record)
+            self._offset += data.nbytes
+        return element_id
+
+    def close(self):
+        """Closes the blob and writes the index next to it."""
+        if self._blob.closed:
+            return
+        self._blob.close()
+        index = {"version": ARCHIVE_VERSION, "format": self.fmt, "elements": self.records}
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def summary(self):
+        """One-line report of what was packed."""
+        return f"Packed {len(self.records)} crops ({self._offset / 2 ** 20:.2f} MB) into {self.blob_path}"
+
+
+class ArchiveReader:
+    """
+    Random access to the crops of a CropArchive by element id.
+
+    The blob is memory-mapped, so reading one element touches only its bytes.
+    reader[id] returns an array of its own. view(id) returns, for "raw"
+    archives, a read-only view straight into the map instead; every view must
+    be released before close(), which raises BufferError while one is alive.
+    """
+
+    def __init__(self, path):
+        self.blob_path, self.index_path = archive_paths(path)
+        with open(self.index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported archive version: {index.get('version')}")
+        self.fmt = index["format"]
+        self.records = index["elements"]
+        self._file = open(self.blob_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # mmap can't map an empty file; only zero-length records can point into it
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(range(1, len(self.records) + 1))
+
+    def meta(self, element_id):
+        """Index record (bbox, control type, name, automation id, ...) of an element."""
+        if not 1 <= element_id <= len(self.records):
+            raise KeyError(element_id)
+        return self.records[element_id - 1]
+
+    def __getitem__(self, element_id):
+        """Pixels of an element as a NumPy array, valid after close()."""
+        if self.fmt == "raw":
+            return self.view(element_id).copy()
+        return self.view(element_id)
+
+    def view(self, element_id):
+        """
+        Pixels of an element without a copy: for "raw" archives a read-only
+        view into the map, to be released before close(). PNG crops are
+        decoded, so they are arrays of their own either way.
+        """
+        record = self.meta(element_id)
+        dtype = np.dtype(record["dtype"]) if self.fmt == "raw" else np.uint8
+        if record["length"] == 0:
+            return np.empty(record["shape"], dtype=dtype)
+        data = np.frombuffer(self._map, dtype=np.uint8, count=record["length"], offset=record["offset"])
+        if self.fmt == "raw":
+            return data.view(dtype).reshape(record["shape"])
+        return cv2.imdecode(data, cv2.IMREAD_UNCHANGED)
+
+    def find(self, **fields):
+        """Ids of the elements whose metadata matches every given field exactly."""
+        return [r["id"] for r in self.records if all(r.get(k) == v for k, v in fields.items())]
+
+    def close(self):
+        """Unmaps the blob; raises BufferError while a view() of it is still alive."""
+        try:
+            if isinstance(self._map, mmap.mmap):
+                try:
+                    self._map.close()
+                except BufferError:
+                    raise BufferError(f"{self.blob_path}: release every view() before close()") from None
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,197 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# UI Automation property ids fetched for every element
+PROPERTY_IDS = {
+    "rect": 30001,            # UIA_BoundingRectanglePropertyId
+    "control_type": 30003,    # UIA_ControlTypePropertyId
+    "name": 30005,            # UIA_NamePropertyId
+    "automation_id": 30011,   # UIA_AutomationIdPropertyId
+    "class_name": 30012,      # UIA_ClassNamePropertyId
+    "offscreen": 30022,       # UIA_IsOffscreenPropertyId
+}
+STRING_COLUMNS = ("control_type", "name", "automation_id", "class_name")
+TREE_SCOPE_DESCENDANTS = 4
+ELEMENT_MODE_NONE = 0     # cache only the properties, no live element references
+
+# one element of a snapshot; rect is left, top, right, bottom like pywinauto's RECT
+SnapshotRow = namedtuple("SnapshotRow", "index rect control_type name automation_id class_name offscreen")
+
+
+class ElementSnapshot:
+    """
+    Properties of every element of a window, fetched once and held column-wise.
+
+    rects is an (N, 4) int32 array of left, top, right, bottom and offscreen
+    an (N,) bool array; each string column is an int32 code array plus the
+    list of distinct strings it indexes, so a window full of "Button"s and
+    empty automation ids stores each string once and a control-type test is
+    one np.isin over integers. Filters are masks over the table and never
+    call back into the application, unlike element.is_visible(),
+    element.rectangle() and element.element_info.* in the per-element loops.
+
+        snapshot = provider.snapshot(window)
+        shown = snapshot.visible & (snapshot.widths > 1) & (snapshot.heights > 1)
+        buttons = snapshot.take(np.flatnonzero(shown & snapshot.isin("control_type", {"Button"})))
+    """
+
+    def __init__(self, rects, offscreen, codes, strings):
+        self.rects = rects
+        self.offscreen = offscreen
+        self.codes = codes          # column -> int32 code per element
+        self.strings = strings      # column -> list of distinct strings
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Snapshot from (rect, control_type, name, automation_id, class_name, offscreen) tuples."""
+        builder = SnapshotBuilder()
+        for row in rows:
+            builder.add(*row)
+        return builder.build()
+
+    def __len__(self):
+        return len(self.rects)
+
+    @property
+    def visible(self):
+        return ~self.offscreen
+
+    @property
+    def widths(self):
+        return self.rects[:, 2] - self.rects[:, 0]
+
+    @property
+    def heights(self):
+        return self.rects[:, 3] - self.rects[:, 1]
+
+    def column(self, name):
+        """The string column as a list, one entry per element."""
+        strings = self.strings[name]
+        return [strings[code] for code in self.codes[name].tolist()]
+
+    def isin(self, name, values):
+        """Mask of the elements whose string column name is one of values."""
+        lookup = {s: code for code, s in enumerate(self.strings[name])}
+        wanted = [lookup[v] for v in values if v in lookup]
+        return np.isin(self.codes[name], np.array(wanted, dtype=np.int32))
+
+    def take(self, indices):
+        """Snapshot of the given elements; string tables are shared, not copied."""
+        return ElementSnapshot(self.rects[indices], self.offscreen[indices],
+                               {name: codes[indices] for name, codes in self.codes.items()}, self.strings)
+
+    def row(self, i):
+        return SnapshotRow(int(i), tuple(self.rects[i].tolist()),
+                           *(self.strings[name][self.codes[name][i]] for name in STRING_COLUMNS),
+                           bool(self.offscreen[i]))
+
+    def rows(self, indices=None):
+        """SnapshotRow per element (or per index in indices)."""
+        indices = range(len(self)) if indices is None else indices
+        return (self.row(i) for i in indices)
+
+
+class SnapshotBuilder:
+    """Collects elements one by one, interning strings as they come in."""
+
+    def __init__(self):
+        self._rects = []
+        self._offscreen = []
+        self._codes = {name: [] for name in STRING_COLUMNS}
+        self._lookup = {name: {} for name in STRING_COLUMNS}
+
+    def add(self, rect, control_type, name, automation_id, class_name, offscreen):
+        self._rects.append(rect)
+        self._offscreen.append(offscreen)
+        for column, value in zip(STRING_COLUMNS, (control_type, name, automation_id, class_name)):
+            lookup = self._lookup[column]
+            value = value or ""
+            self._codes[column].append(lookup.setdefault(value, len(lookup)))
+
+    def build(self):
+        rects = np.array(self._rects, dtype=np.int32).reshape(-1, 4)
+        return ElementSnapshot(rects, np.array(self._offscreen, dtype=bool),
+                               {name: np.array(codes, dtype=np.int32) for name, codes in self._codes.items()},
+                               {name: list(lookup) for name, lookup in self._lookup.items()})
+
+
+def _from_wrappers(elements):
+    builder = SnapshotBuilder()
+    for element in elements:
+        info, r = element.element_info, element.rectangle()
+        builder.add((r.left, r.top, r.right, r.bottom), info.control_type, info.name,
+                    info.automation_id, info.class_name, not element.is_visible())
+    return builder.build()
+
+
+class WrapperProvider:
+    """
+    Snapshot through pywinauto wrappers, element by element: descendants(),
+    then is_visible(), rectangle() and four element_info properties each.
+    That is what the autopy loops do.
+    calls counts the property reads that cross into the application.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+
+    def snapshot(self, window):
+        start = time.perf_counter()
+        elements = window.descendants()
+        snapshot = _from_wrappers(elements)
+        self.calls += 1 + len(PROPERTY_IDS) * len(elements)
+        self.seconds += time.perf_counter() - start
+        return snapshot
+
+
+class CacheRequestProvider:
+    """
+    Snapshot in one UI Automation round trip (Windows only).
+
+    A CacheRequest lists the PROPERTY_IDS and FindAllBuildCache fetches them
+    for every descendant of the window at once, in the control view that
+    window.descendants() searches too; the Cached* reads afterwards are
+    in-process. Control type ids are mapped to pywinauto's names ("Button").
+    Needs pywinauto (and comtypes); use default_provider() to fall back to
+    WrapperProvider where they are missing.
+    """
+
+    def __init__(self):
+        from pywinauto.uia_defines import IUIA
+        self._uia = IUIA()
+        self._type_names = self._uia.known_control_type_ids
+        request = self._uia.iuia.CreateCacheRequest()
+        for property_id in PROPERTY_IDS.values():
+            request.AddProperty(property_id)
+        request.AutomationElementMode = ELEMENT_MODE_NONE
+        self._request = request
+        self.calls = 0
+        self.seconds = 0.0
+
+    def snapshot(self, window):
+        """window is a pywinauto UIA wrapper (desktop.window(...), window.descendants()[i]) or an element_info."""
+        start = time.perf_counter()
+        info = getattr(window, "element_info", window)
+        found = info.element.FindAllBuildCache(TREE_SCOPE_DESCENDANTS, self._uia.true_condition, self._request)
+        self.calls += 1
+        builder = SnapshotBuilder()
+        for n in range(found.Length if found else 0):
+            element = found.GetElement(n)
+            r = element.CachedBoundingRectangle
+            builder.add((r.left, r.top, r.right, r.bottom),
+                        self._type_names.get(element.CachedControlType, "InvalidControlType"),
+                        element.CachedName, element.CachedAutomationId, element.CachedClassName,
+                        bool(element.CachedIsOffscreen))
+        self.seconds += time.perf_counter() - start
+        return builder.build()
+
+
+def default_provider():
+    """CacheRequestProvider where UI Automation is available, WrapperProvider otherwise."""
+    try:
+        return CacheRequestProvider()
+    except (ImportError, OSError, AttributeError):
+        return WrapperProvider()
@@ -0,0 +1,154 @@
+import numpy as np
+
+MIN_CELL_SIZE = 8
+
+
+class GridIndex:
+    """
+    Uniform-grid index over an (N, 4) array of x, y, w, h boxes.
+
+    Every box is registered in each grid cell it overlaps (compressed into one
+    sorted array plus per-cell offsets), so a query only looks at the boxes of
+    the cells it touches instead of all N. The cell size defaults to twice the
+    median box side, which keeps a typical element in one to four cells.
+    Queries return indices into the original box array; the index is built
+    once per frame and is read-only afterwards.
+
+        index = GridIndex(detector.detect(frame))
+        index.at(x, y)                        # element under the cursor, or None
+        index.query((x, y, w, h))             # elements intersecting a panel
+        index.nearest(x, y, k=3)              # three closest elements
+    """
+
+    def __init__(self, boxes, cell_size=None):
+        self.boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+        count = len(self.boxes)
+        x0, y0 = self.boxes[:, 0], self.boxes[:, 1]
+        x1, y1 = x0 + self.boxes[:, 2], y0 + self.boxes[:, 3]
+        self.areas = self.boxes[:, 2] * self.boxes[:, 3]
+
+        if cell_size is None:
+            side = np.median(np.maximum(self.boxes[:, 2], self.boxes[:, 3])) if count else MIN_CELL_SIZE
+            cell_size = max(MIN_CELL_SIZE, int(2 * side))
+        self.cell_size = cell_size
+        self.origin = (int(x0.min()), int(y0.min())) if count else (0, 0)
+        self.columns = int((x1.max() - self.origin[0] - 1) // cell_size + 1) if count else 0
+        self.rows = int((y1.max() - self.origin[1] - 1) // cell_size + 1) if count else 0
+
+        # cell ranges covered by each box; degenerate boxes still get one cell
+        cx0 = (x0 - self.origin[0]) // cell_size
+        cy0 = (y0 - self.origin[1]) // cell_size
+        cx1 = np.maximum(cx0, (x1 - 1 - self.origin[0]) // cell_size)
+        cy1 = np.maximum(cy0, (y1 - 1 - self.origin[1]) // cell_size)
+        spans_x, spans_y = cx1 - cx0 + 1, cy1 - cy0 + 1
+        per_box = spans_x * spans_y
+        owner = np.repeat(np.arange(count), per_box)
+        step = np.arange(len(owner)) - np.repeat(np.cumsum(per_box) - per_box, per_box)
+        cell_x = cx0[owner] + step % spans_x[owner]
+        cell_y = cy0[owner] + step // spans_x[owner]
+        cells = cell_y * self.columns + cell_x
+
+        order = np.argsort(cells, kind="stable")
+        self._entries = owner[order]
+        # corners of each entry's box, laid out like _entries so a cell's slice needs no gather
+        self._x0, self._y0 = x0[self._entries], y0[self._entries]
+        self._x1, self._y1 = x1[self._entries], y1[self._entries]
+        self._offsets = np.zeros(self.rows * self.columns + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.rows * self.columns), out=self._offsets[1:])
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _cell_of(self, x, y):
+        return (int(x) - self.origin[0]) // self.cell_size, (int(y) - self.origin[1]) // self.cell_size
+
+    def _slices(self, col0, row0, col1, row1):
+        """(start, end) entry ranges of cells [col0, col1] x [row0, row1], one per grid row, clipped to the grid."""
+        col0, row0 = max(col0, 0), max(row0, 0)
+        col1, row1 = min(col1, self.columns - 1), min(row1, self.rows - 1)
+        if col0 > col1 or row0 > row1:
+            return []
+        offsets = self._offsets
+        return [(offsets[r * self.columns + col0], offsets[r * self.columns + col1 + 1])
+                for r in range(row0, row1 + 1)]
+
+    def _gather(self, slices):
+        """Entry positions covered by slices."""
+        if len(slices) == 1:
+            return np.arange(*slices[0])
+        return np.concatenate([np.arange(s, e) for s, e in slices]) if slices else np.empty(0, dtype=np.int64)
+
+    def _candidates(self, col0, row0, col1, row1):
+        """Unique indices of the boxes registered in cells [col0, col1] x [row0, row1]."""
+        return np.unique(self._entries[self._gather(self._slices(col0, row0, col1, row1))])
+
+    def hit(self, x, y):
+        """Indices of every box containing point (x, y), smallest box first."""
+        col, row = self._cell_of(x, y)
+        if not (0 <= col < self.columns and 0 <= row < self.rows):
+            return np.empty(0, dtype=np.int64)
+        cell = row * self.columns + col
+        s, e = self._offsets[cell], self._offsets[cell + 1]
+        inside = (self._x0[s:e] <= x) & (x < self._x1[s:e]) & (self._y0[s:e] <= y) & (y < self._y1[s:e])
+        hits = self._entries[s:e][inside]
+        if len(hits) < 2:
+            return hits
+        return hits[np.lexsort((hits, self.areas[hits]))]
+
+    def at(self, x, y):
+        """Index of the smallest (innermost) box containing (x, y), or None."""
+        hits = self.hit(x, y)
+        return int(hits[0]) if len(hits) else None
+
+    def query(self, rect, contained=False):
+        """
+        Indices, ascending, of the boxes intersecting the x, y, w, h rect (or,
+        with contained=True, lying entirely inside it).
+        """
+        x, y, w, h = (int(v) for v in rect)
+        if w <= 0 or h <= 0 or not len(self.boxes):
+            return np.empty(0, dtype=np.int64)
+        col0, row0 = self._cell_of(x, y)
+        col1, row1 = self._cell_of(x + w - 1, y + h - 1)
+        at = self._gather(self._slices(col0, row0, col1, row1))
+        bx0, by0, bx1, by1 = self._x0[at], self._y0[at], self._x1[at], self._y1[at]
+        if contained:
+            keep = (bx0 >= x) & (by0 >= y) & (bx1 <= x + w) & (by1 <= y + h)
+        else:
+            keep = (bx0 < x + w) & (bx1 > x) & (by0 < y + h) & (by1 > y)
+        # a box spanning several cells appears once per cell
+        return np.unique(self._entries[at[keep]])
+
+    def distances(self, x, y, indices=None):
+        """Euclidean distance from (x, y) to each box (0 inside it), for all boxes or the given indices."""
+        b = self.boxes if indices is None else self.boxes[indices]
+        dx = np.maximum(np.maximum(b[:, 0] - x, x - (b[:, 0] + b[:, 2] - 1)), 0)
+        dy = np.maximum(np.maximum(b[:, 1] - y, y - (b[:, 1] + b[:, 3] - 1)), 0)
+        return np.hypot(dx, dy)
+
+    def nearest(self, x, y, k=1):
+        """
+        Indices of the k boxes closest to (x, y), nearest first (ties by index).
+
+        Searches rings of cells outward from the point's cell and stops as soon
+        as no unvisited cell can hold anything closer than the k-th candidate.
+        """
+        k = min(k, len(self.boxes))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        col, row = self._cell_of(x, y)
+        reach = max(col, self.columns - 1 - col, row, self.rows - 1 - row, 0)
+        seen = np.empty(0, dtype=np.int64)
+        for radius in range(reach + 1):
+            found = self._candidates(col - radius, row - radius, col + radius, row + radius)
+            if len(found) >= k:
+                dist = self.distances(x, y, found)
+                kth = np.partition(dist, k - 1)[k - 1]
+                # anything outside the searched square is at least this far away
+                if kth <= radius * self.cell_size:
+                    seen = found
+                    break
+            seen = found
+        dist = self.distances(x, y, seen)
+        order = np.lexsort((seen, dist))[:k]
+        return seen[order]
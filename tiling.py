@@ -0,0 +1,170 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from nms import connected_labels, nms, overlap_pairs
+from pipeline import DetectorPipeline, boxes_of
+
+TILE_SIZE = 1024
+TILE_OVERLAP = 64
+MERGE_IOU = 0.9
+
+
+def tile_grid(shape, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """
+    Splits a frame into tiles.
+
+    Returns a list of (core, padded) rects as x0, y0, x1, y1: the cores
+    partition the frame, and each padded rect is its core grown by overlap on
+    every side (clipped to the frame).
+    """
+    height, width = shape[:2]
+    tiles = []
+    for y0 in range(0, height, tile_size):
+        for x0 in range(0, width, tile_size):
+            x1, y1 = min(x0 + tile_size, width), min(y0 + tile_size, height)
+            padded = (max(0, x0 - overlap), max(0, y0 - overlap),
+                      min(width, x1 + overlap), min(height, y1 + overlap))
+            tiles.append(((x0, y0, x1, y1), padded))
+    return tiles
+
+
+def _detect_tile(pipeline, gray_tile, core, padded, frame_shape):
+    """
+    Runs the pipeline on one padded tile.
+
+    Returns (owned, straddlers) as frame-coordinate box arrays. owned holds the
+    elements that passed the area filter, lie wholly inside the padded tile and
+    whose center falls in the core, so every such element is owned by exactly
+    one tile. straddlers are contours cut by an inner tile edge; they are
+    resolved by the caller.
+    """
+    height, width = frame_shape[:2]
+    px0, py0, px1, py1 = padded
+    stats = pipeline.measure(gray_tile)
+    stats["x"] += px0
+    stats["y"] += py0
+    stats["cx"] += px0
+    stats["cy"] += py0
+    x0, y0 = stats["x"], stats["y"]
+    x1, y1 = x0 + stats["w"], y0 + stats["h"]
+
+    cut = (((x0 <= px0) & (px0 > 0)) | ((y0 <= py0) & (py0 > 0)) |
+           ((x1 >= px1) & (px1 < width)) | ((y1 >= py1) & (py1 < height)))
+    center_x, center_y = x0 + stats["w"] // 2, y0 + stats["h"] // 2
+    in_core = ((center_x >= core[0]) & (center_x < core[2]) &
+               (center_y >= core[1]) & (center_y < core[3]))
+    owned = stats[~cut & in_core & pipeline.area_mask(stats["area"])]
+
+    # A cut piece encloses no more than the whole contour does, so pieces
+    # already over max_area can never become an element.
+    straddlers = stats[cut]
+    if pipeline.max_area is not None:
+        straddlers = straddlers[straddlers["area"] < pipeline.max_area]
+    return boxes_of(owned), boxes_of(straddlers)
+
+
+def _overlap_groups(boxes):
+    """Groups of indices of boxes that overlap or touch, directly or through other boxes."""
+    labels = connected_labels(len(boxes), *overlap_pairs(boxes))
+    return [np.flatnonzero(labels == label) for label in np.unique(labels)]
+
+
+def dedup_boxes(boxes, iou_threshold=MERGE_IOU):
+    """Drops boxes that overlap an earlier kept box with IoU >= iou_threshold."""
+    boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+    if len(boxes) < 2:
+        return boxes
+    # earlier boxes win: score by negated index
+    return boxes[np.sort(nms(boxes, -np.arange(len(boxes)), iou_threshold))]
+
+
+class TiledDetector:
+    """
+    Runs a DetectorPipeline over overlapping tiles of a large frame in a worker pool.
+
+    Wide captures (all_screens=True grabs) are split into tile_size squares,
+    each padded by overlap pixels of context so Canny and the close see the
+    same neighbourhood as in a whole-frame run. Elements are assigned to the
+    tile whose core holds their center. Contours cut by a tile edge are merged
+    across the seam and re-detected once on the full frame around the merged
+    region, and near-identical boxes are dropped, so the result matches a
+    whole-frame detect() up to small differences at seams (Canny hysteresis is
+    not strictly local). A clean=True pipeline cleans the merged boxes, as
+    detect() does the boxes of a whole frame.
+
+    executor="thread" shares memory and relies on OpenCV releasing the GIL;
+    executor="process" sidesteps the GIL at the cost of pickling each tile.
+    """
+
+    def __init__(self, pipeline=None, tile_size=TILE_SIZE, overlap=TILE_OVERLAP, workers=None,
+                 executor="thread"):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor: {executor}")
+        self.pipeline = pipeline or DetectorPipeline()
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.workers = workers or os.cpu_count() or 1
+        self.executor_kind = executor
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            pool = ThreadPoolExecutor if self.executor_kind == "thread" else ProcessPoolExecutor
+            self._executor = pool(max_workers=self.workers)
+        return self._executor
+
+    def detect(self, frame):
+        """(N, 4) int32 x, y, w, h boxes for frame, like DetectorPipeline.detect()."""
+        gray = self.pipeline.to_gray(frame)
+        tiles = tile_grid(gray.shape, self.tile_size, self.overlap)
+        if len(tiles) == 1:
+            return self.pipeline.detect(gray)
+
+        pool = self._pool()
+        futures = [pool.submit(_detect_tile, self.pipeline, gray[py0:py1, px0:px1], core,
+                               (px0, py0, px1, py1), gray.shape)
+                   for core, (px0, py0, px1, py1) in tiles]
+        results = [f.result() for f in futures]
+        owned = np.concatenate([r[0] for r in results])
+        straddlers = np.concatenate([r[1] for r in results])
+
+        repaired = [self._repair(gray, straddlers[group]) for group in _overlap_groups(straddlers)] \
+            if len(straddlers) else []
+        boxes = np.concatenate([owned] + repaired) if repaired else owned
+        return self.pipeline.postprocess(dedup_boxes(boxes))
+
+    def _repair(self, gray, fragments):
+        """Re-detects, on the full frame, around a group of pieces cut by tile seams."""
+        height, width = gray.shape[:2]
+        x0 = max(0, int(fragments[:, 0].min()) - self.overlap)
+        y0 = max(0, int(fragments[:, 1].min()) - self.overlap)
+        x1 = min(width, int((fragments[:, 0] + fragments[:, 2]).max()) + self.overlap)
+        y1 = min(height, int((fragments[:, 1] + fragments[:, 3]).max()) + self.overlap)
+        # raw boxes: the clean stage runs once, over the merged result
+        boxes = boxes_of(self.pipeline.elements(gray[y0:y1, x0:x1]))
+        boxes[:, 0] += x0
+        boxes[:, 1] += y0
+        # keep what the seam pieces belonged to, minus anything this window cuts
+        bx0, by0 = boxes[:, 0], boxes[:, 1]
+        bx1, by1 = bx0 + boxes[:, 2], by0 + boxes[:, 3]
+        fx0, fy0 = fragments[:, 0], fragments[:, 1]
+        fx1, fy1 = fx0 + fragments[:, 2], fy0 + fragments[:, 3]
+        hits = ((bx0[:, None] < fx1[None, :]) & (fx0[None, :] < bx1[:, None]) &
+                (by0[:, None] < fy1[None, :]) & (fy0[None, :] < by1[:, None])).any(axis=1)
+        cut = (((bx0 <= x0) & (x0 > 0)) | ((by0 <= y0) & (y0 > 0)) |
+               ((bx1 >= x1) & (x1 < width)) | ((by1 >= y1) & (y1 < height)))
+        return boxes[hits & ~cut]
+
+    def close(self):
+        """Shuts down the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,174 @@
+import numpy as np
+
+from pipeline import DetectorPipeline, contour_stats
+
+
+class ElementTree:
+    """
+    Containment tree of contours, held in flat NumPy arrays.
+
+    Node i is contour i; parent[i] is its enclosing contour (-1 for a root),
+    first_child / next_sibling link children in index order, depth counts
+    ancestors, and stats[i] is its ELEMENT_DTYPE record. Nodes are also laid
+    out in preorder, so the subtree of i is the contiguous slice
+    preorder[position[i]:position[i] + size[i]] and subtree queries are a
+    slice, not a walk. Everything is built with array operations, one pass
+    per tree level, with no Python object per node.
+
+    Leaves (no children) are usually controls; nodes with children are
+    containers (panels, toolbars, the window frame).
+    """
+
+    def __init__(self, parent, stats):
+        parent = np.asarray(parent, dtype=np.int64).reshape(-1)
+        count = len(parent)
+        self.parent = parent
+        self.stats = stats
+        self._ancestor_table = None     # built by the first ancestors()
+        self._ancestor_start = self._ancestor_end = None
+
+        # children grouped by parent, in index order; roots (parent -1) sort first
+        order = np.lexsort((np.arange(count), parent))
+        is_root = parent[order] < 0
+        self.roots = order[is_root]
+        self._children = order[~is_root]
+        child_counts = np.bincount(parent[parent >= 0], minlength=count)
+        self._child_start = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(child_counts, out=self._child_start[1:])
+
+        self.first_child = np.full(count, -1, dtype=np.int64)
+        has_children = child_counts > 0
+        self.first_child[has_children] = self._children[self._child_start[:-1][has_children]]
+        self.next_sibling = np.full(count, -1, dtype=np.int64)
+        for group in (self.roots, self._children):
+            same_parent = parent[group[:-1]] == parent[group[1:]]
+            self.next_sibling[group[:-1][same_parent]] = group[1:][same_parent]
+
+        # depth, one vectorized step per level
+        self.depth = np.zeros(count, dtype=np.int64)
+        ancestor = parent.copy()
+        while (alive := ancestor >= 0).any():
+            self.depth[alive] += 1
+            ancestor[alive] = parent[ancestor[alive]]
+
+        # subtree sizes, deepest level first
+        self.size = np.ones(count, dtype=np.int64)
+        levels = [np.flatnonzero(self.depth == d) for d in range(int(self.depth.max(initial=-1)) + 1)]
+        for nodes in reversed(levels[1:]):
+            np.add.at(self.size, parent[nodes], self.size[nodes])
+
+        # preorder position: parent's position + 1 + sizes of the earlier siblings
+        self.position = np.zeros(count, dtype=np.int64)
+        before = np.zeros(count, dtype=np.int64)
+        for group in (self.roots, self._children):
+            if len(group):
+                sizes = self.size[group]
+                running = np.cumsum(sizes) - sizes
+                group_start = np.r_[True, parent[group[1:]] != parent[group[:-1]]]
+                before[group] = running - np.maximum.accumulate(np.where(group_start, running, 0))
+        self.position[self.roots] = before[self.roots]
+        for nodes in levels[1:]:
+            self.position[nodes] = self.position[parent[nodes]] + 1 + before[nodes]
+        self.preorder = np.empty(count, dtype=np.int64)
+        self.preorder[self.position] = np.arange(count)
+
+    @classmethod
+    def from_contours(cls, contours, hierarchy, stats=None):
+        """Tree from findContours output (RETR_TREE or RETR_CCOMP; RETR_EXTERNAL gives only roots)."""
+        if stats is None:
+            stats = contour_stats(contours)
+        if hierarchy is None or len(contours) == 0:
+            return cls(np.empty(0, dtype=np.int64), stats)
+        return cls(hierarchy.reshape(-1, 4)[:, 3], stats)
+
+    @classmethod
+    def from_frame(cls, frame, pipeline=None):
+        """Runs pipeline (the "tree" preset by default) once on frame and builds the tree in frame coordinates."""
+        pipeline = pipeline or DetectorPipeline.from_preset("tree")
+        contours, hierarchy = pipeline.find_contours(frame)
+        stats = pipeline.upscale(contour_stats(contours), frame.shape)
+        return cls.from_contours(contours, hierarchy, stats)
+
+    def __len__(self):
+        return len(self.parent)
+
+    def children(self, i):
+        """Direct children of node i, in index order."""
+        return self._children[self._child_start[i]:self._child_start[i + 1]]
+
+    def subtree(self, i, include_self=True):
+        """Node i and all its descendants, in preorder."""
+        start = self.position[i] + (0 if include_self else 1)
+        return self.preorder[start:self.position[i] + self.size[i]]
+
+    def ancestors(self, i):
+        """
+        Enclosing nodes of i, nearest first, as a slice of one array holding
+        every node's ancestors back to back. The first call lays that array
+        out (as long as the depths add up to), one vectorized step per level.
+        """
+        if self._ancestor_table is None:
+            self._build_ancestors()
+        return self._ancestor_table[self._ancestor_start[i]:self._ancestor_end[i]]
+
+    def _build_ancestors(self):
+        depth = self.depth
+        start = np.cumsum(depth) - depth
+        table = np.empty(int(depth.sum()), dtype=np.int64)
+        by_depth = np.argsort(depth, kind="stable")
+        bounds = np.searchsorted(depth[by_depth], np.arange(int(depth.max(initial=0)) + 2))
+        # a node's ancestors are its parent followed by the parent's ancestors
+        for d in range(1, len(bounds) - 1):
+            nodes = by_depth[bounds[d]:bounds[d + 1]]
+            parents = self.parent[nodes]
+            table[start[nodes]] = parents
+            steps = np.arange(d - 1)
+            table[(start[nodes] + 1)[:, None] + steps] = table[start[parents][:, None] + steps]
+        # slice bounds as Python ints: indexing NumPy scalars would cost more than the slice
+        self._ancestor_start = start.tolist()
+        self._ancestor_end = (start + depth).tolist()
+        self._ancestor_table = table
+
+    def is_descendant(self, nodes, ancestor):
+        """Mask of which nodes lie strictly inside ancestor's subtree (vectorized over nodes)."""
+        pos = self.position[np.asarray(nodes)]
+        return (pos > self.position[ancestor]) & (pos < self.position[ancestor] + self.size[ancestor])
+
+    def leaves(self):
+        """Nodes without children (candidate controls)."""
+        return np.flatnonzero(self.first_child < 0)
+
+    def containers(self):
+        """Nodes with at least one child."""
+        return np.flatnonzero(self.first_child >= 0)
+
+    def prune(self, min_area=None, max_area=None, keep=None):
+        """
+        New tree without the nodes whose area is outside (min_area, max_area)
+        (or, given a boolean keep mask, without the nodes it rejects).
+
+        Children of a removed node are attached to its nearest kept ancestor,
+        so containment is preserved. The new tree's stats["index"] still names
+        the original contour of each node. A tree built without stats (as
+        walker.ArrayTree does) can only be pruned with keep, and the new tree
+        has no stats either.
+        """
+        count = len(self)
+        if keep is None:
+            if self.stats is None:
+                raise ValueError("prune() by area needs stats; pass a keep mask instead")
+            area = self.stats["area"]
+            keep = np.ones(count, dtype=bool)
+            if min_area is not None:
+                keep &= area > min_area
+            if max_area is not None:
+                keep &= area < max_area
+        keep = np.asarray(keep, dtype=bool)
+
+        ancestor = self.parent.copy()
+        while (climb := (ancestor >= 0) & ~keep[np.maximum(ancestor, 0)]).any():
+            ancestor[climb] = self.parent[ancestor[climb]]
+        new_index = np.full(count, -1, dtype=np.int64)
+        new_index[keep] = np.arange(int(keep.sum()))
+        new_parent = np.where(ancestor[keep] >= 0, new_index[np.maximum(ancestor[keep], 0)], -1)
+        return ElementTree(new_parent, None if self.stats is None else self.stats[keep])
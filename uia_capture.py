@@ -0,0 +1,141 @@
+import ctypes
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from ingest import from_pil
+
+# GetSystemMetrics indices of the virtual screen's top-left corner
+SM_XVIRTUALSCREEN = 76
+SM_YVIRTUALSCREEN = 77
+
+# left, top, right, bottom in screen coordinates, as pywinauto's RECT
+Rect = namedtuple("Rect", "left top right bottom")
+
+
+def rect_of(rect):
+    """Rect from a pywinauto RECT (element.rectangle()) or any 4-sequence."""
+    if hasattr(rect, "left"):
+        return Rect(int(rect.left), int(rect.top), int(rect.right), int(rect.bottom))
+    return Rect(*(int(v) for v in rect))
+
+
+def union_rect(rects):
+    """Smallest Rect holding every rect, or None for none."""
+    rects = [rect_of(r) for r in rects]
+    if not rects:
+        return None
+    return Rect(min(r.left for r in rects), min(r.top for r in rects),
+                max(r.right for r in rects), max(r.bottom for r in rects))
+
+
+class GrabbedFrame:
+    """
+    BGR pixels of one screen grab and the screen position of their top-left
+    corner, so element rects in screen coordinates can be cut out of it.
+    """
+
+    def __init__(self, pixels, left=0, top=0):
+        self.pixels = pixels
+        self.left = left
+        self.top = top
+
+    @property
+    def rect(self):
+        height, width = self.pixels.shape[:2]
+        return Rect(self.left, self.top, self.left + width, self.top + height)
+
+    def crop(self, rect):
+        """
+        View of the pixels under rect (clipped to the grab), or None when
+        nothing of it was grabbed. Views share memory with the frame: copy()
+        one to keep it past the next grab.
+        """
+        r = rect_of(rect)
+        height, width = self.pixels.shape[:2]
+        x0, y0 = max(r.left - self.left, 0), max(r.top - self.top, 0)
+        x1, y1 = min(r.right - self.left, width), min(r.bottom - self.top, height)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return self.pixels[y0:y1, x0:x1]
+
+    def crops(self, rects):
+        return [self.crop(rect) for rect in rects]
+
+
+def virtual_screen_origin():
+    """
+    Screen position of the top-left corner of the virtual screen (every
+    monitor), which is negative when a monitor sits left of or above the
+    primary one. (0, 0) where it can't be read (not Windows).
+    """
+    try:
+        user32 = ctypes.windll.user32
+    except AttributeError:
+        return 0, 0
+    return user32.GetSystemMetrics(SM_XVIRTUALSCREEN), user32.GetSystemMetrics(SM_YVIRTUALSCREEN)
+
+
+class ScreenGrabber:
+    """
+    Grabs screen regions with PIL's ImageGrab across all monitors, as the
+    autopy scripts did per element. grab(bbox) returns a GrabbedFrame; bbox is
+    left, top, right, bottom in screen coordinates, or None for the whole
+    virtual screen, whose pixels start at virtual_screen_origin(), not
+    necessarily (0, 0). With all_screens=False, None grabs the primary
+    monitor, which starts at (0, 0).
+    """
+
+    def __init__(self, include_layered_windows=False, all_screens=True):
+        from PIL import ImageGrab
+        self._grab = ImageGrab.grab
+        self.include_layered_windows = include_layered_windows
+        self.all_screens = all_screens
+        self.grabs = 0
+
+    def grab(self, bbox=None):
+        self.grabs += 1
+        bbox = tuple(rect_of(bbox)) if bbox is not None else None
+        image = self._grab(bbox=bbox, include_layered_windows=self.include_layered_windows,
+                           all_screens=self.all_screens)
+        if bbox is not None:
+            left, top = bbox[0], bbox[1]
+        else:
+            left, top = virtual_screen_origin() if self.all_screens else (0, 0)
+        return GrabbedFrame(from_pil(image, color=True), left, top)
+
+
+def capture_each(grabber, rects):
+    """The per-element way: one grab per rect. Returns the BGR crops (None where the grab was empty)."""
+    crops = []
+    for rect in rects:
+        pixels = grabber.grab(rect).pixels
+        crops.append(pixels if pixels.size else None)
+    return crops
+
+
+def capture_once(grabber, rects, bounds=None):
+    """
+    One grab of bounds (the union of rects by default; pass the window rect to
+    grab the whole window) and one view per rect cut out of it, None where a
+    rect lies outside the grab. Returns (frame, crops).
+    """
+    rects = [rect_of(r) for r in rects]
+    bounds = bounds if bounds is not None else union_rect(rects)
+    if bounds is None:
+        return None, []
+    frame = grabber.grab(bounds)
+    return frame, frame.crops(rects)
+
+
+def save_png(path, pixels):
+    """
+    Writes BGR pixels to path as PNG. Encodes in memory and writes the bytes
+    with tofile, as cv2.imwrite can't open non-ASCII paths on Windows and
+    these paths come from window titles and element names. Raises OSError.
+    """
+    ok, encoded = cv2.imencode(".png", pixels)
+    if not ok:
+        raise OSError("encoding failed")
+    encoded.tofile(path)
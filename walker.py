@@ -0,0 +1,154 @@
+from collections import deque, namedtuple
+
+import numpy as np
+
+from tree import ElementTree
+from uia_capture import Rect, rect_of
+
+MIN_SIZE = 2          # elements of 1 px or less on a side are not captured
+MIN_OFFSET = -50      # nor those starting further left or above the screen than this
+
+# an element the walker accepted, with the rect already read and its depth below the root (children are 1)
+WalkedElement = namedtuple("WalkedElement", "element rect depth")
+
+
+class WrapperTree:
+    """Tree provider over pywinauto UIA wrappers."""
+
+    def children(self, element):
+        return element.children()
+
+    def rect(self, element):
+        return rect_of(element.rectangle())
+
+    def is_visible(self, element):
+        return element.is_visible()
+
+
+class ArrayTree:
+    """
+    Tree provider over arrays: node i has parent[i] (-1 for the root),
+    rects[i] as left, top, right, bottom and visible[i]. Nodes are ints;
+    children come from an ElementTree built over parent.
+    """
+
+    def __init__(self, parent, rects, visible=None):
+        self.tree = ElementTree(parent, None)
+        self.rects = np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+        self.visible = np.ones(len(self.rects), dtype=bool) if visible is None else np.asarray(visible, dtype=bool)
+        self.root = int(self.tree.roots[0]) if len(self.tree.roots) else None
+
+    def __len__(self):
+        return len(self.rects)
+
+    def children(self, node):
+        return self.tree.children(node).tolist()
+
+    def rect(self, node):
+        return Rect(*self.rects[node].tolist())
+
+    def is_visible(self, node):
+        return bool(self.visible[node])
+
+
+class TreeWalker:
+    """
+    Lazy breadth-first walk below a window that filters as it goes.
+
+    window.descendants() reads every node of the window before the caller
+    filters anything. walk() instead asks the provider for one level at a
+    time and yields a WalkedElement as soon as a node passes the filters:
+    visible, at least min_size on both sides and not starting beyond
+    min_offset to the left or above. Whole subtrees are skipped, without
+    reading any of their nodes, when their root is invisible (prune_hidden)
+    or lies entirely outside bounds (prune_outside; bounds defaults to the
+    walked window's own rect). Nodes with an empty rect are never used to
+    prune, since zero-size containers often hold visible children.
+
+    max_depth limits how far below the window the walk goes (1 = children
+    only) and budget how many nodes it reads; truncated says whether the
+    budget cut the walk short. A node whose properties can't be read (the
+    element went away) is skipped with its subtree and counted in errors.
+
+        walker = TreeWalker(max_depth=12, budget=5000)
+        for element, rect, depth in walker.walk(window):
+            ...
+    """
+
+    def __init__(self, tree=None, max_depth=None, budget=None, min_size=MIN_SIZE, min_offset=MIN_OFFSET,
+                 bounds=None, prune_hidden=True, prune_outside=True):
+        self.tree = tree if tree is not None else WrapperTree()
+        self.max_depth = max_depth
+        self.budget = budget
+        self.min_size = min_size
+        self.min_offset = min_offset
+        self.bounds = rect_of(bounds) if bounds is not None else None
+        self.prune_hidden = prune_hidden
+        self.prune_outside = prune_outside
+        self.visited = 0
+        self.yielded = 0
+        self.pruned = 0
+        self.errors = 0
+        self.truncated = False
+
+    def _outside(self, rect, bounds):
+        if bounds is None or rect.right <= rect.left or rect.bottom <= rect.top:
+            return False
+        return (rect.right <= bounds.left or rect.left >= bounds.right or
+                rect.bottom <= bounds.top or rect.top >= bounds.bottom)
+
+    def walk(self, root, children=None):
+        """
+        Generator of the WalkedElements below root, level by level. children,
+        if given, stands in for root's own children, to walk part of a window.
+        """
+        self.visited = self.yielded = self.pruned = self.errors = 0
+        self.truncated = False
+        tree = self.tree
+        bounds = self.bounds
+        if bounds is None and self.prune_outside:
+            try:
+                bounds = tree.rect(root)
+            except Exception:
+                self.errors += 1
+                return
+
+        queue = deque([(root, 0)])
+        while queue:
+            node, depth = queue.popleft()
+            if self.max_depth is not None and depth >= self.max_depth:
+                continue
+            if children is not None and depth == 0:
+                level = children
+            else:
+                try:
+                    level = tree.children(node)
+                except Exception:
+                    self.errors += 1
+                    continue
+            for child in level:
+                if self.budget is not None and self.visited >= self.budget:
+                    self.truncated = True
+                    return
+                self.visited += 1
+                try:
+                    visible = tree.is_visible(child)
+                    rect = tree.rect(child) if visible or not self.prune_hidden else None
+                except Exception:
+                    self.errors += 1
+                    continue
+                if not visible and self.prune_hidden:
+                    self.pruned += 1
+                    continue
+                if self.prune_outside and self._outside(rect, bounds):
+                    self.pruned += 1
+                    continue
+                queue.append((child, depth + 1))
+                if (visible and rect.right - rect.left >= self.min_size and rect.bottom - rect.top >= self.min_size
+                        and rect.left >= self.min_offset and rect.top >= self.min_offset):
+                    self.yielded += 1
+                    yield WalkedElement(child, rect, depth + 1)
+
+    def stats(self):
+        return {"visited": self.visited, "yielded": self.yielded, "pruned": self.pruned,
+                "errors": self.errors, "truncated": self.truncated}